@@ -0,0 +1,125 @@
+# benchmark_codec.py
+"""Micro-benchmark of the shared SIM codecs in src/modules/sim_codec.py.
+
+Each codec is timed against a character-by-character reference (the way
+the validation modules converted values before) on typical ICCID/IMSI/key
+sized values.
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "modules"))
+
+import sim_codec  # noqa: E402
+
+
+def ref_swap_pairs(text):
+    swapped = ""
+    for i in range(0, len(text), 2):
+        if i + 1 < len(text):
+            swapped += text[i + 1] + text[i]
+        else:
+            swapped += text[i]
+    return swapped
+
+
+def ref_hex_to_latin1(text):
+    result = ""
+    for i in range(0, len(text), 2):
+        if i + 2 <= len(text):
+            result += chr(int(text[i:i + 2], 16))
+    return result
+
+
+def ref_hex_to_printable_ascii(text):
+    result = ""
+    for i in range(0, len(text), 2):
+        if i + 2 <= len(text):
+            value = int(text[i:i + 2], 16)
+            result += chr(value) if 32 <= value <= 126 else text[i:i + 2]
+    return result
+
+
+def ref_hex_to_display(text):
+    result = ""
+    for i in range(0, len(text), 2):
+        if i + 1 < len(text):
+            char = chr(int(text[i:i + 2], 16))
+            result += char if char.isprintable() else "."
+    return result
+
+
+def ref_text_to_hex(text):
+    result = ""
+    for char in text:
+        result += format(ord(char), '02X')
+    return result
+
+
+def ref_decimal_pairs_to_hex(text):
+    result = ""
+    for i in range(0, len(text), 2):
+        if i + 1 < len(text):
+            result += format(int(text[i:i + 2]), '02X')
+    return result
+
+
+def ref_bcd_digits(text):
+    digits = []
+    for j in range(0, len(text) - 1, 2):
+        value = int(text[j:j + 2], 16)
+        for digit in ((value >> 4) & 0x0F, value & 0x0F):
+            if digit <= 9:
+                digits.append(str(digit))
+    return ''.join(digits)
+
+
+def _random(alphabet, length):
+    return ''.join(random.choice(alphabet) for _ in range(length))
+
+
+def build_samples(count=1000):
+    random.seed(7)
+    iccids = [_random("0123456789", 19) + "F" for _ in range(count)]
+    ascii_hex = [_random("0123456789", 20).encode().hex().upper() for _ in range(count)]
+    keys = [_random("0123456789ABCDEF", 32) for _ in range(count)]
+    imsis = ["0809" + _random("0123456789", 14) for _ in range(count)]
+    texts = [_random("0123456789ABCDEFGHIJ", 20) for _ in range(count)]
+    decimals = [_random("3456", 30) for _ in range(count)]
+    return iccids, ascii_hex, keys, imsis, texts, decimals
+
+
+def build_cases():
+    iccids, ascii_hex, keys, imsis, texts, decimals = build_samples()
+    return [
+        # label, reference, codec, values
+        ("swap_pairs", ref_swap_pairs, sim_codec.swap_pairs, iccids),
+        ("hex_to_latin1", ref_hex_to_latin1, sim_codec.hex_to_latin1, ascii_hex),
+        ("hex_to_printable_ascii", ref_hex_to_printable_ascii, sim_codec.hex_to_printable_ascii, ascii_hex),
+        ("hex_to_display", ref_hex_to_display, sim_codec.hex_to_display, keys),
+        ("text_to_hex", ref_text_to_hex, sim_codec.text_to_hex, texts),
+        ("decimal_pairs_to_hex", ref_decimal_pairs_to_hex, sim_codec.decimal_pairs_to_hex, decimals),
+        ("bcd_digits", ref_bcd_digits, sim_codec.bcd_digits, imsis),
+    ]
+
+
+def best_time(func, repeat=5, number=1):
+    return min(timeit.repeat(func, repeat=repeat, number=number))
+
+
+def run_benchmark():
+    print(f"{'Codec':<24} {'Reference (us)':>15} {'Codec (us)':>11} {'Speed-up':>9}")
+    print("-" * 62)
+    for label, reference, codec, values in build_cases():
+        assert [reference(v) for v in values] == [codec(v) for v in values], label
+        ref_seconds = best_time(lambda: [reference(v) for v in values])
+        codec_seconds = best_time(lambda: [codec(v) for v in values])
+        per_value = 1e6 / len(values)
+        print(f"{label:<24} {ref_seconds * per_value:>15.2f} {codec_seconds * per_value:>11.2f} "
+              f"{ref_seconds / codec_seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,207 @@
+# benchmark_machine_log.py
+"""Lines per second of the Machine Log tokenizer.
+
+tokenize_machine_log_line() (src/modules/machine_log_validation/core/
+log_tokenizer.py) is timed against the field-by-field parsing it replaced,
+one re.search per field, on generated lines of each machine log format.
+Both must return the same fields for every line.
+
+run_stream_benchmark() compares parsing a whole log before validation with
+ScriptValidator.validate_machine_log_stream() on a generated script and log:
+time, and peak memory while validating.
+"""
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "modules"))
+
+from machine_log_validation.core.log_tokenizer import tokenize_machine_log_line  # noqa: E402
+from machine_log_validation.core.script_validator import ScriptValidator  # noqa: E402
+
+
+def ref_parse_line(line):
+    """The per-field searches of ScriptValidator before the tokenizer"""
+    apdu_value = None
+    bracket_match = re.search(r'\[([A-F0-9]+)\]', line)
+    if bracket_match:
+        apdu_value = bracket_match.group(1)
+    if not apdu_value:
+        apdu_eq_match = re.search(r'APDU\s*=\s*([A-F0-9]+)', line, re.IGNORECASE)
+        if apdu_eq_match:
+            apdu_value = apdu_eq_match.group(1)
+    if not apdu_value:
+        command_match = re.match(r'^([A-F0-9]{4,})', line)
+        if command_match:
+            apdu_value = command_match.group(1)
+    if not apdu_value:
+        hex_match = re.search(r'\b([A-F0-9]{10,})\b', line)
+        if hex_match:
+            apdu_value = hex_match.group(1)
+    if not apdu_value:
+        return None
+
+    sw_value = exp_value = out_value = expect_value = receive_value = None
+    expect_receive_match = re.search(r'EXPECT\s*:\s*([0-9A-F]{3,4})\s+RECEIVE\s*:\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
+    if expect_receive_match:
+        expect_value = expect_receive_match.group(1).upper()
+        receive_value = expect_receive_match.group(2).upper()
+        sw_value = receive_value
+        exp_value = expect_value
+    out_match = re.search(r'OUT\[([0-9A-F]{3,4})\]', line)
+    if out_match:
+        out_value = out_match.group(1).upper()
+    if not sw_value or not exp_value:
+        sw_exp_match = re.search(r'SW\s*=\s*([0-9A-F]{3,4})\s+EXP\s*=\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
+        if sw_exp_match:
+            if not sw_value:
+                sw_value = sw_exp_match.group(1).upper()
+            if not exp_value:
+                exp_value = sw_exp_match.group(2).upper()
+        else:
+            if not sw_value:
+                sw_match = re.search(r'SW\s*=\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
+                if sw_match:
+                    sw_value = sw_match.group(1).upper()
+            if not exp_value:
+                exp_match = re.search(r'EXP\s*=\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
+                if exp_match:
+                    exp_value = exp_match.group(1).upper()
+    if not expect_value:
+        expect_single_match = re.search(r'EXPECT\s*:\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
+        if expect_single_match:
+            expect_value = expect_single_match.group(1).upper()
+            if not exp_value:
+                exp_value = expect_value
+    if not receive_value:
+        receive_single_match = re.search(r'RECEIVE\s*:\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
+        if receive_single_match:
+            receive_value = receive_single_match.group(1).upper()
+            if not sw_value:
+                sw_value = receive_value
+    if receive_value:
+        sw_value = receive_value
+    elif out_value and not sw_value:
+        sw_value = out_value
+    elif exp_value and not sw_value:
+        sw_value = exp_value
+
+    result_value = exp_result_value = None
+    result_match = re.search(r'RESULT\s*=\s*([0-9A-F]+)', line, re.IGNORECASE)
+    if result_match:
+        result_value = result_match.group(1).upper()
+    exp_result_match = re.search(r'EXPResult\s*=\s*([0-9A-F]+)', line, re.IGNORECASE)
+    if exp_result_match:
+        exp_result_value = exp_result_match.group(1).upper()
+
+    has_placeholder = False
+    placeholder_name = None
+    if re.search(r'RESULT\s*=\s*<[^>]+>', line) or re.search(r'RESULT\s*=\s*%[^%]+%', line):
+        has_placeholder = True
+        placeholder_match = re.search(r'RESULT\s*=\s*(<[^>]+>|%[^%]+%)', line)
+        if placeholder_match:
+            placeholder_name = placeholder_match.group(1)
+
+    return {
+        'apdu': apdu_value, 'sw': sw_value, 'exp': exp_value, 'out': out_value,
+        'expect': expect_value, 'receive': receive_value, 'result': result_value,
+        'exp_result': exp_result_value, 'has_placeholder': has_placeholder,
+        'placeholder_name': placeholder_name,
+    }
+
+
+def _hex(length):
+    return ''.join(random.choice("0123456789ABCDEF") for _ in range(length))
+
+
+# label -> line generator, one per machine log format
+FORMATS = {
+    "IN[..] OUT[..]": lambda: f"IN[00D6000010{_hex(32)}] OUT[9000]",
+    "APDU= SW= EXP= RESULT=": lambda: f"APDU=00B0000009 SW=9000 EXP=9000 RESULT={_hex(18)} EXPResult={_hex(18)}",
+    "EXPECT: RECEIVE:": lambda: f"00A4000C02{_hex(4)} EXPECT:9000 RECEIVE:9000",
+    "[..] SW = EXP = RESULT=<..>": lambda: f"[80E2{_hex(50)}] SW = 9000 EXP = 9000 RESULT=<KI>",
+    "bare hex": lambda: f"Send {_hex(40)} 9000",
+}
+
+
+def lines_per_second(parse, lines, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def run_benchmark(count=20000):
+    random.seed(7)
+    print(f"{'Format':<28} {'Before (lines/s)':>17} {'After (lines/s)':>16} {'Speed-up':>9}")
+    print("-" * 73)
+    mixed = []
+    for label, make_line in FORMATS.items():
+        lines = [make_line() for _ in range(count // len(FORMATS))]
+        mixed.extend(lines)
+        assert all(ref_parse_line(line) == tokenize_machine_log_line(line) for line in lines), label
+        before = lines_per_second(ref_parse_line, lines)
+        after = lines_per_second(tokenize_machine_log_line, lines)
+        print(f"{label:<28} {before:>17,.0f} {after:>16,.0f} {after / before:>8.1f}x")
+    random.shuffle(mixed)
+    before = lines_per_second(ref_parse_line, mixed)
+    after = lines_per_second(tokenize_machine_log_line, mixed)
+    print(f"{'all formats':<28} {before:>17,.0f} {after:>16,.0f} {after / before:>8.1f}x")
+
+
+def _validate(script_path, log_path, stream):
+    validator = ScriptValidator()
+    validator.debug_mode = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        validator.parse_script_file(script_path)
+        tracemalloc.start()
+        start = time.perf_counter()
+        if stream:
+            validator.validate_machine_log_stream(log_path)
+        else:
+            validator.parse_machine_log(log_path)
+            validator.validate_script_vs_machine_log()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return validator.stats, elapsed, peak
+
+
+def run_stream_benchmark(count=20000):
+    random.seed(7)
+    script_lines, log_lines = [], []
+    for step in range(count):
+        apdu = f"00D6000010{_hex(32)}" if step % 2 else f"80E2{_hex(46)}"
+        script_lines.append(f"{apdu}SW9000")
+        log_lines.append(f"{step:06d} IN[{apdu}] OUT[9000]")
+    with tempfile.TemporaryDirectory() as folder:
+        script_path = os.path.join(folder, "variable_script.txt")
+        log_path = os.path.join(folder, "machine_log.txt")
+        with open(script_path, "w") as f:
+            f.write("\n".join(script_lines))
+        with open(log_path, "w") as f:
+            f.write("\n".join(log_lines))
+
+        print(f"\n{'Mode':<28} {'Time (s)':>9} {'Peak memory (MB)':>17}")
+        print("-" * 56)
+        results = {}
+        for label, stream in (("parse, then validate", False), ("streaming", True)):
+            stats, elapsed, peak = _validate(script_path, log_path, stream)
+            results[label] = stats
+            print(f"{label:<28} {elapsed:>9.2f} {peak / 1e6:>17.1f}")
+        assert results["parse, then validate"] == results["streaming"]
+
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_stream_benchmark()
@@ -0,0 +1,73 @@
+# benchmark_startup.py
+"""Measure the import cost of each GUI tab and its validation module.
+
+Every target is imported in a fresh interpreter so caches from earlier
+imports do not hide the cost. Heavy optional libraries that got loaded
+as a side effect are listed next to the timing.
+"""
+import json
+import os
+import subprocess
+import sys
+
+TARGETS = [
+    ("First Card tab", "gui.tabs.first_card_tab"),
+    ("MNO File tab", "gui.tabs.mno_file_tab"),
+    ("Machine Log tab", "gui.tabs.machine_log_tab"),
+    ("First Card engine", "first_card_validation.core.validation_engine"),
+    ("Airtel engine", "first_card_validation.core.airtel_validation"),
+    ("MNO comparator", "mno_file_validator.core.file_comparator"),
+    ("Script validator", "machine_log_validation.core.script_validator"),
+]
+
+HEAVY_MODULES = ["cv2", "numpy", "pandas", "win32com", "PIL"]
+
+PROBE = """
+import json, sys, time, io, contextlib
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+error = None
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        __import__({module!r})
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "error": error,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=3):
+    """Best-of-repeat import time of module in a fresh interpreter"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    paths = [root, os.path.join(root, "src"), os.path.join(root, "src", "modules")]
+    code = PROBE.format(paths=paths, module=module, heavy=HEAVY_MODULES)
+
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root)
+        try:
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            return {"seconds": None, "error": output.stderr.strip().splitlines()[-1:], "heavy": []}
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def run_benchmark():
+    print(f"{'Target':<20} {'Import (ms)':>12}  Heavy libraries loaded")
+    print("-" * 70)
+    for label, module in TARGETS:
+        result = measure(module)
+        if result["seconds"] is None:
+            print(f"{label:<20} {'n/a':>12}  {result['error']}")
+            continue
+        heavy = ", ".join(result["heavy"]) or "-"
+        note = f"  ({result['error']})" if result["error"] else ""
+        print(f"{label:<20} {result['seconds'] * 1000:>12.1f}  {heavy}{note}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -26,11 +26,29 @@ a = Analysis(
         'mno_file_validator.core.data_field_validator',
         'mno_file_validator.core.scm_validator',
         'mno_file_validator.core.simoda_validator',
+        'mno_file_validator.core.batch_coordinator',
+        'mno_file_validator.utils.incremental_report_writer',
+        'mno_file_validator.utils.shared_columns',
         'first_card_validation.core.validation_engine',
         'first_card_validation.core.file_parsers',
         'first_card_validation.core.qr_processor',
         'first_card_validation.core.excel_generator',
+        'first_card_validation.core.pcom_parser',
+        'first_card_validation.core.sim_oda_parser',
+        'first_card_validation.core.uicc_image',
+        'first_card_validation.core.batch_validation',
+        'first_card_validation.core.image_thumbnails',
+        'first_card_validation.core.report_template',
+        'first_card_validation.core.auto_detect',
+        'first_card_validation.core.cps_index',
+        'sim_codec',
+        'log_batch',
         'machine_log_validation.core.script_validator',
+        'machine_log_validation.core.log_aligner',
+        'machine_log_validation.core.log_tokenizer',
+        'machine_log_validation.core.log_records',
+        'machine_log_validation.core.lot_validation',
+        'machine_log_validation.core.script_program',
         'cv2', 'numpy', 'pandas', 'openpyxl', 'PIL', 'PIL.Image',
         'tkinter', 'tkinter.ttk', 'tkinter.filedialog'
     ],
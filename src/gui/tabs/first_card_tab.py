@@ -219,6 +219,27 @@ class FirstCardTab:
             entry_widget.delete(0, tk.END)
             entry_widget.insert(0, filename)
             print(f"✅ Selected PCOM file: {filename}")
+            self.auto_detect_profile(filename, self.ml_entry.get().strip())
+
+    def auto_detect_profile(self, pcom_path, ml_path=None):
+        """Select the JIO profile from the PCOM/machine log headers when none is chosen yet"""
+        if self.operator_cb.get() != "JIO" or self.profile_cb.get() in ["MOB", "WBIOT", "NBIOT"]:
+            return None
+        try:
+            from first_card_validation.core.auto_detect import detect_operator_and_profile  # type: ignore
+            detection = detect_operator_and_profile(pcom_path, ml_path)
+        except Exception as e:
+            print(f"⚠️  Profile auto-detection failed: {e}")
+            return None
+
+        if detection.operator == "AIRTEL":
+            self.log_output.insert(tk.END, "⚠️  Selected files look like AIRTEL files, but JIO is selected.\n")
+        if detection.profile:
+            self.profile_cb.set(detection.profile)
+            self.profile_cb.event_generate("<<ComboboxSelected>>")
+            self.log_output.insert(tk.END, f"🔍 Auto-detected profile '{detection.profile}' "
+                                           f"({', '.join(detection.evidence)})\n")
+        return detection.profile
 
     def browse_cnum_file(self, entry_widget, file_type="jio"):
         """Browse for CNUM file - different file types for JIO and AIRTEL"""
@@ -409,31 +430,18 @@ class FirstCardTab:
                     return False, "PCOM file not found or inaccessible"
                 
                 try:
-                    # Read the PCOM file content - try different encodings
-                    content = ""
-                    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-                    
-                    for encoding in encodings:
-                        try:
-                            with open(pcom_path, 'r', encoding=encoding, errors='ignore') as f:
-                                content = f.read()
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                    
-                    if not content:
-                        return False, "Could not read PCOM file content with any supported encoding"
+                    # Parse the PCOM file once (cached per file)
+                    from first_card_validation.core.pcom_parser import load_pcom_symbols, PROFILE_KEYWORDS  # type: ignore
+                    symbols = load_pcom_symbols(pcom_path)
+
+                    if not symbols.has_content:
+                        return False, "Could not read PCOM file content"
                     
-                    content_upper = content.upper()
                     filename = os.path.basename(pcom_path).upper()
                     
-                    # Define profile mappings - what to look for in PCOM file
+                    # Profile mappings - what to look for in PCOM file
                     #Input side file validation
-                    profile_mappings = {
-                        "MOB": ["MOB", "MOBILE", "MOBILITY", "4G", "LTE", "GSM", "CAT1", "CAT 1", "CAT-1"],
-                        "WBIOT": ["WBIOT", "WB-IOT", "WB IOT", "WIDE BAND", "WIDEBAND", "CAT-M1", "CAT M1", "CAT-M", "LTE-M", "CATM1", "CAT-M2"],
-                        "NBIOT": ["NBIOT", "NB-IOT", "NB IOT", "NARROW BAND", "NARROWBAND", "CAT-NB", "CAT NB", "CAT-N", "NB1", "CAT-NB1", "CAT-NB2"]
-                    }
+                    profile_mappings = PROFILE_KEYWORDS
                     
                     # 1. FIRST PRIORITY: Check filename for clear profile indicators
                     filename_profile = None
@@ -452,18 +460,13 @@ class FirstCardTab:
                         if filename_profile:
                             break
                     
-                    # 2. SECOND PRIORITY: Check content for profile indicators
+                    # 2. SECOND PRIORITY: Check content for profile indicators (from the symbol table)
                     content_profiles = []
                     content_keywords_found = []
                     
-                    for profile_type, keywords in profile_mappings.items():
-                        for keyword in keywords:
-                            keyword_upper = keyword.upper()
-                            if keyword_upper in content_upper:
-                                if profile_type not in content_profiles:
-                                    content_profiles.append(profile_type)
-                                    content_keywords_found.append(keyword)
-                                break  # Found at least one keyword for this profile
+                    for profile_type, keyword in symbols.profiles_in_content():
+                        content_profiles.append(profile_type)
+                        content_keywords_found.append(keyword)
                     
                     # 3. DECISION LOGIC
                     # If filename clearly indicates a profile, it takes precedence
@@ -553,6 +556,11 @@ class FirstCardTab:
                 # JIO validation logic (existing functionality)
                 profile = self.profile_cb.get()
                 paths = [self.ml_entry.get(), self.pcom_entry.get(), self.cnum_entry.get(), self.scm_entry.get(), self.sim_oda_entry.get()]
+
+                if profile not in ["MOB", "WBIOT", "NBIOT"]:
+                    # No profile chosen: try the file names and headers first
+                    profile = self.auto_detect_profile(paths[1], paths[0]) or profile
+
                 image_paths = [self.image1_entry.get(), self.image2_entry.get(), self.image3_entry.get(), self.image4_entry.get()]
                 if self.image5_entry.get():
                     image_paths.append(self.image5_entry.get())
@@ -770,27 +778,18 @@ class FirstCardTab:
                     self.log_output.update()
                     
                     try:
-                        content = ""
-                        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+                        # Whole PCOM content, from the cached symbol table
+                        from first_card_validation.core.pcom_parser import load_pcom_symbols  # type: ignore
+                        symbols = load_pcom_symbols(pcom_path)
                         
-                        for encoding in encodings:
-                            try:
-                                with open(pcom_path, 'r', encoding=encoding, errors='ignore') as f:
-                                    content = f.read()
-                                break
-                            except UnicodeDecodeError:
-                                continue
-                        
-                        if content:
-                            content_upper = content.upper()
-                            if "AIRTEL" in content_upper or "BHARTI" in content_upper or "VODAFONE" in content_upper or "IDEA" in content_upper:
-                                self.log_output.insert(tk.END, f"✅ AIRTEL operator verified in PCOM file.\n\n")
-                            else:
-                                self.log_output.insert(tk.END, f"⚠️  AIRTEL indicator not found in PCOM file.\n")
-                                self.log_output.insert(tk.END, f"   Proceeding with validation anyway...\n\n")
-                        else:
+                        if not symbols.has_content:
                             self.log_output.insert(tk.END, f"⚠️  Could not read PCOM file content.\n")
                             self.log_output.insert(tk.END, f"   Proceeding with validation...\n\n")
+                        elif "AIRTEL" in dict(symbols.operators_in_content()):
+                            self.log_output.insert(tk.END, f"✅ AIRTEL operator verified in PCOM file.\n\n")
+                        else:
+                            self.log_output.insert(tk.END, f"⚠️  AIRTEL indicator not found in PCOM file.\n")
+                            self.log_output.insert(tk.END, f"   Proceeding with validation anyway...\n\n")
                     except Exception as e:
                         self.log_output.insert(tk.END, f"⚠️  Could not read PCOM file: {str(e)}\n")
                         self.log_output.insert(tk.END, f"   Proceeding with validation...\n\n")
@@ -145,4 +145,7 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Spawned pool workers of the frozen (PyInstaller) build must not start the GUI
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
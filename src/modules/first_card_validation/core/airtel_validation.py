@@ -1,5 +1,6 @@
 import os
 import re
+import sys
 import traceback
 import getpass
 from difflib import SequenceMatcher
@@ -8,6 +9,21 @@ from openpyxl import Workbook
 from openpyxl.styles import Border, Side, PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
 
+try:
+    from .pcom_parser import load_pcom_symbols
+    from .image_thumbnails import prepare_report_image
+    from .report_template import airtel_report_template
+    from .cps_index import load_cps_index
+except ImportError:
+    # Running this file directly as a script
+    from pcom_parser import load_pcom_symbols
+    from image_thumbnails import prepare_report_image
+    from report_template import airtel_report_template
+    from cps_index import load_cps_index
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from sim_codec import bcd_digits, hex_to_latin1, hex_to_printable_ascii, swap_pairs
+
 # Add at the top for image support
 try:
     from openpyxl.drawing.image import Image as ExcelImage
@@ -113,7 +129,7 @@ def insert_image_to_excel(ws, image_path, cell_reference, width=150, height=100)
             print(f"⚠️  Image not found: {image_path}")
             return False
         
-        img = ExcelImage(image_path)
+        img = ExcelImage(prepare_report_image(image_path, width, height))  # Resized copy, not the full photo
         
         # Resize image
         img.width = width
@@ -217,12 +233,7 @@ def save_report(wb, ml_path, pcom_path):
             raw_number = base_name
         
         # Pairwise swap each 2 digits
-        swapped_number = ""
-        for i in range(0, len(raw_number), 2):
-            if i + 1 < len(raw_number):
-                swapped_number += raw_number[i+1] + raw_number[i]
-            else:
-                swapped_number += raw_number[i]
+        swapped_number = swap_pairs(raw_number)
         
         # Create final report name
         report_name = f"{swapped_number}_Validation_Report.xlsx"
@@ -280,18 +291,8 @@ def swap_iccid(iccid):
     Format: Pairwise swapping of characters (0<->1, 2<->3, etc.)
     UPDATED: Handles alphanumeric characters (0-9, A-F, U)
     """
-    if not iccid or len(iccid) < 2:
-        return iccid
-    
-    swapped = ''
-    for i in range(0, len(iccid), 2):
-        if i + 1 < len(iccid):
-            # Swap pairs of characters (digits or letters)
-            swapped += iccid[i + 1] + iccid[i]
-        else:
-            swapped += iccid[i]  # Last character if odd length
-    
-    return swapped
+    # Last character is kept if odd length
+    return swap_pairs(iccid)
 
 def hex_to_ascii_iccid(hex_str):
     """
@@ -303,29 +304,8 @@ def hex_to_ascii_iccid(hex_str):
     if not hex_str:
         return ""
     
-    # Remove spaces and convert hex to ASCII
-    hex_chars = hex_str.replace(' ', '')
-    ascii_str = ""
-    
-    for i in range(0, len(hex_chars), 2):
-        if i + 2 <= len(hex_chars):
-            hex_byte = hex_chars[i:i+2]
-            try:
-                # Convert hex to decimal
-                decimal_val = int(hex_byte, 16)
-                
-                # Check if this represents an ASCII character
-                if 32 <= decimal_val <= 126:  # Printable ASCII range
-                    ascii_char = chr(decimal_val)
-                    ascii_str += ascii_char
-                else:
-                    # If not printable ASCII, keep hex representation
-                    ascii_str += hex_byte
-            except:
-                # If conversion fails, keep hex representation
-                ascii_str += hex_byte
-    
-    return ascii_str
+    # Remove spaces; bytes outside printable ASCII keep their hex representation
+    return hex_to_printable_ascii(hex_str.replace(' ', ''))
 
 def hex_ascii_to_string(hex_ascii_str):
     """
@@ -336,24 +316,8 @@ def hex_ascii_to_string(hex_ascii_str):
     if not hex_ascii_str:
         return ""
     
-    # Remove spaces
-    hex_ascii_str = hex_ascii_str.replace(' ', '')
-    
-    result = ""
-    for i in range(0, len(hex_ascii_str), 2):
-        if i + 2 <= len(hex_ascii_str):
-            hex_pair = hex_ascii_str[i:i+2]
-            try:
-                # Convert hex to decimal
-                dec_value = int(hex_pair, 16)
-                # Convert to ASCII character
-                ascii_char = chr(dec_value)
-                result += ascii_char
-            except:
-                # If conversion fails, keep hex pair
-                result += hex_pair
-    
-    return result
+    # Remove spaces; a pair that is not hex is kept
+    return hex_to_latin1(hex_ascii_str.replace(' ', ''))
 
 def iccid_for_cnum_comparison(ascii_iccid):
     """
@@ -424,18 +388,115 @@ def process_imsi_for_cnum_cps(imsi_18_digit):
     return swapped
 
 # ========== PARSING FUNCTIONS ==========
+def _command_segment(line_upper, command):
+    """Text after the first occurrence of command, up to its next occurrence"""
+    start = line_upper.find(command) + len(command)
+    end = line_upper.find(command, start)
+    return line_upper[start:] if end == -1 else line_upper[start:end]
+
+def _hex_data(segment):
+    """Command data up to SW9000, hex digits only"""
+    if 'SW9000' in segment:
+        segment = segment.split('SW9000')[0]
+    # UPDATED: Allow alphanumeric characters (0-9, A-F)
+    return re.sub(r'[^0-9A-F]', '', segment)
+
 def extract_value(line, command):
     """Extract value from line after command - UPDATED for alphanumeric"""
     line = line.upper().strip()
     if command in line:
-        parts = line.split(command)
-        if len(parts) > 1:
-            value = parts[1].split('SW9000')[0] if 'SW9000' in parts[1] else parts[1]
-            # UPDATED: Allow alphanumeric characters (0-9, A-F)
-            value = re.sub(r'[^0-9A-F]', '', value)
-            return value
+        return _hex_data(_command_segment(line, command))
     return None
 
+def _decode_imsi(segment):
+    val = _hex_data(segment)
+    # BCD digits of the complete bytes; F filler nibbles are dropped
+    digits = bcd_digits(val)
+    if digits:
+        return {'IMSI': digits[:18]}
+    return {}
+
+def _decode_iccid(segment):
+    val = _hex_data(segment)
+    if val:
+        # UPDATED: every nibble is kept (0-9, A-F), so the ICCID is the first 10 bytes
+        return {'ICCID': val[:20].ljust(20, '0')}
+    return {}
+
+def _decode_psk_dek1(segment):
+    if 'FE80400210' in segment:
+        psk, dek1 = segment.split('FE80400210')[:2]
+        return {'PSK (6F2B)': psk[:32], 'DEK1 (6F2B)': dek1[:32]}
+    return {}
+
+def _puk_decoder(field):
+    # FIXED: Keep PUK as hex ASCII (3236333739323737)
+    def decode(segment):
+        val = _hex_data(segment)
+        if 'FFFFFFFF0A0A' in val:
+            puk = val.split('FFFFFFFF0A0A')[1]
+            return {field: puk[:16]} if len(puk) >= 16 else {}
+        return {field: val[:16]} if len(val) >= 16 else {}
+    return decode
+
+def _truncated_decoder(field, length):
+    def decode(segment):
+        val = _hex_data(segment)
+        return {field: val[:length]} if len(val) >= length else {}
+    return decode
+
+def _airtel_key_decoder(field):
+    def decode(segment):
+        val = _hex_data(segment).replace('FFFFFFFFFFFFFFFF', '')
+        return {field: val[:32]} if len(val) >= 32 else {}
+    return decode
+
+# APDU command prefix, other text the line must contain (or None), field decoder.
+# The first matching entry wins, as the order of this table.
+AIRTEL_ML_COMMANDS = [
+    ('00D6000009', None, _decode_imsi),
+    ('00D600000A', None, _decode_iccid),
+    ('00D600002AFE85400310', 'FE80400210', _decode_psk_dek1),
+    ('00D6000015F00303', None, _puk_decoder('PUK1')),
+    ('00D6000015E00303', None, _puk_decoder('PUK2')),
+    ('00D600000B800A0A', None, _truncated_decoder('ADM', 16)),
+    ('00D6000002', None, _truncated_decoder('ACC', 4)),
+    ('00DC01041BFE0110', None, _airtel_key_decoder('KIC1 (6F22)')),
+    ('00DC02041BFE0111', None, _airtel_key_decoder('KID1 (6F22)')),
+    ('00DC03041BFE0112', None, _airtel_key_decoder('KIK1 (6F22)')),
+    ('00DC04041BFE0050', None, _airtel_key_decoder('KIC2 (6F22)')),
+    ('00DC05041BFE0051', None, _airtel_key_decoder('KID2 (6F22)')),
+    ('00DC06041BFE0052', None, _airtel_key_decoder('KIK2 (6F22)')),
+]
+
+def _compile_command_matcher(commands):
+    """
+    One regex finding every command prefix of a line in a single scan.
+
+    The lookahead matches at every position, longest prefix first; prefixes
+    of the matched text that are commands themselves are added from a table.
+    Also returns the prefix shared by all commands, for a quick line filter.
+    """
+    ordered = sorted(commands, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(c) for c in ordered) + '))')
+    implied = {c: {other for other in commands if c.startswith(other)} for c in commands}
+    return pattern, implied, os.path.commonprefix(commands)
+
+_ML_COMMAND_RE, _ML_IMPLIED_COMMANDS, _ML_COMMON_PREFIX = _compile_command_matcher(
+    [command for command, _, _ in AIRTEL_ML_COMMANDS]
+)
+_ML_COMMAND_ORDER = {command: i for i, (command, _, _) in enumerate(AIRTEL_ML_COMMANDS)}
+
+def find_ml_commands(line_upper):
+    """Commands of AIRTEL_ML_COMMANDS found in an uppercased line"""
+    found = set()
+    # Most log lines hold none of the commands; rule them out with one substring test
+    if _ML_COMMON_PREFIX not in line_upper:
+        return found
+    for match in _ML_COMMAND_RE.finditer(line_upper):
+        found |= _ML_IMPLIED_COMMANDS[match.group(1)]
+    return found
+
 def parse_machine_log(filepath):
     """Parse Machine Log file - FIXED: Keep PUK as hex ASCII"""
     print("="*80)
@@ -443,214 +504,23 @@ def parse_machine_log(filepath):
     print("="*80)
     
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
         extracted = {}
         
-        for line_num, line in enumerate(lines, 1):
-            line_upper = line.upper().strip()
-            
-            # IMSI - Keep existing (should be numeric)
-            if '00D6000009' in line_upper:
-                val = extract_value(line_upper, '00D6000009')
-                if val:
-                    print(f"🔍 Line {line_num}: Raw IMSI hex: {val}")
-                    
-                    # Convert hex to BCD digits
-                    decimal_digits = []
-                    for i in range(0, len(val), 2):
-                        if i + 2 <= len(val):
-                            hex_byte = val[i:i+2]
-                            try:
-                                byte_value = int(hex_byte, 16)
-                                high_digit = (byte_value >> 4) & 0x0F
-                                low_digit = byte_value & 0x0F
-                                
-                                # Check if valid BCD digit (0-9) for IMSI
-                                if 0 <= high_digit <= 9:
-                                    decimal_digits.append(str(high_digit))
-                                if 0 <= low_digit <= 9:
-                                    decimal_digits.append(str(low_digit))
-                            except:
-                                continue
-                    
-                    if decimal_digits:
-                        if len(decimal_digits) >= 18:
-                            imsi_18_digit = ''.join(decimal_digits)[:18]
-                            extracted['IMSI'] = imsi_18_digit
-                            print(f"✅ IMSI parsed (18 digits): {imsi_18_digit}")
-                        else:
-                            imsi = ''.join(decimal_digits)
-                            extracted['IMSI'] = imsi
-                            print(f"✅ IMSI parsed: {imsi}")
-            
-            # ICCID - UPDATED: Extract alphanumeric (0-9, A-F)
-            elif '00D600000A' in line_upper:
-                val = extract_value(line_upper, '00D600000A')
-                if val:
-                    print(f"🔍 Line {line_num}: Raw ICCID hex: {val}")
-                    
-                    # Take first 20 hex chars (10 bytes) for ICCID
-                    hex_str = val[:20].ljust(20, '0')  # Pad to 20 chars if shorter
-                    
-                    # UPDATED: Convert hex to alphanumeric ICCID
-                    iccid_chars = []
-                    for i in range(0, len(hex_str), 2):
-                        if i + 2 <= len(hex_str):
-                            hex_byte = hex_str[i:i+2]
-                            try:
-                                byte_value = int(hex_byte, 16)
-                                
-                                # Convert each nibble to character
-                                high_nibble = (byte_value >> 4) & 0x0F
-                                low_nibble = byte_value & 0x0F
-                                
-                                # UPDATED: Handle values 0-15 (0-9, A-F)
-                                def nibble_to_char(nibble):
-                                    if 0 <= nibble <= 9:
-                                        return str(nibble)
-                                    elif 10 <= nibble <= 15:
-                                        return chr(ord('A') + nibble - 10)
-                                    return ''
-                                
-                                high_char = nibble_to_char(high_nibble)
-                                low_char = nibble_to_char(low_nibble)
-                                
-                                if high_char:
-                                    iccid_chars.append(high_char)
-                                if low_char:
-                                    iccid_chars.append(low_char)
-                                    
-                            except:
-                                continue
-                    
-                    if iccid_chars:
-                        # Extract alphanumeric ICCID (18-20 characters)
-                        iccid = ''.join(iccid_chars)[:20]  # Can be up to 20 chars
-                        extracted['ICCID'] = iccid
-                        print(f"✅ ICCID parsed (alphanumeric): {iccid}")
-            
-            # PSK/DEK1
-            elif '00D600002AFE85400310' in line_upper and 'FE80400210' in line_upper:
-                parts = line_upper.split('00D600002AFE85400310')
-                if len(parts) > 1:
-                    tail = parts[1]
-                    if 'FE80400210' in tail:
-                        psk = tail.split('FE80400210')[0][:32]
-                        dek1 = tail.split('FE80400210')[1][:32]
-                        extracted['PSK (6F2B)'] = psk
-                        extracted['DEK1 (6F2B)'] = dek1
-                        print(f"✅ PSK parsed: {psk}")
-                        print(f"✅ DEK1 parsed: {dek1}")
-            
-            # PUK1 - FIXED: Keep as hex ASCII (3236333739323737)
-            elif '00D6000015F00303' in line_upper:
-                val = extract_value(line_upper, '00D6000015F00303')
-                if val:
-                    print(f"🔍 Line {line_num}: Raw PUK1 hex: {val}")
-                    if 'FFFFFFFF0A0A' in val:
-                        parts = val.split('FFFFFFFF0A0A')
-                        if len(parts) > 1 and len(parts[1]) >= 16:
-                            hex_ascii_puk = parts[1][:16]  # This is 3236333739323737
-                            # Store the hex ASCII value AS-IS
-                            extracted['PUK1'] = hex_ascii_puk
-                            print(f"✅ PUK1 parsed (hex ASCII): {hex_ascii_puk}")
-                    else:
-                        # Try to extract 16 hex chars
-                        hex_match = re.search(r'([0-9A-F]{16})', val)
-                        if hex_match:
-                            hex_ascii_puk = hex_match.group(1)
-                            extracted['PUK1'] = hex_ascii_puk
-                            print(f"✅ PUK1 parsed (direct): {hex_ascii_puk}")
-            
-            # PUK2 - FIXED: Keep as hex ASCII
-            elif '00D6000015E00303' in line_upper:
-                val = extract_value(line_upper, '00D6000015E00303')
-                if val:
-                    print(f"🔍 Line {line_num}: Raw PUK2 hex: {val}")
-                    if 'FFFFFFFF0A0A' in val:
-                        parts = val.split('FFFFFFFF0A0A')
-                        if len(parts) > 1 and len(parts[1]) >= 16:
-                            hex_ascii_puk = parts[1][:16]
-                            # Store the hex ASCII value AS-IS
-                            extracted['PUK2'] = hex_ascii_puk
-                            print(f"✅ PUK2 parsed (hex ASCII): {hex_ascii_puk}")
-                    else:
-                        # Try to extract 16 hex chars
-                        hex_match = re.search(r'([0-9A-F]{16})', val)
-                        if hex_match:
-                            hex_ascii_puk = hex_match.group(1)
-                            extracted['PUK2'] = hex_ascii_puk
-                            print(f"✅ PUK2 parsed (direct): {hex_ascii_puk}")
-            
-            # ADM
-            elif '00D600000B800A0A' in line_upper:
-                val = extract_value(line_upper, '00D600000B800A0A')
-                if val and len(val) >= 16:
-                    extracted['ADM'] = val[:16]
-                    print(f"✅ ADM parsed: {val[:16]}")
-            
-            # ACC
-            elif '00D6000002' in line_upper:
-                val = extract_value(line_upper, '00D6000002')
-                if val and len(val) >= 4:
-                    extracted['ACC'] = val[:4]
-                    print(f"✅ ACC parsed: {val[:4]}")
-            
-            # KIC1
-            elif '00DC01041BFE0110' in line_upper:
-                val = extract_value(line_upper, '00DC01041BFE0110')
-                if val:
-                    val = val.replace('FFFFFFFFFFFFFFFF', '')
-                    if len(val) >= 32:
-                        extracted['KIC1 (6F22)'] = val[:32]
-                        print(f"✅ KIC1 parsed: {val[:32]}")
-            
-            # KID1
-            elif '00DC02041BFE0111' in line_upper:
-                val = extract_value(line_upper, '00DC02041BFE0111')
-                if val:
-                    val = val.replace('FFFFFFFFFFFFFFFF', '')
-                    if len(val) >= 32:
-                        extracted['KID1 (6F22)'] = val[:32]
-                        print(f"✅ KID1 parsed: {val[:32]}")
-            
-            # KIK1
-            elif '00DC03041BFE0112' in line_upper:
-                val = extract_value(line_upper, '00DC03041BFE0112')
-                if val:
-                    val = val.replace('FFFFFFFFFFFFFFFF', '')
-                    if len(val) >= 32:
-                        extracted['KIK1 (6F22)'] = val[:32]
-                        print(f"✅ KIK1 parsed: {val[:32]}")
-            
-            # KIC2
-            elif '00DC04041BFE0050' in line_upper:
-                val = extract_value(line_upper, '00DC04041BFE0050')
-                if val:
-                    val = val.replace('FFFFFFFFFFFFFFFF', '')
-                    if len(val) >= 32:
-                        extracted['KIC2 (6F22)'] = val[:32]
-                        print(f"✅ KIC2 parsed: {val[:32]}")
-            
-            # KID2
-            elif '00DC05041BFE0051' in line_upper:
-                val = extract_value(line_upper, '00DC05041BFE0051')
-                if val:
-                    val = val.replace('FFFFFFFFFFFFFFFF', '')
-                    if len(val) >= 32:
-                        extracted['KID2 (6F22)'] = val[:32]
-                        print(f"✅ KID2 parsed: {val[:32]}")
-            
-            # KIK2
-            elif '00DC06041BFE0052' in line_upper:
-                val = extract_value(line_upper, '00DC06041BFE0052')
-                if val:
-                    val = val.replace('FFFFFFFFFFFFFFFF', '')
-                    if len(val) >= 32:
-                        extracted['KIK2 (6F22)'] = val[:32]
-                        print(f"✅ KIK2 parsed: {val[:32]}")
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            for line_num, line in enumerate(f, 1):
+                line_upper = line.upper().strip()
+                found = find_ml_commands(line_upper)
+                if not found:
+                    continue
+                
+                for command in sorted(found, key=_ML_COMMAND_ORDER.get):
+                    _, required, decode = AIRTEL_ML_COMMANDS[_ML_COMMAND_ORDER[command]]
+                    if required and required not in line_upper:
+                        continue
+                    for field, value in decode(_command_segment(line_upper, command)).items():
+                        extracted[field] = value
+                        print(f"✅ Line {line_num}: {field} parsed: {value}")
+                    break
         
         # Ensure all fields exist
         for field in AIR_TEL_VALIDATION_RULES.keys():
@@ -675,36 +545,34 @@ def parse_pcom_file(pcom_path):
     
     try:
         print(f"\n📋 PARSING PCOM FILE: {pcom_path}")
-        with open(pcom_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
+        symbols = load_pcom_symbols(pcom_path)
+
         fields = {}
-        
-        # Try different patterns for each field
-        patterns = [
-            ('IMSI', r'\.DEFINE\s+%IMSI\s+"?([0-9]+)"?'),
-            ('IMSI', r'IMSI\s*=\s*"?([0-9]+)"?'),
-            ('ICCID', r'\.DEFINE\s+%ICCID\s+"?([0-9A-F]{18,20})"?'),  # UPDATED: alphanumeric
-            ('ICCID', r'ICCID\s*=\s*"?([0-9A-F]{18,20})"?'),  # UPDATED: alphanumeric
-            ('PUK1', r'\.DEFINE\s+%PUK1\s+"?([0-9A-F]{16})"?'),
-            ('PUK1', r'PUK1\s*=\s*"?([0-9A-F]{16})"?'),
-            ('PUK2', r'\.DEFINE\s+%PUK2\s+"?([0-9A-F]{16})"?'),  # Added for PUK2
-            ('PUK2', r'PUK2\s*=\s*"?([0-9A-F]{16})"?'),  # Added for PUK2
-            ('ADM', r'\.DEFINE\s+%ISC1\s+"?([0-9A-F]{16})"?'),
-            ('ADM', r'ADM\s*=\s*"?([0-9A-F]{16})"?'),
-            ('KIC1 (6F22)', r'\.DEFINE\s+%KIC1\s+"?([0-9A-F]{32})"?'),
-            ('KIC1 (6F22)', r'KIC1\s*=\s*"?([0-9A-F]{32})"?'),
-            ('KID1 (6F22)', r'\.DEFINE\s+%KID1\s+"?([0-9A-F]{32})"?'),
-            ('KID1 (6F22)', r'KID1\s*=\s*"?([0-9A-F]{32})"?'),
-            ('ACC', r'\.DEFINE\s+%ACC\s+"?([0-9]{4})"?'),
-            ('ACC', r'ACC\s*=\s*"?([0-9]{4})"?'),
+
+        # Symbol lookups for each field, in priority order
+        lookups = [
+            ('IMSI', 'define', 'IMSI', r'"?([0-9]+)"?'),
+            ('IMSI', 'assign', 'IMSI', r'"?([0-9]+)"?'),
+            ('ICCID', 'define', 'ICCID', r'"?([0-9A-F]{18,20})"?'),  # UPDATED: alphanumeric
+            ('ICCID', 'assign', 'ICCID', r'"?([0-9A-F]{18,20})"?'),  # UPDATED: alphanumeric
+            ('PUK1', 'define', 'PUK1', r'"?([0-9A-F]{16})"?'),
+            ('PUK1', 'assign', 'PUK1', r'"?([0-9A-F]{16})"?'),
+            ('PUK2', 'define', 'PUK2', r'"?([0-9A-F]{16})"?'),  # Added for PUK2
+            ('PUK2', 'assign', 'PUK2', r'"?([0-9A-F]{16})"?'),  # Added for PUK2
+            ('ADM', 'define', 'ISC1', r'"?([0-9A-F]{16})"?'),
+            ('ADM', 'assign', 'ADM', r'"?([0-9A-F]{16})"?'),
+            ('KIC1 (6F22)', 'define', 'KIC1', r'"?([0-9A-F]{32})"?'),
+            ('KIC1 (6F22)', 'assign', 'KIC1', r'"?([0-9A-F]{32})"?'),
+            ('KID1 (6F22)', 'define', 'KID1', r'"?([0-9A-F]{32})"?'),
+            ('KID1 (6F22)', 'assign', 'KID1', r'"?([0-9A-F]{32})"?'),
+            ('ACC', 'define', 'ACC', r'"?([0-9]{4})"?'),
+            ('ACC', 'assign', 'ACC', r'"?([0-9]{4})"?'),
         ]
-        
-        for field_name, pattern in patterns:
+
+        for field_name, kind, name, value_pattern in lookups:
             if field_name not in fields:  # Only find if not already found
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match:
-                    value = match.group(1)
+                value = symbols.resolve([(kind, name, value_pattern)])
+                if value is not None:
                     fields[field_name] = value
                     print(f"✅ PCOM {field_name}: {value}")
         
@@ -716,6 +584,65 @@ def parse_pcom_file(pcom_path):
         traceback.print_exc()
         return {}
 
+def _cnum_imsi(value):
+    digits = re.sub(r'[^0-9]', '', value)
+    return {'IMSI': digits[:15] if len(digits) >= 15 else value}
+
+def _cnum_iccid(value):
+    # UPDATED: Allow alphanumeric (0-9, A-F, U)
+    cleaned = re.sub(r'[^0-9A-FU]', '', value.upper())
+    if len(cleaned) >= 18:
+        return {'ICCID': cleaned[:20]}
+    if len(value) >= 18:
+        return {'ICCID': value[:20]}
+    return {}
+
+def _cnum_as_is(field):
+    # CNUM has ASCII string, not hex ASCII
+    return lambda value: {field: value}
+
+def _cnum_key(field):
+    def decode(value):
+        hex_match = re.search(r'([0-9A-F]{32})', value, re.IGNORECASE)
+        if hex_match:
+            return {field: hex_match.group(1)}
+        return {field: value[:32]} if len(value) >= 32 else {}
+    return decode
+
+def _cnum_acc(value):
+    return {'ACC': value} if value.isdigit() and len(value) == 4 else {}
+
+# CNUM column header -> decoder of its data value
+CNUM_COLUMN_DECODERS = {
+    'IMSI': _cnum_imsi,
+    'ICCID': _cnum_iccid,
+    'PUK1': _cnum_as_is('PUK1'),
+    'PUK2': _cnum_as_is('PUK2'),
+    'CIPHERKEY_RFM': _cnum_key('KIC1 (6F22)'),
+    'MACKEY_RFM': _cnum_key('KID1 (6F22)'),
+    'A4IND': _cnum_acc,
+    'ACC': _cnum_acc,
+}
+
+_cnum_layouts = {}
+
+def cnum_column_map(header_line):
+    """
+    [(column index, header, decoder)] of a "VAR_OUT: A/B/C" header line.
+    Built once per distinct header (layout signature).
+    """
+    signature = header_line.strip().upper()
+    column_map = _cnum_layouts.get(signature)
+    if column_map is None:
+        headers_part = signature.replace('VAR_OUT:', '').strip()
+        header_parts = [h.strip() for h in headers_part.split('/') if h.strip()]
+        column_map = [
+            (i, header, CNUM_COLUMN_DECODERS[header])
+            for i, header in enumerate(header_parts) if header in CNUM_COLUMN_DECODERS
+        ]
+        _cnum_layouts[signature] = column_map
+    return column_map
+
 def parse_cnum_file(cnum_path):
     """Parse CNUM file - FIXED for PUK comparison"""
     if not cnum_path or not os.path.exists(cnum_path):
@@ -731,117 +658,57 @@ def parse_cnum_file(cnum_path):
         
         print(f"📊 Total lines in CNUM: {len(lines)}")
         
-        # Look for specific structure: line 24 has headers, line 25 has data
-        if len(lines) >= 25:
-            # Line 24 (index 23): Header line
-            header_line = lines[23].strip().upper() if len(lines) > 23 else ""
-            # Line 25 (index 24): Data line
-            data_line = lines[24].strip() if len(lines) > 24 else ""
+        # Structured layout: "VAR_OUT: NAME/NAME/..." header with the data row below it,
+        # usually on lines 24/25
+        if len(lines) > 24 and 'VAR_OUT:' in lines[23].upper():
+            header_index = 23
+        else:
+            header_index = next((i for i, line in enumerate(lines) if 'VAR_OUT:' in line.upper()), None)
+        data_line = ""
+        if header_index is not None and header_index + 1 < len(lines):
+            data_line = lines[header_index + 1].strip()
+        
+        if data_line:
+            column_map = cnum_column_map(lines[header_index])
+            data_parts = data_line.split()
+            print(f"📋 CNUM layout: header on line {header_index + 1}, "
+                  f"{len(column_map)} mapped columns, {len(data_parts)} data values")
             
-            print(f"📋 Line 24 (header): {header_line[:100]}...")
-            print(f"📋 Line 25 (data): {data_line[:100]}...")
+            # Map headers to data by column index
+            for i, header, decode in column_map:
+                if i < len(data_parts):
+                    for field, value in decode(data_parts[i]).items():
+                        fields[field] = value
+                        print(f"✅ CNUM {field} ({header}): {value}")
             
-            # Check if this is the correct structure
-            if 'VAR_OUT:' in header_line and data_line:
-                # Parse headers
-                headers_part = header_line.replace('VAR_OUT:', '').strip()
-                header_parts = [h.strip() for h in headers_part.split('/') if h.strip()]
-                
-                print(f"📋 CNUM Headers ({len(header_parts)}):")
-                for i, header in enumerate(header_parts):
-                    print(f"   {i+1}. {header}")
+            # Also search entire data line for patterns
+            for data_value in data_parts:
+                if len(data_value) == 4 and data_value.isdigit() and 'ACC' not in fields:
+                    fields['ACC'] = data_value
+                    print(f"✅ CNUM ACC (found in data): {data_value}")
                 
-                # Parse data
-                data_parts = data_line.split()
+                # Look for ICCID with U/F character
+                if 'ICCID' not in fields and len(data_value) >= 18:
+                    if 'U' in data_value.upper() or data_value[-1].upper() in ['U', 'F']:
+                        cleaned = re.sub(r'[^0-9A-FU]', '', data_value.upper())
+                        if len(cleaned) >= 18:
+                            fields['ICCID'] = cleaned[:20]
+                            print(f"✅ CNUM ICCID (U/F pattern): {cleaned[:20]}")
                 
-                print(f"📋 CNUM Data ({len(data_parts)} parts):")
-                for i, data in enumerate(data_parts):
-                    print(f"   {i+1}. {data}")
+                # Look for KIC1/KID1 if not found yet
+                if 'KIC1 (6F22)' not in fields:
+                    hex_match = re.search(r'([0-9A-F]{32})', data_value, re.IGNORECASE)
+                    if hex_match:
+                        fields['KIC1 (6F22)'] = hex_match.group(1)
+                        print(f"✅ CNUM KIC1 (pattern): {hex_match.group(1)}")
                 
-                # Map headers to data
-                for i, header in enumerate(header_parts):
-                    if i < len(data_parts):
-                        data_value = data_parts[i]
-                        
-                        # Map based on header name
-                        if header == 'IMSI':
-                            digits = re.sub(r'[^0-9]', '', data_value)
-                            if len(digits) >= 15:
-                                fields['IMSI'] = digits[:15]
-                                print(f"✅ CNUM IMSI: {digits[:15]}")
-                            else:
-                                fields['IMSI'] = data_value
-                                print(f"⚠️  CNUM IMSI (raw): {data_value}")
-                        
-                        elif header == 'ICCID':
-                            # UPDATED: Allow alphanumeric (0-9, A-F, U)
-                            cleaned = re.sub(r'[^0-9A-FU]', '', data_value.upper())
-                            if len(cleaned) >= 18:
-                                fields['ICCID'] = cleaned[:20]  # Up to 20 chars
-                                print(f"✅ CNUM ICCID (alphanumeric): {cleaned[:20]}")
-                            elif len(data_value) >= 18:
-                                fields['ICCID'] = data_value[:20]
-                                print(f"✅ CNUM ICCID (raw): {data_value[:20]}")
-                        
-                        elif header == 'PUK1':
-                            # CNUM has ASCII string, not hex ASCII
-                            fields['PUK1'] = data_value
-                            print(f"✅ CNUM PUK1: {data_value}")
-                        
-                        elif header == 'PUK2':
-                            fields['PUK2'] = data_value
-                            print(f"✅ CNUM PUK2: {data_value}")
-                        
-                        elif header == 'CIPHERKEY_RFM':
-                            hex_match = re.search(r'([0-9A-F]{32})', data_value, re.IGNORECASE)
-                            if hex_match:
-                                fields['KIC1 (6F22)'] = hex_match.group(1)
-                                print(f"✅ CNUM KIC1 (CIPHERKEY_RFM): {hex_match.group(1)}")
-                            elif len(data_value) >= 32:
-                                fields['KIC1 (6F22)'] = data_value[:32]
-                                print(f"✅ CNUM KIC1 (raw): {data_value[:32]}")
-                        
-                        elif header == 'MACKEY_RFM':
-                            hex_match = re.search(r'([0-9A-F]{32})', data_value, re.IGNORECASE)
-                            if hex_match:
-                                fields['KID1 (6F22)'] = hex_match.group(1)
-                                print(f"✅ CNUM KID1 (MACKEY_RFM): {hex_match.group(1)}")
-                            elif len(data_value) >= 32:
-                                fields['KID1 (6F22)'] = data_value[:32]
-                                print(f"✅ CNUM KID1 (raw): {data_value[:32]}")
-                        
-                        if header in ['A4IND', 'ACC'] and data_value.isdigit() and len(data_value) == 4:
-                            fields['ACC'] = data_value
-                            print(f"✅ CNUM ACC: {data_value}")
-                
-                # Also search entire data line for patterns
-                for data_value in data_parts:
-                    if len(data_value) == 4 and data_value.isdigit() and 'ACC' not in fields:
-                        fields['ACC'] = data_value
-                        print(f"✅ CNUM ACC (found in data): {data_value}")
-                    
-                    # Look for ICCID with U/F character
-                    if 'ICCID' not in fields and len(data_value) >= 18:
-                        if 'U' in data_value.upper() or data_value[-1].upper() in ['U', 'F']:
-                            cleaned = re.sub(r'[^0-9A-FU]', '', data_value.upper())
-                            if len(cleaned) >= 18:
-                                fields['ICCID'] = cleaned[:20]
-                                print(f"✅ CNUM ICCID (U/F pattern): {cleaned[:20]}")
-                    
-                    # Look for KIC1/KID1 if not found yet
-                    if 'KIC1 (6F22)' not in fields:
-                        hex_match = re.search(r'([0-9A-F]{32})', data_value, re.IGNORECASE)
-                        if hex_match:
-                            fields['KIC1 (6F22)'] = hex_match.group(1)
-                            print(f"✅ CNUM KIC1 (pattern): {hex_match.group(1)}")
-                    
-                    if 'KID1 (6F22)' not in fields:
-                        hex_match = re.search(r'([0-9A-F]{32})', data_value, re.IGNORECASE)
-                        if hex_match and hex_match.group(1) != fields.get('KIC1 (6F22)', ''):
-                            fields['KID1 (6F22)'] = hex_match.group(1)
-                            print(f"✅ CNUM KID1 (pattern): {hex_match.group(1)}")
+                if 'KID1 (6F22)' not in fields:
+                    hex_match = re.search(r'([0-9A-F]{32})', data_value, re.IGNORECASE)
+                    if hex_match and hex_match.group(1) != fields.get('KIC1 (6F22)', ''):
+                        fields['KID1 (6F22)'] = hex_match.group(1)
+                        print(f"✅ CNUM KID1 (pattern): {hex_match.group(1)}")
         
-        # If standard parsing didn't work, search entire file
+        # Last resort when the layout was not recognized: search entire file
         if len(fields) < 3:
             print("⚠️  Using pattern-based CNUM parsing...")
             all_content = ' '.join([line.strip() for line in lines])
@@ -901,23 +768,23 @@ def parse_cnum_file(cnum_path):
         traceback.print_exc()
         return {}
 
-def parse_cps_file(cps_path, machine_log_values=None):
+def parse_cps_file(cps_path, machine_log_values=None, cps_index=None):
     """
     Parse cps file with 80% similarity validation.
     Returns only values that are at least 80% similar to ML values.
+    cps_index: already built CpsIndex of the file (batch mode), skips loading it.
     """
-    if not cps_path or not os.path.exists(cps_path):
+    if cps_index is None and (not cps_path or not os.path.exists(cps_path)):
         print("⚠️  cps file not provided or not found")
         return {}
     
     try:
         print(f"\n📋 PARSING cps FILE (with 80% similarity check): {cps_path}")
         
-        # Read cps content
-        with open(cps_path, 'r', encoding='utf-8', errors='ignore') as f:
-            cps_content = f.read()
+        # Index the cps content once (cached per file)
+        index = cps_index if cps_index is not None else load_cps_index(cps_path)
         
-        print(f"📊 cps file size: {len(cps_content)} characters")
+        print(f"📊 cps file size: {len(index.content)} characters")
         
         fields = {}
         
@@ -941,123 +808,42 @@ def parse_cps_file(cps_path, machine_log_values=None):
                     print(f"     Skipping - Not required for cps validation")
                     continue
                 
-                # Search for the value in cps
-                ml_upper = ml_str.upper()
-                cps_upper = cps_content.upper()
-                
                 # Try to find exact match first
-                exact_pos = cps_upper.find(ml_upper)
-                if exact_pos != -1:
-                    # Extract the exact value
-                    cps_value = cps_content[exact_pos:exact_pos+len(ml_str)]
+                cps_value = index.find_exact(ml_str)
+                if cps_value is not None:
                     fields[field_name] = cps_value
                     print(f"     ✅ Exact match found: {cps_value}")
                     continue
                 
-                # If no exact match, search for similar patterns
+                # If no exact match, search the indexed candidates for similar values
                 print(f"     No exact match found, searching for similar patterns...")
                 
-                # For ICCID: look for alphanumeric patterns (18-20 chars)
                 if field_name == "ICCID":
-                    iccid_patterns = [
-                        r'\b([0-9A-F]{18,20})\b',
-                        r'ICCID[:\s]+([0-9A-F]{18,20})',
-                        r'"([0-9A-F]{18,20})"',
-                    ]
-                    
-                    best_match = None
-                    best_similarity = 0
-                    
-                    for pattern in iccid_patterns:
-                        matches = re.findall(pattern, cps_content, re.IGNORECASE)
-                        for match in matches:
-                            similarity = calculate_similarity(ml_str, match)
-                            print(f"     Found: {match} (Similarity: {similarity:.1f}%)")
-                            
-                            if similarity > best_similarity:
-                                best_similarity = similarity
-                                best_match = match
-                    
-                    if best_match and best_similarity >= 80.0:
-                        fields[field_name] = best_match
-                        print(f"     ✅ Accepted: {best_match} ({best_similarity:.1f}% similar)")
-                    elif best_match:
-                        print(f"     ❌ Rejected: {best_match} ({best_similarity:.1f}% < 80%)")
-                    else:
-                        print(f"     ❌ No ICCID pattern found")
-                
-                # For IMSI: look for numeric patterns (15 or 18 digits)
+                    # Alphanumeric candidates (18-20 chars)
+                    family, query = "ICCID", ml_str
                 elif field_name == "IMSI":
-                    # Try multiple patterns for IMSI
-                    imsi_patterns = [
-                        r'\b(\d{15})\b',      # 15-digit IMSI
-                        r'\b(\d{18})\b',      # 18-digit IMSI
-                        r'IMSI[:\s]+(\d{15,18})',
-                        r'"(\d{15,18})"',
-                    ]
-                    
-                    best_match = None
-                    best_similarity = 0
-                    best_match_info = ""
-                    
-                    for pattern in imsi_patterns:
-                        matches = re.findall(pattern, cps_content)
-                        for match in matches:
-                            # For IMSI comparison, we need to handle both 15 and 18 digit formats
-                            ml_digits = re.sub(r'\D', '', ml_str)
-                            cps_digits = re.sub(r'\D', '', match)
-                            
-                            # Calculate similarity on numeric digits only
-                            similarity = calculate_similarity(ml_digits, cps_digits)
-                            print(f"     Found: {match} (Similarity: {similarity:.1f}%)")
-                            
-                            if similarity > best_similarity:
-                                best_similarity = similarity
-                                best_match = match
-                                best_match_info = f"Found: {match}"
-                    
-                    # Check if we found a match with sufficient similarity
-                    if best_match and best_similarity >= 80.0:
-                        fields[field_name] = best_match
-                        print(f"     ✅ Accepted: {best_match} ({best_similarity:.1f}% similar)")
-                        
-                        # Special handling for IMSI: Show the actual mismatch
-                        ml_digits = re.sub(r'\D', '', ml_str)
-                        cps_digits = re.sub(r'\D', '', best_match)
-                        
-                        if ml_digits != cps_digits:
-                            print(f"     ⚠️  Note: IMSI mismatch detected: ML={ml_digits}, cps={cps_digits}")
-                            # Store the mismatch info for later comparison
-                            fields[f"{field_name}_cps_RAW"] = best_match
-                    elif best_match:
-                        print(f"     ❌ Rejected: {best_match} ({best_similarity:.1f}% < 80%)")
-                    else:
-                        print(f"     ❌ No IMSI pattern found")
-                
-                # For hex keys (PSK, DEK1, KIC1, etc.): look for 32-char hex patterns
+                    # Numeric candidates (15 or 18 digits), compared on digits only
+                    family, query = "IMSI", re.sub(r'\D', '', ml_str)
                 elif field_name in ["PSK (6F2B)", "DEK1 (6F2B)", "KIC1 (6F22)", "KID1 (6F22)", 
                                    "KIK1 (6F22)", "KIC2 (6F22)", "KID2 (6F22)", "KIK2 (6F22)"]:
-                    hex_pattern = r'\b([0-9A-F]{32})\b'
-                    matches = re.findall(hex_pattern, cps_content, re.IGNORECASE)
-                    
-                    best_match = None
-                    best_similarity = 0
-                    
-                    for match in matches:
-                        similarity = calculate_similarity(ml_str, match)
-                        print(f"     Found: {match} (Similarity: {similarity:.1f}%)")
-                        
-                        if similarity > best_similarity:
-                            best_similarity = similarity
-                            best_match = match
-                    
-                    if best_match and best_similarity >= 80.0:
-                        fields[field_name] = best_match
-                        print(f"     ✅ Accepted: {best_match} ({best_similarity:.1f}% similar)")
-                    elif best_match:
-                        print(f"     ❌ Rejected: {best_match} ({best_similarity:.1f}% < 80%)")
-                    else:
-                        print(f"     ❌ No hex pattern found")
+                    # 32-char hex candidates
+                    family, query = "HEX32", ml_str
+                else:
+                    continue
+                
+                best_match, best_similarity = index.best_match(family, query, threshold=80.0)
+                if not best_match:
+                    print(f"     ❌ No candidate ≥80% similar ({index.sizes[family]} {family} candidates in cps)")
+                    continue
+                
+                fields[field_name] = best_match
+                print(f"     ✅ Accepted: {best_match} ({best_similarity:.1f}% similar)")
+                
+                # Special handling for IMSI: Show the actual mismatch
+                if field_name == "IMSI" and query != best_match:
+                    print(f"     ⚠️  Note: IMSI mismatch detected: ML={query}, cps={best_match}")
+                    # Store the mismatch info for later comparison
+                    fields[f"{field_name}_cps_RAW"] = best_match
         
         print(f"\n✅ cps parsing completed: {len(fields)} values found (≥80% similarity)")
         if fields:
@@ -1314,9 +1100,23 @@ def compare_generic(ml_value, external_value, comparison_type="PCOM", field_name
     return False, error_msg
 
 # ========== MAIN VALIDATION FUNCTION ==========
-def main_airtel(filepath, pcom_path=None, cnum_path=None, sim_oda_path=None, image_paths=None):
+def extract_airtel_reference_values(pcom_path=None, cnum_path=None, cps_path=None):
+    """
+    PCOM fields, CNUM fields and the cps index, which are shared by every card
+    of a lot. Pass the result to main_airtel(reference_values=...) to parse
+    them once per lot instead of once per card.
+    """
+    return {
+        "pcom_fields": parse_pcom_file(pcom_path) if pcom_path else {},
+        "cnum_fields": parse_cnum_file(cnum_path) if cnum_path else {},
+        "cps_index": load_cps_index(cps_path) if cps_path and os.path.exists(cps_path) else None,
+    }
+
+def main_airtel(filepath, pcom_path=None, cnum_path=None, sim_oda_path=None, image_paths=None,
+                reference_values=None):
     """
     Main AIRTEL validation function - UPDATED: Includes image handling
+    reference_values: result of extract_airtel_reference_values() for the same files (batch mode)
     """
     print("="*80)
     print("🚀 AIRTEL VALIDATION STARTED (with 80% cps similarity check)")
@@ -1339,25 +1139,26 @@ def main_airtel(filepath, pcom_path=None, cnum_path=None, sim_oda_path=None, ima
         
         print(f"\n📋 Machine Log values for cps search: {len(ml_values_for_search)} fields")
         
-        # Parse other files
-        pcom_fields = parse_pcom_file(pcom_path) if pcom_path else {}
-        cnum_fields = parse_cnum_file(cnum_path) if cnum_path else {}
+        # Parse other files (or reuse the values shared by the lot)
+        if reference_values is None:
+            reference_values = extract_airtel_reference_values(pcom_path, cnum_path, sim_oda_path)
+        pcom_fields = dict(reference_values["pcom_fields"])
+        cnum_fields = dict(reference_values["cnum_fields"])
         
         # Parse cps - UPDATED with 80% similarity check
         cps_fields = {}
-        if sim_oda_path and os.path.exists(sim_oda_path):
-            cps_fields = parse_cps_file(sim_oda_path, ml_values_for_search)
+        if reference_values["cps_index"] is not None:
+            cps_fields = parse_cps_file(sim_oda_path, ml_values_for_search, cps_index=reference_values["cps_index"])
         else:
             print("⚠️  cps file not provided or not found")
         
-        # Create workbook
-        wb = Workbook()
+        # Create workbook from the pre-styled skeleton (title, date, user, metadata)
+        template = airtel_report_template()
+        wb = template.new_workbook()
         ws = wb.active
-        ws.title = "Validation Report"
         
-        # Setup styles and headers with updated template
         styles = setup_excel_styles()
-        header_row = setup_excel_headers(ws, styles, filepath, pcom_path, cnum_path, sim_oda_path)
+        header_row = template.header_row  # First row after the metadata block
         
         # Add image section BEFORE validation table if images are provided
         current_row = header_row
@@ -1378,12 +1179,7 @@ def main_airtel(filepath, pcom_path=None, cnum_path=None, sim_oda_path=None, ima
         ]
         
         # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=current_row, column=col, value=header)
-            cell.fill = styles['dark_blue_fill']
-            cell.font = styles['header_font']
-            cell.border = styles['thick_border']
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+        template.write_header(ws, current_row, headers)
         
         # Fill data rows
         row = current_row + 1
@@ -1534,27 +1330,13 @@ def main_airtel(filepath, pcom_path=None, cnum_path=None, sim_oda_path=None, ima
                 overall_status
             ]
             
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col, value=str(value))
-                cell.border = styles['thick_border']
-                cell.number_format = '@'
-                
-                cell_value_str = str(value).strip()
-                
-                # Apply exact color coding from template
-                if "✅ Pass" in cell_value_str:
-                    cell.fill = styles['green_fill']  # #BDDDE9
-                elif "❌ Fail" in cell_value_str:
-                    cell.fill = styles['red_fill']    # #FF0000
-                elif "Not Found" in cell_value_str and col > 1:  # Only color data cells, not field names
-                    cell.fill = styles['yellow_fill'] # #FFFF00
-                elif cell_value_str == "NR":
-                    cell.fill = styles['yellow_fill']   # Using yellow for NR (was gray)
-                elif cell_value_str == "N/A":
-                    cell.fill = PatternFill(start_color='DDEBF7', end_color='DDEBF7', fill_type='solid')
+            template.write_row(ws, row, [str(value) for value in data])
             
             row += 1
         
+        # Pass/Fail/Not Found/NR colors of the whole table as conditional formatting
+        template.add_status_formatting(ws, current_row + 1, row - 1, len(headers))
+        
         # Add detailed errors section
         if detailed_errors:
             error_row = row + 2
@@ -0,0 +1,96 @@
+import os
+import re
+from collections import namedtuple
+
+from .pcom_parser import OPERATOR_KEYWORDS, PROFILE_KEYWORDS
+
+# Only this much of each file is read; keywords are expected in the header
+SNIFF_BYTES = 8 * 1024
+MAX_CACHED_DETECTIONS = 32
+
+Detection = namedtuple("Detection", "operator profile evidence")
+
+
+def _compile_keywords():
+    """One alternation over every keyword, longest first so 'LTE-M' wins over 'LTE'"""
+    keyword_groups = {}
+    for kind, table in (("operator", OPERATOR_KEYWORDS), ("profile", PROFILE_KEYWORDS)):
+        for group, keywords in table.items():
+            for keyword in keywords:
+                keyword_groups.setdefault(keyword.upper(), (kind, group))
+    ordered = sorted(keyword_groups, key=len, reverse=True)
+    return re.compile("|".join(re.escape(keyword) for keyword in ordered)), keyword_groups
+
+
+_KEYWORD_RE, _KEYWORD_GROUPS = _compile_keywords()
+
+_detection_cache = {}
+
+
+def scan_keywords(text):
+    """{'operator': {group: first keyword}, 'profile': {...}} of the keywords in text"""
+    hits = {"operator": {}, "profile": {}}
+    for match in _KEYWORD_RE.finditer(text.upper()):
+        keyword = match.group(0)
+        kind, group = _KEYWORD_GROUPS[keyword]
+        hits[kind].setdefault(group, keyword)
+    return hits
+
+
+def _sniff(file_path):
+    with open(file_path, 'rb') as f:
+        # latin-1 never fails and keeps the ASCII keywords intact
+        return f.read(SNIFF_BYTES).decode('latin-1')
+
+
+def _fingerprint(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return (file_path, None, None)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _decide(sources, kind):
+    """First source naming exactly one group of kind -> (group, evidence)"""
+    for source, hits in sources:
+        groups = hits[kind]
+        # A source naming several groups is ambiguous: fall through to the next one
+        if len(groups) == 1:
+            group = next(iter(groups))
+            return group, f"{source}: {groups[group]}"
+    return None, None
+
+
+def detect_operator_and_profile(pcom_path=None, machine_log_path=None, other_paths=()):
+    """
+    Guess operator (JIO/AIRTEL) and profile (MOB/WBIOT/NBIOT) from file names
+    and the first SNIFF_BYTES of the PCOM and machine log.
+
+    File names take precedence over file headers. A source with indicators of
+    more than one operator (or profile) is ignored. Results are cached by the
+    files' path, mtime and size. Returns Detection(operator, profile, evidence),
+    with None for anything that could not be decided.
+    """
+    paths = [path for path in (pcom_path, machine_log_path, *other_paths) if path]
+    key = tuple(_fingerprint(path) for path in paths)
+    cached = _detection_cache.get(key)
+    if cached:
+        return cached
+
+    sources = [("file names", scan_keywords(" ".join(os.path.basename(path) for path in paths)))]
+    for label, path in (("PCOM header", pcom_path), ("machine log header", machine_log_path)):
+        if path and os.path.isfile(path):
+            try:
+                sources.append((label, scan_keywords(_sniff(path))))
+            except OSError as e:
+                print(f"⚠️  Could not read {path}: {e}")
+
+    operator, operator_evidence = _decide(sources, "operator")
+    profile, profile_evidence = _decide(sources, "profile")
+    detection = Detection(operator, profile, [e for e in (operator_evidence, profile_evidence) if e])
+
+    if len(_detection_cache) >= MAX_CACHED_DETECTIONS:
+        _detection_cache.pop(next(iter(_detection_cache)))
+    _detection_cache[key] = detection
+    return detection
@@ -0,0 +1,190 @@
+import contextlib
+import io
+import os
+import traceback
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from log_batch import (add_batch_arguments, find_machine_logs, print_progress, run_pool,
+                       timestamped_path, worker_state)
+
+SUMMARY_HEADERS = ["Machine Log", "Status", "Error Count", "Report", "First Errors"]
+
+
+def _validate_card(log_path):
+    """Validate one machine log in a worker; the card's console output is dropped"""
+    state = worker_state
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if state["operator"] == "AIRTEL":
+                from .airtel_validation import main_airtel
+                report_path, errors = main_airtel(
+                    log_path, state["pcom_path"], state["cnum_path"], state["sim_oda_path"],
+                    state["image_paths"], reference_values=state["reference_values"]
+                )
+            else:
+                from .validation_engine import main
+                report_path, errors = main(
+                    state["profile_type"], log_path, state["pcom_path"], state["cnum_path"],
+                    state["scm_path"], state["sim_oda_path"], image_paths=state["image_paths"] or [],
+                    reference_values=state["reference_values"]
+                )
+    except Exception as e:
+        traceback.print_exc()
+        report_path, errors = None, [f"Validation error: {str(e)}"]
+
+    return {
+        "log_path": log_path,
+        "report_path": report_path,
+        "errors": [str(error) for error in errors or []],
+    }
+
+
+def run_batch_validation(log_folder, pcom_path, cnum_path, scm_path=None, sim_oda_path=None,
+                         profile_type="MOB", operator="JIO", workers=None, image_paths=None,
+                         summary_path=None):
+    """
+    Validate every machine log in log_folder against the same reference files.
+
+    The PCOM/CNUM/SCM/SIM ODA values (for AIRTEL: PCOM, CNUM and the cps
+    index) are extracted once and shared with a pool of worker processes,
+    one report is written per card, and a summary workbook lists the result
+    of every card. Returns (summary_path, results).
+    """
+    logs = find_machine_logs(log_folder, exclude=(pcom_path, cnum_path, scm_path, sim_oda_path))
+    print(f"📁 Batch validation: {len(logs)} machine logs in {log_folder}")
+    if not logs:
+        return None, []
+
+    state = {
+        "operator": operator,
+        "profile_type": profile_type,
+        "pcom_path": pcom_path,
+        "cnum_path": cnum_path,
+        "scm_path": scm_path,
+        "sim_oda_path": sim_oda_path,
+        "image_paths": image_paths,
+        "reference_values": None,
+    }
+    if operator == "AIRTEL":
+        from .airtel_validation import extract_airtel_reference_values
+        print("📋 Parsing PCOM and CNUM and indexing the cps file once for all cards...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            state["reference_values"] = extract_airtel_reference_values(pcom_path, cnum_path, sim_oda_path)
+    else:
+        from .validation_engine import extract_reference_values
+        print("📋 Extracting reference values (PCOM, CNUM, SCM, SIM ODA) once for all cards...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            state["reference_values"] = extract_reference_values(
+                profile_type, pcom_path, cnum_path, scm_path, sim_oda_path
+            )
+
+    results = run_pool(_validate_card, logs, state, workers=workers, on_result=_report_progress)
+
+    summary_path = write_batch_summary(results, summary_path or _default_summary_path(log_folder))
+    passed = sum(1 for result in results if _card_status(result) == "PASS")
+    print(f"✅ Batch complete: {passed}/{len(results)} cards passed. Summary: {summary_path}")
+    return summary_path, results
+
+
+def _report_progress(result, index, total):
+    print_progress(index, total, result["log_path"], _card_status(result), f"{len(result['errors'])} errors")
+
+
+def _card_status(result):
+    if not result["report_path"]:
+        return "ERROR"
+    return "FAIL" if result["errors"] else "PASS"
+
+
+def _default_summary_path(log_folder):
+    return timestamped_path(log_folder, "First_Card_Batch_Summary_", ".xlsx")
+
+
+def write_batch_summary(results, summary_path):
+    """Consolidated workbook: one row per card with a link to its report"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Batch Summary"
+
+    header_fill = PatternFill(start_color='002060', end_color='002060', fill_type='solid')
+    fills = {
+        "PASS": PatternFill(start_color='BDDDE9', end_color='BDDDE9', fill_type='solid'),
+        "FAIL": PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid'),
+        "ERROR": PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid'),
+    }
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    ws.append(SUMMARY_HEADERS)
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = Font(color='FFFFFF', bold=True)
+        cell.border = border
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+
+    for result in results:
+        status = _card_status(result)
+        ws.append([
+            os.path.basename(result["log_path"]),
+            status,
+            len(result["errors"]),
+            result["report_path"] or "",
+            "; ".join(result["errors"][:3]),
+        ])
+        row = ws.max_row
+        for cell in ws[row]:
+            cell.border = border
+        ws.cell(row=row, column=2).fill = fills[status]
+        if result["report_path"]:
+            ws.cell(row=row, column=4).hyperlink = result["report_path"]
+            ws.cell(row=row, column=4).style = "Hyperlink"
+
+    ws.append([])
+    passed = sum(1 for result in results if _card_status(result) == "PASS")
+    ws.append(["TOTAL", f"{passed}/{len(results)} passed"])
+    ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+
+    for col_idx, width in enumerate([40, 12, 12, 60, 80], 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    ws.freeze_panes = "A2"
+
+    wb.save(summary_path)
+    return summary_path
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch first-card validation over a folder of machine logs")
+    add_batch_arguments(parser)
+    parser.add_argument("--operator", choices=["JIO", "AIRTEL", "AUTO"], default="JIO")
+    parser.add_argument("--profile", choices=["MOB", "WBIOT", "NBIOT", "AUTO"], default="MOB")
+    parser.add_argument("--pcom", required=True)
+    parser.add_argument("--cnum", required=True)
+    parser.add_argument("--scm", default=None)
+    parser.add_argument("--sim-oda", default=None, help="SIM ODA file (cps file for AIRTEL)")
+    args = parser.parse_args(argv)
+
+    if "AUTO" in (args.operator, args.profile):
+        from .auto_detect import detect_operator_and_profile
+        logs = find_machine_logs(args.log_folder)
+        detection = detect_operator_and_profile(args.pcom, logs[0] if logs else None, [args.cnum])
+        if args.operator == "AUTO":
+            args.operator = detection.operator or "JIO"
+        if args.profile == "AUTO":
+            args.profile = detection.profile or "MOB"
+        print(f"🔍 Auto-detected operator {args.operator}, profile {args.profile} "
+              f"({', '.join(detection.evidence) or 'no indicators, using defaults'})")
+
+    run_batch_validation(
+        args.log_folder, args.pcom, args.cnum, args.scm, args.sim_oda,
+        profile_type=args.profile, operator=args.operator, workers=args.workers,
+        summary_path=args.summary
+    )
+
+
+if __name__ == "__main__":
+    main()
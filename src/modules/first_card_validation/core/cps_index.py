@@ -0,0 +1,147 @@
+import os
+import re
+from difflib import SequenceMatcher
+
+# Candidate patterns per value family, in the order parse_cps_file tries them
+CANDIDATE_PATTERNS = {
+    "ICCID": [
+        (r'\b([0-9A-F]{18,20})\b', re.IGNORECASE),
+        (r'ICCID[:\s]+([0-9A-F]{18,20})', re.IGNORECASE),
+        (r'"([0-9A-F]{18,20})"', re.IGNORECASE),
+    ],
+    "IMSI": [
+        (r'\b(\d{15})\b', 0),
+        (r'\b(\d{18})\b', 0),
+        (r'IMSI[:\s]+(\d{15,18})', 0),
+        (r'"(\d{15,18})"', 0),
+    ],
+    "HEX32": [
+        (r'\b([0-9A-F]{32})\b', re.IGNORECASE),
+    ],
+}
+
+
+class _Candidate:
+    __slots__ = ("order", "value", "upper", "masks")
+
+    def __init__(self, order, value):
+        self.order = order
+        self.value = value
+        self.upper = value.strip().upper()
+        self.masks = {}
+        for position, char in enumerate(self.upper):
+            self.masks[char] = self.masks.get(char, 0) | (1 << position)
+
+
+def _can_reach(matches, total, threshold):
+    """True if 2 * matches / total can still be >= threshold percent"""
+    return 200 * matches >= threshold * total
+
+
+def _lcs_length(query, masks, length):
+    """
+    Length of the longest common subsequence of query and a candidate.
+
+    Bit-parallel LCS: masks[char] has bit i set where the candidate has char
+    at position i, so each query character costs a few integer operations.
+    """
+    all_bits = (1 << length) - 1
+    row = all_bits
+    for char in query:
+        matches = row & masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & all_bits
+    return length - bin(row).count('1')
+
+
+class CpsIndex:
+    """
+    Candidate index of one cps file.
+
+    Every pattern of CANDIDATE_PATTERNS is run once over the file; the
+    distinct candidates are kept per family in file order and bucketed by
+    length. best_match() only computes the exact SequenceMatcher similarity
+    for candidates whose upper bounds (length, then longest common
+    subsequence) can reach the threshold, best bound first, so its decisions
+    are identical to scoring every candidate.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.content_upper = content.upper()
+        self.families = {}   # family -> {length: [_Candidate, ...]}
+        self.sizes = {}      # family -> number of distinct candidates
+        for family, patterns in CANDIDATE_PATTERNS.items():
+            seen = {}
+            for pattern, flags in patterns:
+                for match in re.findall(pattern, content, flags):
+                    if match not in seen:
+                        seen[match] = _Candidate(len(seen), match)
+            buckets = {}
+            for candidate in seen.values():
+                buckets.setdefault(len(candidate.upper), []).append(candidate)
+            self.families[family] = buckets
+            self.sizes[family] = len(seen)
+
+    def find_exact(self, value):
+        """Case-insensitive first occurrence of value in the file, or None"""
+        value = str(value).strip()
+        pos = self.content_upper.find(value.upper())
+        if pos == -1:
+            return None
+        return self.content[pos:pos + len(value)]
+
+    def best_match(self, family, value, threshold=80.0):
+        """
+        (candidate, similarity %) of the most similar candidate of family,
+        or (None, 0) when no candidate can reach threshold. Ties keep the
+        candidate found first, like a linear scan.
+        """
+        query = str(value).strip().upper()
+        length = len(query)
+        if not length:
+            return None, 0
+
+        # (similarity upper bound, candidate) of candidates that can reach threshold
+        survivors = []
+        for cand_length, bucket in self.families.get(family, {}).items():
+            total = length + cand_length
+            if not _can_reach(min(length, cand_length), total, threshold):
+                continue
+            # Smallest number of matching characters that reaches threshold
+            needed = int(-(-threshold * total // 200))
+            for candidate in bucket:
+                lcs = _lcs_length(query, candidate.masks, cand_length)
+                if lcs >= needed:
+                    # Same arithmetic as SequenceMatcher.ratio() * 100
+                    survivors.append((2.0 * lcs / total * 100, candidate))
+
+        # Highest bounds first; stop once no bound can beat the best similarity
+        survivors.sort(key=lambda item: (-item[0], item[1].order))
+        best, best_similarity, best_order = None, 0, None
+        for bound, candidate in survivors:
+            if bound < best_similarity:
+                break
+            similarity = SequenceMatcher(None, query, candidate.upper).ratio() * 100
+            if similarity > best_similarity or (similarity == best_similarity and candidate.order < best_order):
+                best, best_similarity, best_order = candidate.value, similarity, candidate.order
+        if best_similarity < threshold:
+            return None, 0
+        return best, best_similarity
+
+
+_index_cache = {}
+
+
+def load_cps_index(cps_path):
+    """Index a cps file once; cached until the file's mtime or size changes"""
+    stat = os.stat(cps_path)
+    key = os.path.abspath(cps_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _index_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(cps_path, 'r', encoding='utf-8', errors='ignore') as f:
+        index = CpsIndex(f.read())
+    _index_cache[key] = (signature, index)
+    return index
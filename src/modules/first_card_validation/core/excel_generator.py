@@ -1,6 +1,5 @@
 import os
 import re
-import win32com.client as win32
 from openpyxl import Workbook
 from openpyxl.styles import Border, Side, PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
@@ -8,7 +7,11 @@ from openpyxl.drawing.image import Image as ExcelImage
 import getpass
 from datetime import datetime
 
+from .image_thumbnails import prepare_report_image
+from sim_codec import swap_pairs
+
 # def protect_excel_file(filepath, password):
+#     import win32com.client as win32  # Windows only; imported when protection is used
 #     excel = win32.gencache.EnsureDispatch('Excel.Application')
 #     excel.DisplayAlerts = False
 #     wb = excel.Workbooks.Open(filepath)
@@ -20,9 +23,10 @@ from datetime import datetime
 def insert_image(ws, image_path, cell_location):
     try:
         print(f"Inserting image at {cell_location} from path: {image_path}")
-        img = ExcelImage(image_path)  # For openpyxl image insertion
-        img.width = 300  # Set image width (optional)
-        img.height = 200  # Set image height (optional)
+        width, height = 300, 200
+        img = ExcelImage(prepare_report_image(image_path, width, height))  # Resized copy, not the full photo
+        img.width = width  # Set image width (optional)
+        img.height = height  # Set image height (optional)
         ws.add_image(img, cell_location)  # Insert the image into the worksheet
         print(f"Image inserted at {cell_location}")
     except Exception as e:
@@ -41,13 +45,8 @@ def save_report(wb, ml_path, pcom_path):
         else:
             raw_number = base_name
 
-        # --- Pairwise swap each 2 digits ---
-        swapped_number = ""
-        for i in range(0, len(raw_number), 2):
-            if i + 1 < len(raw_number):
-                swapped_number += raw_number[i+1] + raw_number[i]
-            else:
-                swapped_number += raw_number[i]  # last digit if odd length
+        # --- Pairwise swap each 2 digits (last digit kept if odd length) ---
+        swapped_number = swap_pairs(raw_number)
 
         # Create final report name
         report_name = f"{swapped_number}_Validation_Report.xlsx"
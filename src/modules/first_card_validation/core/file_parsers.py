@@ -1,3 +1,5 @@
+import io
+import os
 import re
 import csv
 
@@ -37,27 +39,82 @@ def extract_from_pcom(file_path, line_num, pattern):
         print(f"Error extracting from PCOM: {e}")
     return None
 
+class TsvTable:
+    """
+    Tab-separated file read once, with line access (1-based lines).
+
+    Lines are parsed lazily up to the one requested, so a decode error past
+    that line does not fail the lookup; the error is raised again for any
+    line after it.
+    """
+
+    _cache = {}
+    _max_cached = 32
+
+    def __init__(self, file_path, data, encoding, signature):
+        self.file_path = file_path
+        self.signature = signature
+        self.rows = []
+        self._reader = csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding=encoding), delimiter='\t')
+        self._error = None
+
+    @staticmethod
+    def _signature(file_path):
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def load(cls, file_path, encoding='utf-8'):
+        """Return the cached table for file_path, re-reading it if the file changed"""
+        key = (os.path.abspath(file_path), encoding)
+        signature = cls._signature(file_path)
+        table = cls._cache.get(key)
+        if table is None or table.signature != signature:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            table = cls(file_path, data, encoding, signature)
+            cls._cache.pop(key, None)
+            if len(cls._cache) >= cls._max_cached:
+                cls._cache.pop(next(iter(cls._cache)))  # drop the oldest file
+            cls._cache[key] = table
+        return table
+
+    def row(self, line_num):
+        """Fields of line line_num, or None past the end of the file"""
+        while len(self.rows) < line_num and self._reader is not None:
+            if self._error is not None:
+                raise self._error
+            try:
+                self.rows.append(next(self._reader))
+            except StopIteration:
+                self._reader = None
+            except Exception as e:
+                self._error = e
+                raise
+        if 1 <= line_num <= len(self.rows):
+            return self.rows[line_num - 1]
+        return None
+
 def extract_from_cnum(file_path, line_num, col_idx, special_logic=False):
     """Extract value from CNUM file with optional special logic."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter='\t')
-            for i, row in enumerate(reader):
-                if i == line_num - 1:  # Correcting for 0-indexed row
-                    if col_idx < len(row):  # Ensure column exists
-                        value = row[col_idx].strip()
-                        
-                        # Debugging print to verify what's in that column
-                        print(f"Line {i + 1}, Column {col_idx}: {value}")  # Debugging print
+        table = TsvTable.load(file_path)
+        row = table.row(line_num)
+        if row is not None:
+            if col_idx < len(row):  # Ensure column exists
+                value = row[col_idx].strip()
+
+                # Debugging print to verify what's in that column
+                print(f"Line {line_num}, Column {col_idx}: {value}")  # Debugging print
 
-                        # Apply special logic: Only take the first value if multiple are found
-                        if special_logic:
-                            values = value.split()
-                            print(f"Special logic applied, first value: {values[0]}")  # Debugging print
-                            return values[0] if values else None
-                        return value
-                    else:
-                        print(f"Column {col_idx} out of bounds for row {i + 1}.")
+                # Apply special logic: Only take the first value if multiple are found
+                if special_logic:
+                    values = value.split()
+                    print(f"Special logic applied, first value: {values[0]}")  # Debugging print
+                    return values[0] if values else None
+                return value
+            else:
+                print(f"Column {col_idx} out of bounds for row {line_num}.")
     except Exception as e:
         print(f"Error extracting from CNUM: {e}")
     return None
@@ -65,50 +122,13 @@ def extract_from_cnum(file_path, line_num, col_idx, special_logic=False):
 def extract_from_scm(file_path, line_num, col_idx):
     """Extract value from SCM file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter='\t')  # Using tab delimiter
-            for i, row in enumerate(reader):
-                if i == line_num - 1:  # Ensure we are at the correct line
-                    if col_idx < len(row):  # Ensure column index is valid
-                        return row[col_idx].strip()  # Return the value at the specified column
-                    else:
-                        print(f"Error: Column {col_idx} out of bounds on line {i + 1}")
+        table = TsvTable.load(file_path)
+        row = table.row(line_num)
+        if row is not None:
+            if col_idx < len(row):  # Ensure column index is valid
+                return row[col_idx].strip()  # Return the value at the specified column
+            else:
+                print(f"Error: Column {col_idx} out of bounds on line {line_num}")
     except Exception as e:
         print(f"Error: {e}")
     return None
-
-def extract_multiple_keys(file_path, pattern):
-    """Extract all matching values from SIM ODA file using the pattern."""
-    matches = []
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                match = re.search(pattern, line.strip())
-                if match:
-                    matches.append(match.group(1))
-    except Exception as e:
-        print(f"Error reading SIM ODA file: {e}")
-    return matches
-
-def extract_from_sim_oda(file_path, base_line_num, pattern, search_range=2, fallback=False):
-    """Extract value from SIM ODA file by searching around the base line number, with optional full-file fallback."""
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        # Search ±search_range lines around base_line_num
-        start = max(0, base_line_num - search_range - 1)
-        end = min(len(lines), base_line_num + search_range)
-        for i in range(start, end):
-            line = lines[i].strip()
-            match = re.search(pattern, line)
-            if match:
-                return match.group(1)
-        # If not found, do full file scan (optional)
-        if fallback:
-            for line in lines:
-                match = re.search(pattern, line.strip())
-                if match:
-                    return match.group(1)
-    except Exception as e:
-        print(f"Error reading file: {e}")
-    return None
\ No newline at end of file
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import tempfile
+
+try:
+    from PIL import Image as PILImage, ImageOps
+    PIL_SUPPORT = True
+except ImportError:
+    PIL_SUPPORT = False
+
+THUMBNAIL_CACHE_DIR = os.path.join(tempfile.gettempdir(), "first_card_thumbnails")
+# Thumbnails keep this many pixels per displayed pixel so labels stay readable when zoomed
+THUMBNAIL_SCALE = 2
+THUMBNAIL_QUALITY = 85
+
+
+def _file_digest(image_path):
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def prepare_report_image(image_path, width, height):
+    """
+    Path of a JPEG resized to the displayed width x height (times THUMBNAIL_SCALE).
+
+    Thumbnails are cached by source content hash and size. The original path is
+    returned when Pillow is missing or the image cannot be converted.
+    """
+    if not PIL_SUPPORT:
+        return image_path
+    try:
+        box = (int(width * THUMBNAIL_SCALE), int(height * THUMBNAIL_SCALE))
+        thumb_path = os.path.join(
+            THUMBNAIL_CACHE_DIR, f"{_file_digest(image_path)}_{box[0]}x{box[1]}.jpg"
+        )
+        if os.path.exists(thumb_path):
+            return thumb_path
+
+        with PILImage.open(image_path) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            # Same stretch to the display box as the full-size image had
+            img = img.resize(box, PILImage.LANCZOS)
+
+            os.makedirs(THUMBNAIL_CACHE_DIR, exist_ok=True)
+            # Own temp file per call: batch workers make the same thumbnails at once
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=THUMBNAIL_CACHE_DIR)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    img.save(f, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+                os.replace(tmp_path, thumb_path)
+            except Exception:
+                _remove_quietly(tmp_path)
+                # Another process may have written the same thumbnail first
+                if not os.path.exists(thumb_path):
+                    raise
+        return thumb_path
+    except Exception as e:
+        print(f"⚠️  Could not create thumbnail for {image_path}: {e}")
+        return image_path
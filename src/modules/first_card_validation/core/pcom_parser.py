@@ -0,0 +1,125 @@
+import os
+import re
+
+# Profile indicators looked for in PCOM file names and content
+PROFILE_KEYWORDS = {
+    "MOB": ["MOB", "MOBILE", "MOBILITY", "4G", "LTE", "GSM", "CAT1", "CAT 1", "CAT-1"],
+    "WBIOT": ["WBIOT", "WB-IOT", "WB IOT", "WIDE BAND", "WIDEBAND", "CAT-M1", "CAT M1", "CAT-M", "LTE-M", "CATM1", "CAT-M2"],
+    "NBIOT": ["NBIOT", "NB-IOT", "NB IOT", "NARROW BAND", "NARROWBAND", "CAT-NB", "CAT NB", "CAT-N", "NB1", "CAT-NB1", "CAT-NB2"]
+}
+
+# Operator indicators looked for in file names and PCOM content
+OPERATOR_KEYWORDS = {
+    "AIRTEL": ["AIRTEL", "BHARTI", "VODAFONE", "IDEA"],
+    "JIO": ["JIO", "RELIANCE", "RJIL"],
+}
+
+_DEFINE_RE = re.compile(r'\.DEFINE\s+%(\w+)[ \t]+([^\r\n]*)', re.IGNORECASE)
+# The value ends at whitespace or '=', so every NAME = value of a line is recorded
+_ASSIGN_RE = re.compile(r'(\w+)[ \t]*=[ \t]*([^\s=]*)')
+
+MAX_CACHED_SYMBOL_TABLES = 16
+
+
+class PcomSymbols:
+    """Symbol table of one PCOM file: .DEFINE %NAME value and NAME = value lines"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.defines = {}      # NAME -> [(line, value), ...] in file order
+        self.assignments = []  # (line, NAME, value) in file order
+        self.profile_keywords = set()
+        self.operator_keywords = set()
+        self.has_content = False
+
+    def parse(self, content):
+        self.has_content = bool(content)
+        for line_no, line in enumerate(content.split('\n')):
+            if '.' in line:
+                match = _DEFINE_RE.search(line)
+                if match:
+                    name = match.group(1).upper()
+                    self.defines.setdefault(name, []).append((line_no, match.group(2)))
+            if '=' in line:
+                for match in _ASSIGN_RE.finditer(line):
+                    self.assignments.append((line_no, match.group(1).upper(), match.group(2)))
+
+        content_upper = content.upper()
+        for keywords in PROFILE_KEYWORDS.values():
+            for keyword in keywords:
+                if keyword in content_upper:
+                    self.profile_keywords.add(keyword)
+        for keywords in OPERATOR_KEYWORDS.values():
+            for keyword in keywords:
+                if keyword in content_upper:
+                    self.operator_keywords.add(keyword)
+        return self
+
+    def define(self, name, value_pattern=r'([0-9A-Fa-f]+)', flags=re.IGNORECASE):
+        """First value of .DEFINE %name whose text matches value_pattern"""
+        for _, value in self.defines.get(name.upper(), ()):
+            match = re.match(value_pattern, value, flags)
+            if match:
+                return match.group(1)
+        return None
+
+    def assignment(self, name, value_pattern=r'([0-9A-Fa-f]+)', flags=re.IGNORECASE):
+        """First value of an assignment to name (or a name ending in it)"""
+        name = name.upper()
+        for _, assigned_name, value in self.assignments:
+            if assigned_name.endswith(name):
+                match = re.match(value_pattern, value, flags)
+                if match:
+                    return match.group(1)
+        return None
+
+    def resolve(self, lookups):
+        """First hit of ('define'|'assign', name, value_pattern) lookups, in order"""
+        for kind, name, value_pattern in lookups:
+            if kind == 'define':
+                value = self.define(name, value_pattern)
+            else:
+                value = self.assignment(name, value_pattern)
+            if value is not None:
+                return value
+        return None
+
+    def profiles_in_content(self):
+        """Profiles with a keyword in the content, with the first keyword found for each"""
+        found = []
+        for profile_type, keywords in PROFILE_KEYWORDS.items():
+            for keyword in keywords:
+                if keyword in self.profile_keywords:
+                    found.append((profile_type, keyword))
+                    break
+        return found
+
+    def operators_in_content(self):
+        """Operators with a keyword anywhere in the content, with the first keyword found for each"""
+        found = []
+        for operator, keywords in OPERATOR_KEYWORDS.items():
+            for keyword in keywords:
+                if keyword in self.operator_keywords:
+                    found.append((operator, keyword))
+                    break
+        return found
+
+
+_symbol_cache = {}
+
+
+def load_pcom_symbols(file_path):
+    """Parse a PCOM file once; cached until the file's mtime or size changes"""
+    stat = os.stat(file_path)
+    key = os.path.abspath(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _symbol_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        symbols = PcomSymbols(file_path).parse(f.read())
+    if key not in _symbol_cache and len(_symbol_cache) >= MAX_CACHED_SYMBOL_TABLES:
+        _symbol_cache.pop(next(iter(_symbol_cache)))
+    _symbol_cache[key] = (signature, symbols)
+    return symbols
@@ -1,7 +1,21 @@
+import hashlib
+import json
+import multiprocessing
+import os
 import re
-import cv2
+import tempfile
 import xml.etree.ElementTree as ET
 
+# Longest image side tried first; larger levels are only decoded when smaller ones fail
+QR_PYRAMID_SIDES = (1000, 2000)
+QR_CACHE_DIR = os.path.join(tempfile.gettempdir(), "first_card_qr_cache")
+QR_CACHE_VERSION = 1
+
+# cv2 and numpy are imported inside the decoding functions, so importing the
+# validation engine does not load OpenCV until a label image is decoded
+
+_payload_cache = {}
+
 def clean_xml_string(xml_str):
     xml_str = re.sub(r'<(/?)(\w+)\s+(\w+)>', r'<\1\2_\3>', xml_str)
     xml_str = re.sub(r'<\?xml.*?\?>', '', xml_str)
@@ -9,18 +23,134 @@ def clean_xml_string(xml_str):
     xml_str = xml_str.strip()
     return f"<root>{xml_str}</root>"
 
-def process_qr_code_wbiot(image_path):
-    img = cv2.imread(image_path)
+def _pyramid(img):
+    """Downscaled copies of img (smallest first), ending with the full image"""
+    import cv2
+    height, width = img.shape[:2]
+    longest = max(height, width)
+    for side in QR_PYRAMID_SIDES:
+        if side < longest:
+            scale = side / longest
+            yield cv2.resize(img, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    yield img
+
+def _decode_image(img, mode):
+    """Run the QR detector over the pyramid; returns the payload or ''"""
+    import cv2
+    detector = cv2.QRCodeDetector()
+    for level in _pyramid(img):
+        if mode == "wbiot":
+            gray = cv2.cvtColor(level, cv2.COLOR_BGR2GRAY)
+            _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+            candidates = (thresh, gray)
+        else:
+            candidates = (level,)
+        for candidate in candidates:
+            data, _, _ = detector.detectAndDecode(candidate)
+            if data:
+                return data
+    return ""
+
+def _cache_file(key):
+    return os.path.join(QR_CACHE_DIR, f"{key}.json")
+
+def _cache_key(content, mode):
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{digest}_{mode}_v{QR_CACHE_VERSION}"
+
+def _load_cached(key):
+    if key in _payload_cache:
+        return _payload_cache[key]
+    try:
+        with open(_cache_file(key), 'r', encoding='utf-8') as f:
+            payload = json.load(f)["payload"]
+    except (OSError, ValueError, KeyError):
+        return None
+    _payload_cache[key] = payload
+    return payload
+
+def _store_cached(key, payload):
+    _payload_cache[key] = payload
+    tmp_path = None
+    try:
+        os.makedirs(QR_CACHE_DIR, exist_ok=True)
+        # Own temp file per call: batch workers decode the same label images at once
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=QR_CACHE_DIR)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"payload": payload}, f)
+        os.replace(tmp_path, _cache_file(key))
+    except OSError as e:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        # Another process may have written the same entry first
+        if not os.path.exists(_cache_file(key)):
+            print(f"Could not write QR cache: {e}")
+
+def _read_image_bytes(image_path):
+    try:
+        with open(image_path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _decode_task(args):
+    """Pool task: decode one image's bytes; None if they are not an image"""
+    import cv2
+    import numpy as np
+    content, mode = args
+    img = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
     if img is None:
+        return None
+    return _decode_image(img, mode)
+
+def decode_qr_payload(image_path, mode="wbiot"):
+    """QR payload of an image ('' if none, None if unreadable), cached by content hash"""
+    content = _read_image_bytes(image_path)
+    if content is None:
+        return None
+    key = _cache_key(content, mode)
+    payload = _load_cached(key)
+    if payload is None:
+        payload = _decode_task((content, mode))
+        if payload is None:
+            return None
+        _store_cached(key, payload)
+    return payload
+
+def prefetch_qr_payloads(image_paths, mode="wbiot", workers=None):
+    """Decode all uncached images in a process pool so later lookups hit the cache"""
+    pending = {}
+    for image_path in image_paths:
+        if not image_path or not os.path.isfile(image_path):
+            continue
+        content = _read_image_bytes(image_path)
+        if content is None:
+            continue
+        key = _cache_key(content, mode)
+        if _load_cached(key) is None and key not in pending:
+            pending[key] = content
+
+    if len(pending) < 2:
+        return  # Nothing to gain from a pool; decode_qr_payload handles it
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    keys = list(pending)
+    tasks = [(pending[key], mode) for key in keys]
+    if workers == 1 or multiprocessing.current_process().daemon:
+        # Pool workers (batch validation) are daemonic and cannot start a pool
+        payloads = [_decode_task(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            payloads = pool.map(_decode_task, tasks)
+    for key, payload in zip(keys, payloads):
+        if payload is not None:
+            _store_cached(key, payload)
+
+def process_qr_code_wbiot(image_path):
+    data = decode_qr_payload(image_path, "wbiot")
+    if data is None:
         print(f"Image not found or unreadable: {image_path}")
         return {}
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-    detector = cv2.QRCodeDetector()
-    data, bbox, _ = detector.detectAndDecode(thresh)
-    if not data:
-        data, bbox, _ = detector.detectAndDecode(gray)
     if data:
         print("QR Code data found:", data)
         try:
@@ -35,9 +165,7 @@ def process_qr_code_wbiot(image_path):
 
 def process_qr_code_mob(image_path):
     try:
-        image = cv2.imread(image_path)
-        detector = cv2.QRCodeDetector()
-        value, pts, _ = detector.detectAndDecode(image)
+        value = decode_qr_payload(image_path, "mob")
 
         if value:
             value = re.sub(r'^\s*<\?xml.*\?>\s*', '', value)
@@ -0,0 +1,135 @@
+from openpyxl import Workbook
+from openpyxl.formatting.rule import Rule
+from openpyxl.styles import Alignment, Border, NamedStyle, PatternFill, Side
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.utils import get_column_letter
+
+# First row of the metadata block written by setup_excel_headers
+META_FIRST_ROW = 4
+
+CELL_STYLE = "report_cell"
+HEADER_STYLE = "report_header"
+
+
+def header_row_after(meta_labels):
+    """Table header row below a metadata block of these labels and two spacing rows"""
+    return META_FIRST_ROW + len(meta_labels) + 2
+
+
+class ReportTemplate:
+    """
+    Pre-styled report layout, set up once per process.
+
+    build_skeleton(ws) writes the header block into a new worksheet and
+    returns the row of the table header below it (header_row). Every report
+    workbook also gets the named cell styles, so table cells take one named
+    style each. Status colors are conditional formatting rules (text, kind,
+    fill, first column) evaluated by Excel instead of per-cell fills: kind
+    is 'contains' (case-sensitive), 'equals' or 'one_of' (list of texts,
+    trimmed and case-insensitive).
+    """
+
+    def __init__(self, build_skeleton, header_fill, header_font, status_rules):
+        self.build_skeleton = build_skeleton
+        self.header_fill = header_fill
+        self.header_font = header_font
+        self.status_rules = status_rules
+        thick = Side(style='thick')
+        self.thick_border = Border(left=thick, right=thick, top=thick, bottom=thick)
+        self.header_alignment = Alignment(horizontal='center', vertical='center')
+        self.header_row = None  # Set by the first new_workbook()
+
+    def new_workbook(self):
+        """Workbook with the filled-in skeleton on its "Validation Report" sheet"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Validation Report"
+        self.header_row = self.build_skeleton(ws)
+
+        # Named styles are bound to one workbook, so each report gets its own
+        wb.add_named_style(NamedStyle(name=CELL_STYLE, border=self.thick_border, number_format='@'))
+        wb.add_named_style(NamedStyle(
+            name=HEADER_STYLE, fill=self.header_fill, font=self.header_font,
+            border=self.thick_border, alignment=self.header_alignment
+        ))
+        return wb
+
+    @staticmethod
+    def write_header(ws, row, headers):
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=row, column=col, value=header)
+            cell.style = HEADER_STYLE
+
+    @staticmethod
+    def write_row(ws, row, values):
+        for col, value in enumerate(values, 1):
+            cell = ws.cell(row=row, column=col, value=value)
+            cell.style = CELL_STYLE
+
+    def add_status_formatting(self, ws, first_row, last_row, last_col):
+        """Color the status table rows first_row..last_row with the template's rules"""
+        if last_row < first_row:
+            return
+        # Rules are added in priority order; stopIfTrue keeps the first match only
+        for text, kind, fill, first_col in self.status_rules:
+            top_left = f"{get_column_letter(first_col)}{first_row}"
+            if kind == 'contains':
+                formula = f'ISNUMBER(FIND("{text}",{top_left}))'
+            elif kind == 'equals':
+                formula = f'EXACT(TRIM({top_left}),"{text}")'
+            else:
+                formula = "OR(" + ",".join(f'UPPER(TRIM({top_left}))="{item}"' for item in text) + ")"
+            rule = Rule(type='expression', dxf=DifferentialStyle(fill=fill), formula=[formula], stopIfTrue=True)
+            cell_range = f"{top_left}:{get_column_letter(last_col)}{last_row}"
+            ws.conditional_formatting.add(cell_range, rule)
+
+
+def _status_fill(color):
+    # Conditional formats apply bgColor for solid fills
+    return PatternFill(bgColor=color, fill_type='solid')
+
+
+_templates = {}
+
+
+def jio_report_template():
+    """Template of validation_engine's JIO report (one per process)"""
+    if "JIO" not in _templates:
+        from .excel_generator import setup_excel_headers, setup_excel_styles
+
+        styles = setup_excel_styles()
+        _templates["JIO"] = ReportTemplate(
+            lambda ws: header_row_after(setup_excel_headers(ws, styles)),
+            header_fill=styles['dark_blue_fill'],
+            header_font=styles['header_font'],
+            status_rules=[
+                ("Pass", 'contains', _status_fill('00FF00'), 1),
+                ("Fail", 'contains', _status_fill('FF0000'), 1),
+                (["NR", "N/A"], 'one_of', _status_fill('FFFF00'), 1),
+            ],
+        )
+    return _templates["JIO"]
+
+
+def airtel_report_template():
+    """Template of main_airtel's report (one per process)"""
+    if "AIRTEL" not in _templates:
+        try:
+            from .airtel_validation import setup_excel_headers, setup_excel_styles
+        except ImportError:
+            from airtel_validation import setup_excel_headers, setup_excel_styles
+
+        styles = setup_excel_styles()
+        _templates["AIRTEL"] = ReportTemplate(
+            lambda ws: setup_excel_headers(ws, styles, None, None, None, None),
+            header_fill=styles['dark_blue_fill'],
+            header_font=styles['header_font'],
+            status_rules=[
+                ("✅ Pass", 'contains', _status_fill('BDDDE9'), 1),
+                ("❌ Fail", 'contains', _status_fill('FF0000'), 1),
+                ("Not Found", 'contains', _status_fill('FFFF00'), 2),
+                ("NR", 'equals', _status_fill('FFFF00'), 1),
+                ("N/A", 'equals', _status_fill('DDEBF7'), 1),
+            ],
+        )
+    return _templates["AIRTEL"]
@@ -0,0 +1,86 @@
+import re
+from collections import namedtuple
+
+# Typed SIM ODA records, in file order (line is 1-based)
+Iccid = namedtuple('Iccid', ['line', 'value', 'args'])
+Imsi = namedtuple('Imsi', ['line', 'value'])
+SecurityKey = namedtuple('SecurityKey', ['line', 'role', 'value', 'args'])
+
+SECURITY_KEY_ROLES = ('Encryption', 'Authentication', 'PskTls', 'Management')
+
+_RECORD_RE = re.compile(r'\b(Iccid|Imsi|SecurityKey)\(([^)]*)\)')
+_HEX_RE = re.compile(r'[0-9A-Fa-f]+$')
+
+
+def _clean(arg):
+    return arg.strip().strip('"')
+
+
+def _parse_record(line_no, line):
+    """Typed record for one SIM ODA line, or None if the line holds no data record"""
+    match = _RECORD_RE.search(line)
+    if not match:
+        return None
+    kind = match.group(1)
+    args = [_clean(arg) for arg in match.group(2).split(',')]
+
+    if kind == 'SecurityKey':
+        for i, arg in enumerate(args[:-1]):
+            if arg in SECURITY_KEY_ROLES:
+                value = args[i + 1]
+                return SecurityKey(line_no, arg, value, args) if _HEX_RE.match(value) else None
+        return None
+
+    # Template lines such as Imsi(IMSI) are not data records
+    value = args[0]
+    if not _HEX_RE.match(value):
+        return None
+    if kind == 'Iccid':
+        return Iccid(line_no, value, args)
+    return Imsi(line_no, value)
+
+
+def iter_sim_oda_records(file_path):
+    """Stream Iccid, Imsi and SecurityKey records from a SIM ODA file"""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line_no, line in enumerate(f, 1):
+            if '(' not in line:
+                continue
+            record = _parse_record(line_no, line)
+            if record is not None:
+                yield record
+
+
+class SimOdaFields:
+    """First-card values of a SIM ODA file, collected in one streaming read"""
+
+    # How many values of each kind the first-card report uses
+    WANTED = {'Iccid': 1, 'Imsi': 1, 'Encryption': 2, 'Authentication': 2,
+              'PskTls': 1, 'Management': 1}
+
+    def __init__(self):
+        self.values = {kind: [] for kind in self.WANTED}
+        self.lines = {kind: [] for kind in self.WANTED}
+
+    @classmethod
+    def read(cls, file_path):
+        fields = cls()
+        try:
+            for record in iter_sim_oda_records(file_path):
+                kind = record.role if isinstance(record, SecurityKey) else type(record).__name__
+                if len(fields.values[kind]) < cls.WANTED[kind]:
+                    fields.values[kind].append(record.value)
+                    fields.lines[kind].append(record.line)
+                if fields.complete():
+                    break  # Everything the report needs has been seen
+        except Exception as e:
+            print(f"Error reading SIM ODA file: {e}")
+        return fields
+
+    def complete(self):
+        return all(len(self.values[kind]) >= count for kind, count in self.WANTED.items())
+
+    def get(self, kind, index=0):
+        """index-th value of kind (Iccid, Imsi or a SecurityKey role), or None"""
+        values = self.values.get(kind, [])
+        return values[index] if index < len(values) else None
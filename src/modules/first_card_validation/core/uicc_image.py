@@ -0,0 +1,82 @@
+import re
+
+# SELECT / UPDATE BINARY / UPDATE RECORD headers: INS, P1, P2, Lc
+_APDU_RE = re.compile(r'(?<![0-9A-F])00(A4|D6|DC)([0-9A-F]{2})([0-9A-F]{2})([0-9A-F]{2})')
+_SELECT_TEXT_RE = re.compile(r'SELECT\s+([0-9A-F]{4})\b')
+_NON_HEX_RE = re.compile(r'[^0-9A-F]')
+
+
+class UiccImage:
+    """Virtual EF contents rebuilt by replaying the APDUs of a machine log"""
+
+    def __init__(self):
+        self.current_ef = None
+        self.binary = {}    # FID -> hex content
+        self.records = {}   # FID -> {record number: hex content}
+        self.lines = {}     # FID -> line number of the last write
+
+    def select(self, fid):
+        self.current_ef = fid
+
+    def update_binary(self, offset, data, line_num):
+        if not self.current_ef:
+            return
+        content = self.binary.get(self.current_ef, '')
+        start = offset * 2
+        if len(content) < start:
+            content = content.ljust(start, 'F')  # Unwritten bytes read as FF
+        self.binary[self.current_ef] = content[:start] + data + content[start + len(data):]
+        self.lines[self.current_ef] = line_num
+
+    def update_record(self, record_num, data, line_num):
+        if not self.current_ef:
+            return
+        self.records.setdefault(self.current_ef, {})[record_num] = data
+        self.lines[self.current_ef] = line_num
+
+    def read_binary(self, fid):
+        return self.binary.get(fid)
+
+    def read_record(self, fid, record_num):
+        return self.records.get(fid, {}).get(record_num)
+
+    def replay_line(self, line, line_num):
+        """Apply the SELECT/UPDATE command found on one log line, if any"""
+        line_upper = line.upper().strip()
+        match = _APDU_RE.search(line_upper)
+        if not match:
+            text_select = _SELECT_TEXT_RE.search(line_upper)
+            if text_select:
+                self.select(text_select.group(1))
+            return
+
+        ins, p1, p2, lc = match.groups()
+        tail = line_upper[match.end():]
+        if 'SW9000' in tail:
+            tail = tail.split('SW9000')[0]
+        data = _NON_HEX_RE.sub('', tail)
+        length = int(lc, 16) * 2
+        if len(data) >= length:
+            data = data[:length]
+
+        if ins == 'A4':
+            # Select by FID or by path: the last FID is the selected EF
+            if len(data) >= 4:
+                self.select(data[-4:])
+        elif ins == 'D6':
+            p1_value = int(p1, 16)
+            if p1_value & 0x80:
+                return  # Short file identifier addressing, FID unknown
+            self.update_binary((p1_value << 8) | int(p2, 16), data, line_num)
+        elif ins == 'DC':
+            if p2 == '04':  # Absolute record number in P1
+                self.update_record(int(p1, 16), data, line_num)
+
+
+def replay_machine_log(filepath):
+    """Build the virtual EF image of a machine log in a single pass"""
+    image = UiccImage()
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for line_num, line in enumerate(f, 1):
+            image.replay_line(line, line_num)
+    return image
@@ -1,3 +1,4 @@
+import copy
 import os
 import re
 import traceback
@@ -9,55 +10,53 @@ from openpyxl.utils import get_column_letter
 from .file_parsers import *
 from .qr_processor import *
 from .excel_generator import *
+from .pcom_parser import load_pcom_symbols
+from .sim_oda_parser import SimOdaFields
+from .uicc_image import replay_machine_log
+from .report_template import jio_report_template
 
 # Import from utils using absolute path
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.helpers import *
+import sim_codec
 
 def debug_pcom_content(pcom_path, key_patterns):
     """Debug function to see what's actually in the PCOM file"""
     print(f"\n🔍 DEBUG PCOM FILE: {pcom_path}")
     try:
-        with open(pcom_path, 'r', encoding='utf-8', errors='ignore') as file:
-            content = file.read()
-            lines = content.split('\n')
-            
+        symbols = load_pcom_symbols(pcom_path)
+
         print("Relevant lines in PCOM file:")
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            # Check if line contains any of our target patterns
-            if '.define' in line_lower:
-                for var in ['%imsi', '%acc', '%puk', '%isc', '%iccid', '%adm', '%home_imsi', '%home_acc', '%dpuk1_card', '%dpuk2_card', '%adm1_card', '%iccid_card']:
-                    if var in line_lower:
-                        print(f"Line {i}: {line.strip()}")
-                        break
-                    
+        debug_names = ['IMSI', 'ACC', 'PUK', 'ISC', 'ICCID', 'ADM', 'HOME_IMSI', 'HOME_ACC',
+                       'DPUK1_CARD', 'DPUK2_CARD', 'ADM1_CARD', 'ICCID_CARD']
+        relevant = []
+        for name, values in symbols.defines.items():
+            if any(name.startswith(var) for var in debug_names):
+                relevant.extend((line_no, name, value) for line_no, value in values)
+        for line_no, name, value in sorted(relevant):
+            print(f"Line {line_no}: .DEFINE %{name} {value.strip()}")
+
     except Exception as e:
         print(f"Error reading PCOM file for debug: {e}")
 
-def extract_from_pcom_enhanced(file_path, patterns):
+def extract_from_pcom_enhanced(file_path, lookups):
     """
-    Enhanced PCOM extraction - searches entire file for patterns
+    Enhanced PCOM extraction - resolves (kind, name, value pattern) lookups in the PCOM symbol table
     """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            content = file.read()
-        
-        # Try multiple patterns
-        if isinstance(patterns, str):
-            patterns = [patterns]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                print(f"✅ PCOM pattern matched: {pattern} -> {match.group(1)}")
-                return match.group(1)
-        
-        print(f"❌ No PCOM pattern matched from: {patterns}")
+        symbols = load_pcom_symbols(file_path)
+
+        for kind, name, value_pattern in lookups:
+            value = symbols.resolve([(kind, name, value_pattern)])
+            if value is not None:
+                print(f"✅ PCOM symbol matched: {kind} {name} -> {value}")
+                return value
+
+        print(f"❌ No PCOM symbol matched from: {[f'{kind} {name}' for kind, name, _ in lookups]}")
         return None
-        
+
     except Exception as e:
         print(f"Error reading PCOM file {file_path}: {e}")
         return None
@@ -77,248 +76,126 @@ def _search_patterns(text, patterns):
     return None
 
 # ============================================================
-# ENHANCED MACHINE LOG PARSING (Based on Airtel code)
+# ENHANCED MACHINE LOG PARSING (EF content decoders)
 # ============================================================
 
-def extract_value_enhanced(line, command):
-    """
-    Enhanced value extraction - similar to Airtel approach
-    """
-    line = line.upper().strip()
-    if command in line:
-        parts = line.split(command)
-        if len(parts) > 1:
-            value = parts[1].split('SW9000')[0] if 'SW9000' in parts[1] else parts[1]
-            # Clean up - allow hex characters
-            value = re.sub(r'[^0-9A-F]', '', value)
-            return value
-    return None
+def _decode_iccid(content):
+    if len(content) >= 20:
+        return {'ICCID_CARD (2FE2)': content[:20]}
+    return {}
+
+def _decode_home_imsi(content):
+    if len(content) >= 18:
+        digits = sim_codec.bcd_digits(content)
+        if digits:
+            return {'HOME_IMSI (6F07)': digits[:18]}
+    return {}
+
+def _decode_global_imsi(content):
+    if len(content) >= 18:
+        digits = sim_codec.bcd_digits(content)
+        if len(digits) >= 18:
+            return {'GLOBAL_IMSI (3031)': digits[:18]}
+    return {}
+
+def _decode_psk_dek1(content):
+    if content.startswith('FE85410110') and 'FE80410210' in content:
+        psk, dek1 = content[10:].split('FE80410210')[:2]
+        return {'PSK (6F2B)': psk[:32], 'DEK1 (6F2B)': dek1[:32]}
+    return {}
+
+def _dpuk_decoder(tag, field):
+    def decode(content):
+        if not content.startswith(tag):
+            return {}
+        val = content[len(tag):]
+        if len(val) >= 16:
+            if 'FFFFFFFF0A0A' in val:
+                parts = val.split('FFFFFFFF0A0A')
+                if len(parts[1]) >= 16:
+                    return {field: parts[1][:16]}
+                return {}
+            return {field: val[:16]}
+        return {}
+    return decode
+
+def _decode_adm(content):
+    if content.startswith('800A0A') and len(content) >= 22:
+        return {'ADM (6F0A)': content[6:22]}
+    return {}
+
+def _decode_home_acc(content):
+    if len(content) >= 4:
+        return {'HOME_ACC (6F78)': content[:4]}
+    return {}
+
+def _decode_global_acc(content):
+    header = '0000000300000002FFFFFFFF'
+    if content.startswith(header) and len(content) >= len(header) + 8:
+        val = content[len(header):]
+        return {'GLOBAL_ACC (3037)': val[:4], 'HOME_ACC (3037)': val[4:8]}
+    return {}
+
+def _prefixed_decoder(tag, field, length):
+    def decode(content):
+        if content.startswith(tag):
+            return {field: content[len(tag):][:length]}
+        return {}
+    return decode
+
+def _key_decoder(tag, field):
+    def decode(content):
+        if content.startswith(tag):
+            val = content[len(tag):].replace('FFFFFFFFFFFFFFFF', '')
+            if len(val) >= 32:
+                return {field: val[:32]}
+        return {}
+    return decode
+
+# EF (FID, record number or None for transparent content) -> field decoder
+JIO_EF_FIELDS = [
+    ('2FE2', None, _decode_iccid),
+    ('6F07', None, _decode_home_imsi),
+    ('6F2B', None, _decode_psk_dek1),
+    ('6F01', None, _dpuk_decoder('F00A0A', 'DPUK1_CARD (6F01)')),
+    ('6F81', None, _dpuk_decoder('E00A0A', 'DPUK2_CARD (6F81)')),
+    ('6F0A', None, _decode_adm),
+    ('6F78', None, _decode_home_acc),
+    ('3031', None, _decode_global_imsi),
+    ('3037', None, _decode_global_acc),
+    ('6F22', 1, _key_decoder('FE0150', 'KIC1 (6F22)')),
+    ('6F22', 2, _key_decoder('FE0151', 'KID1 (6F22)')),
+    ('6F22', 3, _key_decoder('FE0152', 'KIK1 (6F22)')),
+    ('6F22', 4, _key_decoder('FE0250', 'KIC2 (6F22)')),
+    ('6F22', 5, _key_decoder('FE0251', 'KID2 (6F22)')),
+    ('6F22', 6, _key_decoder('FE0252', 'KIK2 (6F22)')),
+    ('6F02', None, _prefixed_decoder('8031', 'ASCII_IMSI (6F02)', 30)),
+    ('6F04', 1, _prefixed_decoder('80357369703A', 'ASCII_IMSI (6F04)', 30)),
+]
 
 def parse_machine_log_enhanced(filepath):
     """
-    Enhanced machine log parsing using Airtel's approach
+    Enhanced machine log parsing - replays the log into a virtual EF image, then reads each field from its EF
     """
     print("="*80)
     print("🚀 ENHANCED MACHINE LOG PARSING")
     print("="*80)
     
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+        image = replay_machine_log(filepath)
         
         extracted = {}
         
-        for line_num, line in enumerate(lines, 1):
-            line_upper = line.upper().strip()
-            
-            # ========== ICCID (2FE2) ==========
-            if '2FE2' in line_upper and ('00A40000022FE2' in line_upper or 'SELECT 2FE2' in line_upper):
-                # Look ahead for ICCID data
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D600000A' in data_line:
-                        val = extract_value_enhanced(data_line, '00D600000A')
-                        if val and len(val) >= 20:
-                            extracted['ICCID_CARD (2FE2)'] = val[:20]
-                            print(f"✅ Line {line_num}: ICCID parsed: {val[:20]}")
-                        break
-            
-            # ========== IMSI (6F07) ==========
-            elif '6F07' in line_upper and ('00A40000026F07' in line_upper or 'SELECT 6F07' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D6000009' in data_line:
-                        val = extract_value_enhanced(data_line, '00D6000009')
-                        if val and len(val) >= 18:
-                            # Convert hex to decimal digits (like Airtel)
-                            decimal_digits = []
-                            for j in range(0, len(val), 2):
-                                if j + 2 <= len(val):
-                                    hex_byte = val[j:j+2]
-                                    try:
-                                        byte_value = int(hex_byte, 16)
-                                        high_digit = (byte_value >> 4) & 0x0F
-                                        low_digit = byte_value & 0x0F
-                                        
-                                        if 0 <= high_digit <= 9:
-                                            decimal_digits.append(str(high_digit))
-                                        if 0 <= low_digit <= 9:
-                                            decimal_digits.append(str(low_digit))
-                                    except:
-                                        continue
-                            
-                            if decimal_digits and len(decimal_digits) >= 18:
-                                imsi_18_digit = ''.join(decimal_digits)[:18]
-                                extracted['HOME_IMSI (6F07)'] = imsi_18_digit
-                                print(f"✅ Line {line_num}: HOME_IMSI parsed: {imsi_18_digit}")
-                            elif decimal_digits:
-                                imsi = ''.join(decimal_digits)
-                                extracted['HOME_IMSI (6F07)'] = imsi
-                                print(f"✅ Line {line_num}: HOME_IMSI parsed: {imsi}")
-                        break
-            
-            # ========== PSK/DEK1 (6F2B) ==========
-            elif '6F2B' in line_upper and ('00A40000026F2B' in line_upper or 'SELECT 6F2B' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D600002AFE85410110' in data_line and 'FE80410210' in data_line:
-                        parts = data_line.split('00D600002AFE85410110')
-                        if len(parts) > 1:
-                            tail = parts[1]
-                            if 'FE80410210' in tail:
-                                psk = tail.split('FE80410210')[0][:32]
-                                dek1 = tail.split('FE80410210')[1][:32]
-                                extracted['PSK (6F2B)'] = psk
-                                extracted['DEK1 (6F2B)'] = dek1
-                                print(f"✅ Line {line_num}: PSK parsed: {psk[:16]}...")
-                                print(f"✅ Line {line_num}: DEK1 parsed: {dek1[:16]}...")
-                        break
-            
-            # ========== DPUK1 (6F01) ==========
-            elif '6F01' in line_upper and ('00A40000026F01' in line_upper or 'SELECT 6F01' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D6000015F00A0A' in data_line:
-                        val = extract_value_enhanced(data_line, '00D6000015F00A0A')
-                        if val and len(val) >= 16:
-                            if 'FFFFFFFF0A0A' in val:
-                                parts = val.split('FFFFFFFF0A0A')
-                                if len(parts) > 1 and len(parts[1]) >= 16:
-                                    extracted['DPUK1_CARD (6F01)'] = parts[1][:16]
-                                    print(f"✅ Line {line_num}: DPUK1 parsed: {parts[1][:16]}")
-                            else:
-                                extracted['DPUK1_CARD (6F01)'] = val[:16]
-                                print(f"✅ Line {line_num}: DPUK1 parsed: {val[:16]}")
-                        break
-            
-            # ========== DPUK2 (6F81) ==========
-            elif '6F81' in line_upper and ('00A40000026F81' in line_upper or 'SELECT 6F81' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D6000015E00A0A' in data_line:
-                        val = extract_value_enhanced(data_line, '00D6000015E00A0A')
-                        if val and len(val) >= 16:
-                            if 'FFFFFFFF0A0A' in val:
-                                parts = val.split('FFFFFFFF0A0A')
-                                if len(parts) > 1 and len(parts[1]) >= 16:
-                                    extracted['DPUK2_CARD (6F81)'] = parts[1][:16]
-                                    print(f"✅ Line {line_num}: DPUK2 parsed: {parts[1][:16]}")
-                            else:
-                                extracted['DPUK2_CARD (6F81)'] = val[:16]
-                                print(f"✅ Line {line_num}: DPUK2 parsed: {val[:16]}")
-                        break
-            
-            # ========== ADM (6F0A) ==========
-            elif '6F0A' in line_upper and ('00A40000026F0A' in line_upper or 'SELECT 6F0A' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D600000B800A0A' in data_line:
-                        val = extract_value_enhanced(data_line, '00D600000B800A0A')
-                        if val and len(val) >= 16:
-                            extracted['ADM (6F0A)'] = val[:16]
-                            print(f"✅ Line {line_num}: ADM parsed: {val[:16]}")
-                        break
-            
-            # ========== HOME_ACC (6F78) ==========
-            elif '6F78' in line_upper and ('00A40000026F78' in line_upper or 'SELECT 6F78' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D6000002' in data_line:
-                        val = extract_value_enhanced(data_line, '00D6000002')
-                        if val and len(val) >= 4:
-                            extracted['HOME_ACC (6F78)'] = val[:4]
-                            print(f"✅ Line {line_num}: HOME_ACC parsed: {val[:4]}")
-                        break
-            
-            # ========== GLOBAL_IMSI (3031) ==========
-            elif '3031' in line_upper and ('00A40000023031' in line_upper or 'SELECT 3031' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D6000009' in data_line:
-                        val = extract_value_enhanced(data_line, '00D6000009')
-                        if val and len(val) >= 18:
-                            # Convert hex to decimal digits
-                            decimal_digits = []
-                            for j in range(0, len(val), 2):
-                                if j + 2 <= len(val):
-                                    hex_byte = val[j:j+2]
-                                    try:
-                                        byte_value = int(hex_byte, 16)
-                                        high_digit = (byte_value >> 4) & 0x0F
-                                        low_digit = byte_value & 0x0F
-                                        
-                                        if 0 <= high_digit <= 9:
-                                            decimal_digits.append(str(high_digit))
-                                        if 0 <= low_digit <= 9:
-                                            decimal_digits.append(str(low_digit))
-                                    except:
-                                        continue
-                            
-                            if decimal_digits and len(decimal_digits) >= 18:
-                                imsi_18_digit = ''.join(decimal_digits)[:18]
-                                extracted['GLOBAL_IMSI (3031)'] = imsi_18_digit
-                                print(f"✅ Line {line_num}: GLOBAL_IMSI parsed: {imsi_18_digit}")
-                        break
-            
-            # ========== GLOBAL_ACC (3037) ==========
-            elif '3037' in line_upper and ('00A40000023037' in line_upper or 'SELECT 3037' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D60000120000000300000002FFFFFFFF' in data_line:
-                        val = extract_value_enhanced(data_line, '00D60000120000000300000002FFFFFFFF')
-                        if val and len(val) >= 8:
-                            extracted['GLOBAL_ACC (3037)'] = val[:4]
-                            extracted['HOME_ACC (3037)'] = val[4:8]
-                            print(f"✅ Line {line_num}: GLOBAL_ACC parsed: {val[:4]}")
-                            print(f"✅ Line {line_num}: HOME_ACC parsed: {val[4:8]}")
-                        break
-            
-            # ========== KIC/KID Keys (6F22) ==========
-            elif '6F22' in line_upper and ('00A40000026F22' in line_upper or 'SELECT 6F22' in line_upper):
-                kic_kid_prefixes = {
-                    'KIC1 (6F22)': '00DC01041BFE0150',
-                    'KID1 (6F22)': '00DC02041BFE0151',
-                    'KIK1 (6F22)': '00DC03041BFE0152',
-                    'KIC2 (6F22)': '00DC04041BFE0250',
-                    'KID2 (6F22)': '00DC05041BFE0251',
-                    'KIK2 (6F22)': '00DC06041BFE0252',
-                }
-                
-                for prefix_key, prefix in kic_kid_prefixes.items():
-                    for i in range(min(10, len(lines) - line_num)):
-                        data_line = lines[line_num + i].upper().strip()
-                        if prefix in data_line:
-                            val = extract_value_enhanced(data_line, prefix)
-                            if val:
-                                val = val.replace('FFFFFFFFFFFFFFFF', '')
-                                if len(val) >= 32:
-                                    extracted[prefix_key] = val[:32]
-                                    print(f"✅ Line {line_num+i+1}: {prefix_key} parsed: {val[:16]}...")
-                            break
-            
-            # ========== ASCII IMSI (6F02) ==========
-            elif '6F02' in line_upper and ('00A40000026F02' in line_upper or 'SELECT 6F02' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00D600005F8031' in data_line:
-                        parts = data_line.split('00D600005F8031')
-                        if len(parts) > 1:
-                            val = parts[1]
-                            extracted['ASCII_IMSI (6F02)'] = val[:30]
-                            print(f"✅ Line {line_num}: ASCII_IMSI (6F02) parsed: {val[:30]}")
-                        break
-            
-            # ========== ASCII IMSI (6F04) ==========
-            elif '6F04' in line_upper and ('00A40000026F04' in line_upper or 'SELECT 6F04' in line_upper):
-                for i in range(min(5, len(lines) - line_num)):
-                    data_line = lines[line_num + i].upper().strip()
-                    if '00DC01047880357369703A' in data_line:
-                        parts = data_line.split('00DC01047880357369703A')
-                        if len(parts) > 1:
-                            val = parts[1]
-                            extracted['ASCII_IMSI (6F04)'] = val[:30]
-                            print(f"✅ Line {line_num}: ASCII_IMSI (6F04) parsed: {val[:30]}")
-                        break
+        for fid, record_num, decode in JIO_EF_FIELDS:
+            if record_num is None:
+                content = image.read_binary(fid)
+            else:
+                content = image.read_record(fid, record_num)
+            if not content:
+                continue
+            for field, value in decode(content).items():
+                extracted[field] = value
+                print(f"✅ Line {image.lines[fid]}: {field} parsed: {value}")
         
         print(f"\n✅ Extracted {len(extracted)} fields from Machine Log")
         for field, value in extracted.items():
@@ -333,47 +210,13 @@ def parse_machine_log_enhanced(filepath):
 
 def parse_machine_log_robust(filepath):
     """
-    Robust machine log parsing with multiple strategies
+    Machine log parsing entry point (single pass over the log)
     """
     print("\n" + "="*80)
     print("ROBUST MACHINE LOG PARSING")
     print("="*80)
     
-    # Strategy 1: Enhanced parsing (Airtel style)
-    results1 = parse_machine_log_enhanced(filepath)
-    
-    # Strategy 2: Pattern-based search (fallback)
-    results2 = {}
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        # Pattern search for specific fields
-        patterns = [
-            ('ICCID_CARD (2FE2)', r'00D600000A([0-9A-F]{20})'),
-            ('HOME_IMSI (6F07)', r'00D6000009([0-9A-F]{18})'),
-            ('PSK (6F2B)', r'FE85410110([0-9A-F]{32})'),
-            ('DEK1 (6F2B)', r'FE80410210([0-9A-F]{32})'),
-            ('DPUK1_CARD (6F01)', r'F00A0A([0-9A-F]{16})'),
-            ('DPUK2_CARD (6F81)', r'E00A0A([0-9A-F]{16})'),
-            ('ADM (6F0A)', r'800A0A([0-9A-F]{16})'),
-            ('HOME_ACC (6F78)', r'00D6000002([0-9A-F]{4})'),
-            ('GLOBAL_IMSI (3031)', r'00A40000023031[^\n]*?\n[^\n]*?00D6000009([0-9A-F]{18})'),
-        ]
-        
-        for field, pattern in patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            if matches:
-                results2[field] = matches[0]
-                print(f"✅ Pattern found {field}: {matches[0]}")
-    
-    except Exception as e:
-        print(f"Pattern search error: {e}")
-    
-    # Merge results (prefer results1, fallback to results2)
-    all_results = {}
-    all_results.update(results2)  # Pattern results first
-    all_results.update(results1)  # Enhanced results override
+    all_results = parse_machine_log_enhanced(filepath)
     
     print(f"\n📊 Total extracted: {len(all_results)} fields")
     return all_results
@@ -382,127 +225,124 @@ class ValidationEngine:
     def __init__(self):
         self.results = {}
 
-def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, image_paths=None):
-    
-    print("Running with:", profile_type, filepath)
-
-    # Initialize error collection
+# Fields to skip per profile
+SKIP_MAP = {
+    "MOB": [],
+    "WBIOT": ["GLOBAL_IMSI (3031)", "GLOBAL_ACC (3037)", "HOME_ACC (3037)"],
+    "NBIOT": ["GLOBAL_IMSI (3031)", "GLOBAL_ACC (3037)", "HOME_ACC (3037)", 
+              "ASCII_IMSI (6F02)", "ASCII_IMSI (6F04)"]
+}
+
+# Field definitions
+KEY_TO_HEADER = {
+    "PSK (6F2B)": "PSK (6F2B)",
+    "DEK1 (6F2B)": "DEK1 (6F2B)",
+    "GLOBAL_IMSI (3031)": "GLOBAL_IMSI (3031)",
+    "HOME_IMSI (6F07)": "HOME_IMSI (6F07)",
+    "GLOBAL_ACC (3037)": "GLOBAL_ACC (3037)",
+    "HOME_ACC (6F78)": "HOME_ACC (6F78)",
+    "DPUK1_CARD (6F01)": "DPUK1_CARD (6F01)",
+    "DPUK2_CARD (6F81)": "DPUK2_CARD (6F81)",
+    "ADM (6F0A)": "ADM (6F0A)",
+    "ICCID_CARD (2FE2)": "ICCID_CARD (2FE2)",
+    "KIC1 (6F22)": "KIC1 (6F22)",
+    "KID1 (6F22)": "KID1 (6F22)",
+    "KIC2 (6F22)": "KIC2 (6F22)",
+    "KID2 (6F22)": "KID2 (6F22)",
+    "ASCII_IMSI (6F02)": "ASCII_IMSI (6F02)",
+    "ASCII_IMSI (6F04)": "ASCII_IMSI (6F04)",
+    "HOME_ACC (3037)": "HOME_ACC (3037)",
+}
+
+def extract_reference_values(profile_type, pcom_path, cnum_path, scm_path, sim_oda_path):
+    """Extract the PCOM, CNUM, SCM and SIM ODA values of a card; they do not depend on the machine log"""
     validation_errors = []
+    skip_fields = set(SKIP_MAP.get(profile_type, []))
+    key_to_header = KEY_TO_HEADER
 
-    # Fields to skip per profile
-    skip_map = {
-        "MOB": [],
-        "WBIOT": ["GLOBAL_IMSI (3031)", "GLOBAL_ACC (3037)", "HOME_ACC (3037)"],
-        "NBIOT": ["GLOBAL_IMSI (3031)", "GLOBAL_ACC (3037)", "HOME_ACC (3037)", 
-                  "ASCII_IMSI (6F02)", "ASCII_IMSI (6F04)"]
-    }
-
-    skip_fields = set(skip_map.get(profile_type, []))
-
-    # Field definitions
-    key_to_header = {
-        "PSK (6F2B)": "PSK (6F2B)",
-        "DEK1 (6F2B)": "DEK1 (6F2B)",
-        "GLOBAL_IMSI (3031)": "GLOBAL_IMSI (3031)",
-        "HOME_IMSI (6F07)": "HOME_IMSI (6F07)",
-        "GLOBAL_ACC (3037)": "GLOBAL_ACC (3037)",
-        "HOME_ACC (6F78)": "HOME_ACC (6F78)",
-        "DPUK1_CARD (6F01)": "DPUK1_CARD (6F01)",
-        "DPUK2_CARD (6F81)": "DPUK2_CARD (6F81)",
-        "ADM (6F0A)": "ADM (6F0A)",
-        "ICCID_CARD (2FE2)": "ICCID_CARD (2FE2)",
-        "KIC1 (6F22)": "KIC1 (6F22)",
-        "KID1 (6F22)": "KID1 (6F22)",
-        "KIC2 (6F22)": "KIC2 (6F22)",
-        "KID2 (6F22)": "KID2 (6F22)",
-        "ASCII_IMSI (6F02)": "ASCII_IMSI (6F02)",
-        "ASCII_IMSI (6F04)": "ASCII_IMSI (6F04)",
-        "HOME_ACC (3037)": "HOME_ACC (3037)",
-    }
-
-    # Enhanced PCOM configuration with multiple search patterns
+    # Enhanced PCOM configuration with symbol lookups (kind, name, value pattern)
     if profile_type == 'NBIOT':
         pcom_config = {
             "HOME_IMSI (6F07)": [
-                r"\.DEFINE\s+%IMSI\s+([0-9]+)",
-                r"\.DEFINE\s+%HOME_IMSI\s+([0-9]+)",
-                r"IMSI\s*=\s*([0-9]+)"
+                ("define", "IMSI", r"([0-9]+)"),
+                ("define", "HOME_IMSI", r"([0-9]+)"),
+                ("assign", "IMSI", r"([0-9]+)")
             ],
             "HOME_ACC (6F78)": [
-                r"\.DEFINE\s+%ACC\s+([0-9]+)", 
-                r"\.DEFINE\s+%HOME_ACC\s+([0-9]+)",
-                r"ACC\s*=\s*([0-9]+)"
+                ("define", "ACC", r"([0-9]+)"), 
+                ("define", "HOME_ACC", r"([0-9]+)"),
+                ("assign", "ACC", r"([0-9]+)")
             ],
             "DPUK1_CARD (6F01)": [
-                r"\.DEFINE\s+%PUK1\s+([0-9]+)",
-                r"\.DEFINE\s+%DPUK1_CARD\s+([0-9]+)",
-                r"PUK1\s*=\s*([0-9]+)"
+                ("define", "PUK1", r"([0-9]+)"),
+                ("define", "DPUK1_CARD", r"([0-9]+)"),
+                ("assign", "PUK1", r"([0-9]+)")
             ],
             "DPUK2_CARD (6F81)": [
-                r"\.DEFINE\s+%PUK2\s+([0-9]+)",
-                r"\.DEFINE\s+%DPUK2_CARD\s+([0-9]+)",
-                r"PUK2\s*=\s*([0-9]+)"
+                ("define", "PUK2", r"([0-9]+)"),
+                ("define", "DPUK2_CARD", r"([0-9]+)"),
+                ("assign", "PUK2", r"([0-9]+)")
             ],
             "ADM (6F0A)": [
-                r"\.DEFINE\s+%ISC1\s+([0-9A-Fa-f]+)",
-                r"\.DEFINE\s+%ADM1_CARD\s+([0-9A-Fa-f]+)",
-                r"ADM\s*=\s*([0-9A-Fa-f]+)"
+                ("define", "ISC1", r"([0-9A-Fa-f]+)"),
+                ("define", "ADM1_CARD", r"([0-9A-Fa-f]+)"),
+                ("assign", "ADM", r"([0-9A-Fa-f]+)")
             ],
             "ICCID_CARD (2FE2)": [
-                r"\.DEFINE\s+%ICCID\s+([0-9]+)",
-                r"\.DEFINE\s+%ICCID_CARD\s+([0-9]+)",
-                r"ICCID\s*=\s*([0-9]+)"
+                ("define", "ICCID", r"([0-9]+)"),
+                ("define", "ICCID_CARD", r"([0-9]+)"),
+                ("assign", "ICCID", r"([0-9]+)")
             ]
         }
     else: 
         pcom_config = {
             "GLOBAL_IMSI (3031)": [
-                r"\.DEFINE\s+%HOME_IMSI\s+([0-9]+)",
-                r"IMSI\s*=\s*([0-9]+)"
+                ("define", "HOME_IMSI", r"([0-9]+)"),
+                ("assign", "IMSI", r"([0-9]+)")
             ],
             "HOME_IMSI (6F07)": [
-                r"\.DEFINE\s+%HOME_IMSI\s+([0-9]+)",
-                r"IMSI\s*=\s*([0-9]+)"
+                ("define", "HOME_IMSI", r"([0-9]+)"),
+                ("assign", "IMSI", r"([0-9]+)")
             ],
             "GLOBAL_ACC (3037)": [
-                r"\.DEFINE\s+%HOME_ACC\s+([0-9]+)",
-                r"ACC\s*=\s*([0-9]+)"
+                ("define", "HOME_ACC", r"([0-9]+)"),
+                ("assign", "ACC", r"([0-9]+)")
             ],
             "HOME_ACC (6F78)": [
-                r"\.DEFINE\s+%HOME_ACC\s+([0-9]+)",
-                r"ACC\s*=\s*([0-9]+)"
+                ("define", "HOME_ACC", r"([0-9]+)"),
+                ("assign", "ACC", r"([0-9]+)")
             ],
             "DPUK1_CARD (6F01)": [
-                r"\.DEFINE\s+%PUK1\s+([0-9]+)",
-                r"\.DEFINE\s+%DPUK1_CARD\s+([0-9]+)",
-                r"PUK1\s*=\s*([0-9]+)"
+                ("define", "PUK1", r"([0-9]+)"),
+                ("define", "DPUK1_CARD", r"([0-9]+)"),
+                ("assign", "PUK1", r"([0-9]+)")
             ],
             "DPUK2_CARD (6F81)": [
-                r"\.DEFINE\s+%PUK2\s+([0-9]+)",
-                r"\.DEFINE\s+%DPUK2_CARD\s+([0-9]+)",
-                r"PUK2\s*=\s*([0-9]+)"
+                ("define", "PUK2", r"([0-9]+)"),
+                ("define", "DPUK2_CARD", r"([0-9]+)"),
+                ("assign", "PUK2", r"([0-9]+)")
             ],
             "ADM (6F0A)": [
-                r"\.DEFINE\s+%ISC1\s+([0-9A-Fa-f]+)",
-                r"\.DEFINE\s+%ADM1_CARD\s+([0-9A-Fa-f]+)",
-                r"ADM\s*=\s*([0-9A-Fa-f]+)"
+                ("define", "ISC1", r"([0-9A-Fa-f]+)"),
+                ("define", "ADM1_CARD", r"([0-9A-Fa-f]+)"),
+                ("assign", "ADM", r"([0-9A-Fa-f]+)")
             ],
             "ICCID_CARD (2FE2)": [
-                r"\.DEFINE\s+%ICCID\s+([0-9]+)",
-                r"\.DEFINE\s+%ICCID_CARD\s+([0-9]+)",
-                r"ICCID\s*=\s*([0-9]+)"
+                ("define", "ICCID", r"([0-9]+)"),
+                ("define", "ICCID_CARD", r"([0-9]+)"),
+                ("assign", "ICCID", r"([0-9]+)")
             ],
             "ASCII_IMSI (6F02)": [
-                r"\.DEFINE\s+%ASCII_IMSI\s+([0-9]+)",
-                r"ASCII_IMSI\s*=\s*([0-9]+)"
+                ("define", "ASCII_IMSI", r"([0-9]+)"),
+                ("assign", "ASCII_IMSI", r"([0-9]+)")
             ],
             "ASCII_IMSI (6F04)": [
-                r"\.DEFINE\s+%ASCII_IMSI\s+([0-9]+)",
-                r"ASCII_IMSI\s*=\s*([0-9]+)"
+                ("define", "ASCII_IMSI", r"([0-9]+)"),
+                ("assign", "ASCII_IMSI", r"([0-9]+)")
             ],
             "HOME_ACC (3037)": [
-                r"\.DEFINE\s+%HOME_ACC\s+([0-9]+)",
-                r"ACC\s*=\s*([0-9]+)"
+                ("define", "HOME_ACC", r"([0-9]+)"),
+                ("assign", "ACC", r"([0-9]+)")
             ]
         }
     
@@ -524,34 +364,20 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
         "ASCII_IMSI (6F04)": (2, 3)
     }
     
-    if profile_type == 'NBIOT':
-        sim_oda_config = {
-            "PSK (6F2B)": (126, r"SecurityKey\([^,]+, [^,]+, PskTls, ([^,]+),"),
-            "DEK1 (6F2B)": (127, r"SecurityKey\([^,]+, [^,]+, Management, ([^,]+),"),
-            "GLOBAL_IMSI (3031)": (130, r"Imsi\((\w+)\)"),
-            "HOME_IMSI (6F07)": (130, r"Imsi\((\w+)\)"),
-            "ICCID_CARD (2FE2)": (121, r"Iccid\(([^,]+),.*\)"),
-            "KIC1 (6F22)": (122, r"SecurityKey\(.*, Encryption, (\w+)\)"),
-            "KID1 (6F22)": (123, r"SecurityKey\(.*, Authentication, (\w+)\)"),
-            "KIC2 (6F22)": (124, r"SecurityKey\(.*, Encryption, (\w+)\)"),
-            "KID2 (6F22)": (125, r"SecurityKey\(.*, Authentication, (\w+)\)"),
-            "ASCII_IMSI (6F02)": (130, r"Imsi\((\w+)\)"),
-            "ASCII_IMSI (6F04)": (130, r"Imsi\((\w+)\)"),
-        }
-    else:
-        sim_oda_config = {
-            "PSK (6F2B)": (351, r"SecurityKey\([^,]+, [^,]+, PskTls, ([^,]+),"),
-            "DEK1 (6F2B)": (352, r"SecurityKey\([^,]+, [^,]+, Management, ([^,]+),"),
-            "GLOBAL_IMSI (3031)": (355, r"Imsi\((\w+)\)"),
-            "HOME_IMSI (6F07)": (355, r"Imsi\((\w+)\)"),
-            "ICCID_CARD (2FE2)": (346, r"Iccid\(([^,]+),.*\)"),
-            "KIC1 (6F22)": (347, r"SecurityKey\(.*, Encryption, (\w+)\)"),
-            "KID1 (6F22)": (348, r"SecurityKey\(.*, Authentication, (\w+)\)"),
-            "KIC2 (6F22)": (349, r"SecurityKey\(.*, Encryption, (\w+)\)"),
-            "KID2 (6F22)": (350, r"SecurityKey\(.*, Authentication, (\w+)\)"),
-            "ASCII_IMSI (6F02)": (355, r"Imsi\((\w+)\)"),
-            "ASCII_IMSI (6F04)": (355, r"Imsi\((\w+)\)")
-        }
+    # SIM ODA field -> (record kind or SecurityKey role, occurrence index)
+    sim_oda_config = {
+        "PSK (6F2B)": ("PskTls", 0),
+        "DEK1 (6F2B)": ("Management", 0),
+        "GLOBAL_IMSI (3031)": ("Imsi", 0),
+        "HOME_IMSI (6F07)": ("Imsi", 0),
+        "ICCID_CARD (2FE2)": ("Iccid", 0),
+        "KIC1 (6F22)": ("Encryption", 0),
+        "KID1 (6F22)": ("Authentication", 0),
+        "KIC2 (6F22)": ("Encryption", 1),
+        "KID2 (6F22)": ("Authentication", 1),
+        "ASCII_IMSI (6F02)": ("Imsi", 0),
+        "ASCII_IMSI (6F04)": ("Imsi", 0)
+    }
 
     # Extract values from all files
     file_values = {k: {"PCOM": None, "CNUM": None, "SCM": None, "SIM_ODA": None} 
@@ -579,37 +405,6 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
         else:
             print(f"✅ [{key}] PCOM extraction successful: {extracted_value}")
 
-    # ============================================================
-    # ENHANCED MACHINE LOG PARSING
-    # ============================================================
-    print("\n" + "="*80)
-    print("EXTRACTING FROM MACHINE LOG")
-    print("="*80)
-    
-    results = parse_machine_log_robust(filepath)
-    
-    # Initialize all fields
-    for key in key_to_header.keys():
-        if key not in results:
-            results[key] = "N/A"
-    
-    # ============================================================
-    # EXTRACT FROM OTHER FILES
-    # ============================================================
-    
-    # First handle KIC/KID keys using ordered match
-    kic_matches = extract_multiple_keys(sim_oda_path, r"SecurityKey\(.*, Encryption, (\w+)\)")
-    kid_matches = extract_multiple_keys(sim_oda_path, r"SecurityKey\(.*, Authentication, (\w+)\)")
-
-    if "KIC1 (6F22)" in file_values:
-        file_values["KIC1 (6F22)"]["SIM_ODA"] = kic_matches[0] if len(kic_matches) > 0 else None
-    if "KIC2 (6F22)" in file_values:
-        file_values["KIC2 (6F22)"]["SIM_ODA"] = kic_matches[1] if len(kic_matches) > 1 else None
-    if "KID1 (6F22)" in file_values:
-        file_values["KID1 (6F22)"]["SIM_ODA"] = kid_matches[0] if len(kid_matches) > 0 else None
-    if "KID2 (6F22)" in file_values:
-        file_values["KID2 (6F22)"]["SIM_ODA"] = kid_matches[1] if len(kid_matches) > 1 else None
-
     # Extract from CNUM
     for key, (line_num, col_idx, special_logic) in cnum_config.items():
         if key in skip_fields:
@@ -624,14 +419,45 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
         if key in file_values:
             file_values[key]["SCM"] = extract_from_scm(scm_path, line_num, col_idx)
 
-    # Extract from SIM ODA
-    for key, (line_num, pattern) in sim_oda_config.items():
-        if key not in file_values or key in ["KIC1 (6F22)", "KIC2 (6F22)", "KID1 (6F22)", "KID2 (6F22)"]:
+    # Extract from SIM ODA (one streaming read of the records)
+    sim_oda_fields = SimOdaFields.read(sim_oda_path)
+    for key, (kind, index) in sim_oda_config.items():
+        if key not in file_values:
             continue
-        file_values[key]["SIM_ODA"] = extract_from_sim_oda(
-            sim_oda_path, line_num, pattern, search_range=2, fallback=True
-        )
+        file_values[key]["SIM_ODA"] = sim_oda_fields.get(kind, index)
+
+    return {"file_values": file_values, "errors": validation_errors}
+
+def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, image_paths=None, reference_values=None):
+    
+    print("Running with:", profile_type, filepath)
+
+    # Initialize error collection
+    validation_errors = []
+
+    skip_fields = set(SKIP_MAP.get(profile_type, []))
+    key_to_header = KEY_TO_HEADER
+
+    # Reference files can be parsed once and shared by a batch of machine logs
+    if reference_values is None:
+        reference_values = extract_reference_values(profile_type, pcom_path, cnum_path, scm_path, sim_oda_path)
+    file_values = copy.deepcopy(reference_values["file_values"])
+    validation_errors.extend(reference_values["errors"])
 
+    # ============================================================
+    # ENHANCED MACHINE LOG PARSING
+    # ============================================================
+    print("\n" + "="*80)
+    print("EXTRACTING FROM MACHINE LOG")
+    print("="*80)
+    
+    results = parse_machine_log_robust(filepath)
+    
+    # Initialize all fields
+    for key in key_to_header.keys():
+        if key not in results:
+            results[key] = "N/A"
+    
     # ============================================================
     # VALIDATION RULES
     # ============================================================
@@ -655,10 +481,10 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
         "HOME_ACC (3037)": ("from_value", "NR", "NR", "NR"),
     }
 
-    # Excel Report Setup
-    wb = Workbook()
+    # Excel Report Setup: copy of the pre-styled skeleton (title, date, user, metadata)
+    template = jio_report_template()
+    wb = template.new_workbook()
     ws = wb.active
-    ws.title = "Validation Report"
 
     if image_paths:
         # Set starting row based on profile_type
@@ -677,24 +503,12 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
                 cell = f'{start_col_letter}{row}'  # e.g., D32, D42, D52, etc.
                 insert_image(ws, image_path, cell)  # Insert image at the specified cell
 
-    # Styles
-    styles = setup_excel_styles()
-
     # Headers
     headers = ["Field", "Machine Log", "PCOM", "CNUM", "SCM", "SIM ODA", 
                "PCOM Status", "CNUM Status", "SCM Status", "SIM_ODA Status", "Validation Status"]
     
-    # Setup Excel headers and metadata
-    setup_excel_headers(ws, styles)
-
-    header_row = 16  # Row 18 will now contain your table headers
-           
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=header_row, column=col, value=header)
-        cell.fill = styles['dark_blue_fill']
-        cell.font = styles['header_font']
-        cell.border = styles['thick_border']
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+    header_row = template.header_row  # First row after the metadata block
+    template.write_header(ws, header_row, headers)
 
     # Iterate over each key
     row = header_row + 1 
@@ -764,7 +578,7 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
         # DPUK special handling
         if is_dpuk_key(key):
             try:
-                decoded_ml = bytes.fromhex(ml_val).decode('ascii')
+                decoded_ml = sim_codec.hex_to_ascii(ml_val)
             except ValueError:
                 decoded_ml = ""
 
@@ -796,16 +610,7 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
             validation_status = "✅ Pass" if overall_valid else "❌ Fail"
             data = [key, ml_val, pcom_disp, cnum_disp, scm_disp, sim_oda_disp,
                     status["PCOM"], status["CNUM"], status["SCM"], status["SIM_ODA"], validation_status]
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col, value=value)
-                cell.border = styles['thick_border']
-                cell.number_format = '@'
-                if "Pass" in str(value):
-                    cell.fill = styles['green_fill']
-                elif "Fail" in str(value):
-                    cell.fill = styles['red_fill']
-                elif str(value).strip().upper() in ["NR", "N/A", "Missing"]:
-                    cell.fill = styles['yellow_fill']
+            template.write_row(ws, row, data)
             row += 1
             continue
 
@@ -897,19 +702,13 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
             key, ml_val, pcom_disp, cnum_disp, scm_disp, sim_oda_disp,
             status["PCOM"], status["CNUM"], status["SCM"], status["SIM_ODA"], validation_status
         ]
-        for col, value in enumerate(data, 1):
-            cell = ws.cell(row=row, column=col, value=value)
-            cell.border = styles['thick_border']
-            cell.number_format = '@'
-            if "Pass" in str(value):
-                cell.fill = styles['green_fill']
-            elif "Fail" in str(value):
-                cell.fill = styles['red_fill']
-            elif str(value).strip().upper() in ["NR", "N/A", "Missing"]:
-                cell.fill = styles['yellow_fill']
+        template.write_row(ws, row, data)
 
         row += 1
 
+    # Pass/Fail/NR colors of the whole table as conditional formatting
+    template.add_status_formatting(ws, header_row + 1, row - 1, len(headers))
+
     # --- Begin processing ---
     image_label_map = {
         "INNER LABEL 100": image_paths[0] if len(image_paths) > 0 else None,
@@ -921,6 +720,9 @@ def main(profile_type, filepath, pcom_path, cnum_path, scm_path, sim_oda_path, i
 
     print("Image Label Map:", image_label_map)
 
+    # Decode all label QR codes up front (in parallel, cached by image content)
+    prefetch_qr_payloads(image_label_map.values(), mode="wbiot")
+
     label_qr_data = {}
     if profile_type == "MOB":
         for label, img_path in image_label_map.items():
@@ -5,6 +5,8 @@ import re
 import sys
 import os
 
+import sim_codec
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and PyInstaller """
     try:
@@ -20,13 +22,13 @@ def normalize_field(field_name):
 def hex_to_ascii(hex_str):
     """Convert hex string to ASCII."""
     try:
-        return bytes.fromhex(hex_str).decode('ascii')
+        return sim_codec.hex_to_ascii(hex_str)
     except Exception:
         return ''
 
 def swap_pairs(s):
     """Swap every two characters in the string (for ICCID/IMSI formatting)."""
-    return ''.join(s[i+1] + s[i] for i in range(0, len(s)-1, 2)) if s else ''
+    return sim_codec.swap_pairs(s, odd_tail="drop") if s else ''
 
 def normalize_iccid(iccid):
     """Normalize ICCID by removing non-digits and swapping pairs."""
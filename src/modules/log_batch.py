@@ -0,0 +1,84 @@
+"""Folder scan and worker pool shared by the batch validations of machine logs.
+
+first_card_validation.core.batch_validation (one card per machine log) and
+machine_log_validation.core.lot_validation (one variable script per lot)
+both validate every log of a folder against values prepared once: the
+values go to the workers through the pool initializer, and each log is one
+task.
+"""
+import glob
+import multiprocessing
+import os
+from datetime import datetime
+
+# Values prepared once for the batch (set by init_worker in every worker process)
+worker_state = {}
+
+
+def find_machine_logs(log_folder, patterns=("*.txt", "*.log"), exclude=(), skip=None):
+    """Machine logs directly inside log_folder, sorted by name
+
+    exclude lists paths that are not logs (reference files); skip(name) is
+    True for the names of files the batch itself writes.
+    """
+    excluded = {os.path.abspath(path) for path in exclude if path}
+    logs = set()
+    for pattern in patterns:
+        logs.update(glob.glob(os.path.join(log_folder, pattern)))
+    return sorted(
+        path for path in logs
+        if os.path.isfile(path) and os.path.abspath(path) not in excluded
+        and not (skip and skip(os.path.basename(path)))
+    )
+
+
+def init_worker(state):
+    worker_state.clear()
+    worker_state.update(state)
+
+
+def run_pool(task, items, state, workers=None, on_result=None):
+    """
+    Results of task(item) for every item, in order, over a pool of workers.
+
+    state is handed to each worker once and read by task from worker_state.
+    With a single worker the tasks run in this process. on_result(result,
+    index, total) is called as each result arrives.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(items)))
+    results = []
+
+    def collect(result):
+        if on_result is not None:
+            on_result(result, len(results) + 1, len(items))
+        results.append(result)
+
+    if workers == 1:
+        init_worker(state)
+        for item in items:
+            collect(task(item))
+    else:
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(state,)) as pool:
+            for result in pool.imap(task, items):
+                collect(result)
+    return results
+
+
+def print_progress(index, total, log_path, status, detail):
+    icon = "✅" if status == "PASS" else "❌"
+    print(f"{icon} [{index}/{total}] {os.path.basename(log_path)}: {status} ({detail})")
+
+
+def timestamped_path(folder, prefix, extension):
+    """folder/<prefix><YYYYmmdd_HHMMSS><extension>"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(folder, f"{prefix}{timestamp}{extension}")
+
+
+def add_batch_arguments(parser):
+    """Arguments every batch command line has: the log folder, --workers and --summary"""
+    parser.add_argument("log_folder")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--summary", default=None)
+    return parser
@@ -0,0 +1,218 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+from .log_records import MachineLogEntry
+
+# Read commands matched on the 4-char command alone (MATCHING STRATEGY 2)
+READ_COMMANDS = ('00B0', '00B2', '00B1')
+
+# Separator of the joined APDU text; never part of an APDU
+_SEPARATOR = '\n'
+
+
+def _first_at_or_after(indices: List[int], start: int) -> Optional[int]:
+    pos = bisect_left(indices, start)
+    return indices[pos] if pos < len(indices) else None
+
+
+def match_strategy(script_apdu: str, machine_apdu: str) -> Optional[str]:
+    """Name of the first matching strategy of a script and machine APDU, or None"""
+    if script_apdu == machine_apdu:
+        return "EXACT APDU"
+    script_command = script_apdu[:4]
+    if script_command in READ_COMMANDS and machine_apdu[:4] == script_command:
+        return f"READ COMMAND {script_command}"
+    if script_apdu in machine_apdu:
+        return "SCRIPT IN MACHINE"
+    if machine_apdu in script_apdu:
+        return "MACHINE IN SCRIPT"
+    min_len = min(len(script_apdu), len(machine_apdu), 10)
+    if min_len >= 6 and script_apdu[:min_len] == machine_apdu[:min_len]:
+        return f"FIRST {min_len} CHARS"
+    return None
+
+
+class MachineLogIndex:
+    """
+    Index of the APDUs of parsed machine log entries (MachineLogEntry records).
+
+    find() returns the first entry at or after start that matches a script
+    APDU by any strategy of match_strategy(), like scanning the entries in
+    order, without visiting every entry:
+
+    - read commands and shared first 10 chars are looked up by prefix;
+    - machine APDUs contained in the script APDU are looked up per window
+      of the script APDU;
+    - the script APDU contained in a machine APDU is one str.find over the
+      joined APDUs, limited to the entries before the best hit so far.
+
+    (A first-min(len, 10) prefix match of a shorter APDU is a containment,
+    so prefixes only need indexing for APDUs of 10 chars or more.)
+    """
+
+    def __init__(self, machine_logs: List[MachineLogEntry]):
+        self.machine_logs = machine_logs
+        self.size = len(machine_logs)
+        self.positions = []      # entry index of each indexed APDU
+        self.offsets = []        # offset of each indexed APDU in self.joined
+        self.by_apdu = {}        # APDU -> entry indices
+        self.by_command = {}     # read command -> entry indices
+        self.by_prefix = {}      # first 10 chars -> entry indices (APDUs of 10+ chars)
+        self.prefix_lengths = {} # first 10 chars -> lengths of APDUs with that prefix
+        self.short_apdus = set() # APDUs under 10 chars
+
+        parts, offset = [], 0
+        for index, entry in enumerate(machine_logs):
+            apdu = entry.apdu
+            if not apdu:
+                continue
+            self.positions.append(index)
+            self.offsets.append(offset)
+            parts.append(apdu)
+            offset += len(apdu) + 1
+
+            self.by_apdu.setdefault(apdu, []).append(index)
+            if apdu[:4] in READ_COMMANDS:
+                self.by_command.setdefault(apdu[:4], []).append(index)
+            if len(apdu) >= 10:
+                prefix = apdu[:10]
+                self.by_prefix.setdefault(prefix, []).append(index)
+                self.prefix_lengths.setdefault(prefix, set()).add(len(apdu))
+            else:
+                self.short_apdus.add(apdu)
+        self.joined = _SEPARATOR.join(parts)
+        self.prefix_lengths = {prefix: sorted(lengths) for prefix, lengths in self.prefix_lengths.items()}
+
+    def _first_contained(self, script_apdu: str, start: int) -> Optional[int]:
+        """First entry at or after start whose APDU is part of script_apdu"""
+        best = None
+        found = set()
+        for apdu in self.short_apdus:
+            if apdu in script_apdu:
+                found.add(apdu)
+        for j in range(len(script_apdu) - 9):
+            lengths = self.prefix_lengths.get(script_apdu[j:j + 10])
+            if not lengths:
+                continue
+            room = len(script_apdu) - j
+            for length in lengths:
+                if length > room:
+                    break
+                candidate = script_apdu[j:j + length]
+                if candidate in self.by_apdu:
+                    found.add(candidate)
+        for apdu in found:
+            index = _first_at_or_after(self.by_apdu[apdu], start)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+    def _first_containing(self, script_apdu: str, start: int, stop: int) -> Optional[int]:
+        """First entry in [start, stop) whose APDU contains script_apdu"""
+        first = bisect_left(self.positions, start)
+        last = bisect_left(self.positions, stop)
+        if first >= last or _SEPARATOR in script_apdu:
+            return None
+        end = self.offsets[last] - 1 if last < len(self.offsets) else len(self.joined)
+        pos = self.joined.find(script_apdu, self.offsets[first], end)
+        if pos == -1:
+            return None
+        return self.positions[bisect_left(self.offsets, pos + 1) - 1]
+
+    def find(self, script_apdu: str, start: int = 0) -> Tuple[int, Optional[str]]:
+        """(entry index, matching strategy) of script_apdu at or after start, or (-1, None)"""
+        candidates = [_first_at_or_after(self.by_apdu.get(script_apdu, ()), start)]
+        script_command = script_apdu[:4]
+        if script_command in READ_COMMANDS and script_command in self.by_command:
+            candidates.append(_first_at_or_after(self.by_command[script_command], start))
+        if len(script_apdu) >= 10 and script_apdu[:10] in self.by_prefix:
+            candidates.append(_first_at_or_after(self.by_prefix[script_apdu[:10]], start))
+        best = min((index for index in candidates if index is not None), default=self.size)
+
+        # Containment can only win over an entry before the best hit so far;
+        # a log that aligns cleanly has its hit at the next entry already
+        next_entry = _first_at_or_after(self.positions, start)
+        if next_entry is not None and next_entry < best:
+            contained = self._first_contained(script_apdu, start)
+            if contained is not None and contained < best:
+                best = contained
+            containing = self._first_containing(script_apdu, start, best)
+            if containing is not None:
+                best = containing
+
+        if best >= self.size:
+            return -1, None
+        return best, match_strategy(script_apdu, self.machine_logs[best].apdu)
+
+    def is_current(self, machine_logs: List[MachineLogEntry]) -> bool:
+        """True while machine_logs is the list indexed and has not grown"""
+        return machine_logs is self.machine_logs and len(machine_logs) == self.size
+
+
+class MachineLogStream:
+    """
+    Aligner over machine log entries read from a generator as they are needed.
+
+    find() has the result of MachineLogIndex.find() over the whole log, but
+    only reads entries until the first match: a match among the entries read
+    so far is the first one overall. Entries before the last start are never
+    searched again and are released on the next read, so a log that aligns
+    cleanly keeps about chunk_size entries in memory and indexes each entry
+    once; a command that is not found reads the rest of the log.
+    """
+
+    def __init__(self, entries: Iterable[MachineLogEntry], chunk_size: int = 256):
+        self._entries = iter(entries)
+        self.chunk_size = chunk_size
+        self.base = 0            # entry index of window[0]
+        self.window = []         # entries read, from base on
+        self.start = 0           # start of the last find(); entries before it are released
+        self.exhausted = False
+        self._index = None       # MachineLogIndex of window
+
+    @property
+    def read_count(self) -> int:
+        """Number of entries read from the generator so far"""
+        return self.base + len(self.window)
+
+    def _read(self) -> bool:
+        """Release the entries before start and read more; False if there were none"""
+        # Only entries already read can be released; base stays the index of window[0]
+        release = min(self.start, self.read_count)
+        if release > self.base:
+            del self.window[:release - self.base]
+            self.base = release
+            self._index = None
+        # As many entries as are buffered, so rebuilding the index stays linear
+        count = max(self.chunk_size, len(self.window))
+        chunk = list(islice(self._entries, count))
+        if len(chunk) < count:
+            self.exhausted = True
+        if not chunk:
+            return False
+        self.window.extend(chunk)
+        self._index = None
+        return True
+
+    def has_entries(self) -> bool:
+        """True if the log has at least one entry"""
+        return bool(self.window) or self.base > 0 or (not self.exhausted and self._read())
+
+    def find(self, script_apdu: str, start: int = 0) -> Tuple[int, Optional[str]]:
+        """(entry index, matching strategy) of script_apdu at or after start, or (-1, None)
+
+        start must not go back before the start of an earlier call.
+        """
+        self.start = max(start, self.start)
+        while True:
+            if self._index is None:
+                self._index = MachineLogIndex(self.window)
+            index, strategy = self._index.find(script_apdu, max(start - self.base, 0))
+            if index >= 0:
+                return self.base + index, strategy
+            if self.exhausted or not self._read():
+                return -1, None
+
+    def entry(self, index: int) -> MachineLogEntry:
+        return self.window[index - self.base]
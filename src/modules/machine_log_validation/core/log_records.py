@@ -0,0 +1,51 @@
+from typing import Dict, Optional
+
+
+class MachineLogEntry:
+    """
+    One parsed machine log line, as a compact record.
+
+    Has the fields of the former per-line dict as attributes, and get()/[]
+    for code written against the dict. original_line is None unless the
+    line text was kept (see ScriptValidator.iter_machine_log_entries).
+    """
+    __slots__ = ('line_num', 'apdu', 'sw', 'exp', 'out', 'expect', 'receive',
+                 'result', 'exp_result', 'placeholder_name', 'original_line')
+
+    type = 'apdu_command'
+
+    def __init__(self, line_num: int, tokens: Dict, original_line: Optional[str] = None):
+        self.line_num = line_num
+        self.apdu = tokens['apdu']
+        self.sw = tokens['sw']
+        self.exp = tokens['exp']
+        self.out = tokens['out']
+        self.expect = tokens['expect']
+        self.receive = tokens['receive']
+        self.result = tokens['result']
+        self.exp_result = tokens['exp_result']
+        self.placeholder_name = tokens['placeholder_name']
+        self.original_line = original_line
+
+    @property
+    def has_placeholder(self) -> bool:
+        return self.placeholder_name is not None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> Dict:
+        """The entry as the former per-line dict"""
+        entry = {name: getattr(self, name) for name in self.__slots__}
+        entry['has_placeholder'] = self.has_placeholder
+        entry['type'] = self.type
+        return entry
+
+    def __repr__(self) -> str:
+        return f"MachineLogEntry(line_num={self.line_num}, apdu={self.apdu!r}, sw={self.sw!r})"
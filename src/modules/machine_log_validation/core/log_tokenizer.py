@@ -0,0 +1,183 @@
+import re
+from typing import Dict, Optional
+
+# Values, matched right after their delimiter
+_HEX_VALUE_RE = re.compile(r'\s*([0-9A-F]+)', re.IGNORECASE)
+_STATUS_RE = re.compile(r'\s*([0-9A-F]{3,4})', re.IGNORECASE)
+_SW_EXP_RE = re.compile(r'\s*([0-9A-F]{3,4})(?:\s+EXP\s*=\s*([0-9A-F]{3,4}))?', re.IGNORECASE)
+_EXPECT_RECEIVE_RE = re.compile(r'\s*([0-9A-F]{3,4})(?:\s+RECEIVE\s*:\s*([0-9A-F]{3,4}))?', re.IGNORECASE)
+_RESULT_RE = re.compile(r'\s*(?:([0-9A-F]+)|(<[^>]+>|%[^%]+%))', re.IGNORECASE)
+_BRACKET_RE = re.compile(r'([A-F0-9]+)\]')
+_OUT_RE = re.compile(r'([0-9A-F]{3,4})\]')
+
+# APDU formats without a keyword
+_LEAD_RE = re.compile(r'[A-F0-9]{4,}')
+_BARE_RE = re.compile(r'\b([A-F0-9]{10,})\b')
+
+
+# Keyword matching is case-insensitive like re.IGNORECASE, which also matches
+# these non-ASCII letters to ASCII ones
+_KEYWORD_CASE = {ord(ch): ch.upper() for ch in 'abcdefghijklmnopqrstuvwxyz'}
+_KEYWORD_CASE.update({0x130: 'I', 0x131: 'I', 0x17F: 'S', 0x212A: 'K'})
+
+
+def _scan(line: str) -> Dict:
+    """First value of every token of line, keyed by token name"""
+    first = {}
+
+    # [apdu] and OUT[sw]
+    pos = line.find('[')
+    while pos != -1:
+        if 'bracket' not in first:
+            match = _BRACKET_RE.match(line, pos + 1)
+            if match:
+                first['bracket'] = match.group(1)
+        if 'out' not in first and line.endswith('OUT', 0, pos):
+            match = _OUT_RE.match(line, pos + 1)
+            if match:
+                first['out'] = match.group(1)
+        pos = line.find('[', pos + 1)
+
+    pos_colon = line.find(':')
+    pos_equals = line.find('=')
+    if pos_colon == -1 and pos_equals == -1:
+        return first
+
+    # Same length as line, so keyword ends line up
+    upper = line.upper() if line.isascii() else line.translate(_KEYWORD_CASE)
+
+    # EXPECT: and RECEIVE:
+    pos = pos_colon
+    while pos != -1:
+        end = pos
+        while end and line[end - 1].isspace():  # Keywords may be followed by whitespace
+            end -= 1
+        if upper.endswith('EXPECT', 0, end):
+            match = _EXPECT_RECEIVE_RE.match(line, pos + 1)
+            if match:
+                first.setdefault('expect', match.group(1))
+                if match.group(2) is not None and 'expect_pair' not in first:
+                    first['expect_pair'] = match.groups()
+        elif 'receive' not in first and upper.endswith('RECEIVE', 0, end):
+            match = _STATUS_RE.match(line, pos + 1)
+            if match:
+                first['receive'] = match.group(1)
+        pos = line.find(':', pos + 1)
+
+    # RESULT= EXPResult= EXP= SW= APDU=
+    pos = pos_equals
+    while pos != -1:
+        end = pos
+        while end and line[end - 1].isspace():  # Keywords may be followed by whitespace
+            end -= 1
+        if upper.endswith('RESULT', 0, end):
+            match = _RESULT_RE.match(line, pos + 1)
+            if match:
+                if match.group(1) is not None:
+                    first.setdefault('result', match.group(1))
+                elif line.endswith('RESULT', 0, end):  # RESULT=<FIELD> is case-sensitive
+                    first.setdefault('placeholder', match.group(2))
+            if 'exp_result' not in first and upper.endswith('EXPRESULT', 0, end):
+                match = _HEX_VALUE_RE.match(line, pos + 1)
+                if match:
+                    first['exp_result'] = match.group(1)
+        elif upper.endswith('EXP', 0, end):
+            if 'exp' not in first:
+                match = _STATUS_RE.match(line, pos + 1)
+                if match:
+                    first['exp'] = match.group(1)
+        elif upper.endswith('SW', 0, end):
+            match = _SW_EXP_RE.match(line, pos + 1)
+            if match:
+                first.setdefault('sw', match.group(1))
+                if match.group(2) is not None and 'sw_pair' not in first:
+                    first['sw_pair'] = match.groups()
+        elif 'apdu_eq' not in first and upper.endswith('APDU', 0, end):
+            match = _HEX_VALUE_RE.match(line, pos + 1)
+            if match:
+                first['apdu_eq'] = match.group(1)
+        pos = line.find('=', pos + 1)
+    return first
+
+
+def tokenize_machine_log_line(line: str) -> Optional[Dict]:
+    """
+    APDU, status and RESULT fields of one machine log line.
+
+    Keywords are located from their delimiters ('[', ':', '=') and each value
+    is read with one anchored match, instead of searching the whole line once
+    per field. Each field keeps its first occurrence, with the usual
+    precedence: APDU from [..] > APDU= > leading hex > bare hex;
+    EXPECT:RECEIVE pair > SW= EXP= pair > single values; SW value
+    RECEIVE > OUT > SW > EXP. None if the line has no APDU.
+    """
+    first = _scan(line)
+
+    apdu_value = first.get('bracket') or first.get('apdu_eq')
+    if not apdu_value:
+        match = _LEAD_RE.match(line)
+        if match:
+            apdu_value = match.group(0)
+    if not apdu_value:
+        # Only lines without an APDU keyword or leading command need a full search
+        match = _BARE_RE.search(line)
+        if match:
+            apdu_value = match.group(1)
+    if not apdu_value:
+        return None
+
+    sw_value = exp_value = out_value = expect_value = receive_value = None
+
+    if 'expect_pair' in first:
+        # In this format, RECEIVE is the actual SW value
+        expect_value, receive_value = (value.upper() for value in first['expect_pair'])
+        sw_value, exp_value = receive_value, expect_value
+
+    if 'out' in first:
+        out_value = first['out'].upper()
+
+    if not sw_value or not exp_value:
+        if 'sw_pair' in first:
+            pair_sw, pair_exp = first['sw_pair']
+            sw_value = sw_value or pair_sw.upper()
+            exp_value = exp_value or pair_exp.upper()
+        else:
+            if not sw_value and 'sw' in first:
+                sw_value = first['sw'].upper()
+            if not exp_value and 'exp' in first:
+                exp_value = first['exp'].upper()
+
+    if not expect_value and 'expect' in first:
+        expect_value = first['expect'].upper()
+        # If we have EXPECT but no SW/EXP, use it as EXP
+        exp_value = exp_value or expect_value
+
+    if not receive_value and 'receive' in first:
+        receive_value = first['receive'].upper()
+        # If we have RECEIVE but no SW, use it as SW
+        sw_value = sw_value or receive_value
+
+    # Priority for SW value: RECEIVE > OUT > SW > EXP
+    if receive_value:
+        sw_value = receive_value
+    elif out_value and not sw_value:
+        sw_value = out_value
+    elif exp_value and not sw_value:
+        sw_value = exp_value
+
+    result_value = first['result'].upper() if 'result' in first else None
+    exp_result_value = first['exp_result'].upper() if 'exp_result' in first else None
+    placeholder_name = first.get('placeholder')
+
+    return {
+        'apdu': apdu_value,
+        'sw': sw_value,
+        'exp': exp_value,
+        'out': out_value,
+        'expect': expect_value,
+        'receive': receive_value,
+        'result': result_value,
+        'exp_result': exp_result_value,
+        'has_placeholder': placeholder_name is not None,
+        'placeholder_name': placeholder_name,
+    }
@@ -0,0 +1,218 @@
+import contextlib
+import io
+import os
+import traceback
+from collections import Counter
+
+from log_batch import (add_batch_arguments, find_machine_logs, print_progress, run_pool,
+                       timestamped_path, worker_state)
+
+# Files this module writes into a lot folder, never machine logs
+_REPORT_SUFFIX = "_validation_report.txt"
+_SUMMARY_PREFIX = "Machine_Log_Lot_Summary_"
+
+
+def _is_lot_output(file_name):
+    return file_name.endswith(_REPORT_SUFFIX) or file_name.startswith(_SUMMARY_PREFIX)
+
+
+def _report_filename(validator, log_path):
+    """
+    Report name of a log: by ICCID when the log has one, like the machine log
+    tab, plus the log's own name, so two logs of one card (a re-perso) in a
+    lot keep separate reports.
+    """
+    log_name = os.path.splitext(os.path.basename(log_path))[0]
+    iccid_swapped = validator.field_values.get("ICCID_CARD_SWAPPED")
+    if iccid_swapped:
+        return f"ICCID_{iccid_swapped}_{log_name}{_REPORT_SUFFIX}"
+    return f"{log_name}{_REPORT_SUFFIX}"
+
+
+def _validate_log(log_path):
+    """Validate one machine log in a worker; the log's console output is dropped"""
+    from .script_validator import ScriptValidator
+
+    state = worker_state
+    result = {
+        "log_path": log_path,
+        "report_path": None,
+        "stats": None,
+        "failures": [],   # (script command index, message) of each failed command
+        "error": None,
+    }
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            validator = ScriptValidator()
+            validator.debug_mode = False
+            validator.script_commands = state["script_commands"]
+            report = validator.validate_machine_log_stream(log_path)
+        if not validator.validation_results:
+            result["error"] = report
+            return result
+
+        report_folder = state["report_folder"] or os.path.dirname(log_path)
+        report_path = os.path.join(report_folder, _report_filename(validator, log_path))
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+        result["report_path"] = report_path
+        result["stats"] = dict(validator.stats)
+        # One result per script command, in script order
+        result["failures"] = [
+            (index, validation_result.get('message', ''))
+            for index, validation_result in enumerate(validator.validation_results)
+            if validation_result.get('status') == 'FAIL'
+        ]
+    except Exception as e:
+        traceback.print_exc()
+        result["error"] = f"Validation error: {str(e)}"
+    return result
+
+
+def log_status(result):
+    if result["error"]:
+        return "ERROR"
+    return "FAIL" if result["stats"]["failed"] else "PASS"
+
+
+def validate_lot(script_commands, log_paths, workers=None, report_folder=None):
+    """
+    Validate every machine log of a lot against the same parsed variable script.
+
+    The script commands are handed to a pool of worker processes once (pool
+    initializer); each worker streams its machine logs through
+    ScriptValidator.validate_machine_log_stream and writes one report per log,
+    into report_folder or next to the log. Returns the lot summary: per-log
+    results, pass/fail counts and, per script command, how many logs failed
+    it and with which messages.
+    """
+    if report_folder:
+        os.makedirs(report_folder, exist_ok=True)
+    state = {"script_commands": script_commands, "report_folder": report_folder}
+    results = run_pool(_validate_log, log_paths, state, workers=workers, on_result=_report_progress)
+    return summarize_lot(script_commands, results)
+
+
+def summarize_lot(script_commands, results):
+    """Pass/fail counts of a lot and the failure histogram of each script command"""
+    statuses = Counter(log_status(result) for result in results)
+    commands = {}
+    for result in results:
+        for index, message in result["failures"]:
+            command = commands.setdefault(index, {
+                "script_line": script_commands[index].get('original_line', ''),
+                "failed_logs": 0,
+                "messages": Counter(),
+            })
+            command["failed_logs"] += 1
+            command["messages"][message] += 1
+    return {
+        "results": results,
+        "total": len(results),
+        "passed": statuses["PASS"],
+        "failed": statuses["FAIL"],
+        "errors": statuses["ERROR"],
+        "commands": commands,
+    }
+
+
+def _report_progress(result, index, total):
+    if result["error"]:
+        detail = result["error"]
+    else:
+        stats = result["stats"]
+        detail = f"{stats['passed']}/{stats['total_commands']} commands passed"
+    print_progress(index, total, result["log_path"], log_status(result), detail)
+
+
+def _default_summary_path(log_folder):
+    return timestamped_path(log_folder, _SUMMARY_PREFIX, ".txt")
+
+
+def write_lot_summary(lot, summary_path, max_messages=3):
+    """Text summary of a lot: totals, one line per log, then the most failed commands"""
+    lines = []
+    lines.append("=" * 80)
+    lines.append("MACHINE LOG LOT VALIDATION SUMMARY")
+    lines.append("=" * 80)
+    lines.append(f"Machine Logs: {lot['total']}")
+    lines.append(f"Passed: {lot['passed']}")
+    lines.append(f"Failed: {lot['failed']}")
+    lines.append(f"Errors: {lot['errors']}")
+
+    lines.append("\n📋 MACHINE LOGS")
+    lines.append("-" * 80)
+    for result in lot["results"]:
+        status = log_status(result)
+        if result["error"]:
+            detail = result["error"]
+        else:
+            stats = result["stats"]
+            detail = (f"Passed: {stats['passed']} | Failed: {stats['failed']} | "
+                      f"Not Found: {stats['not_found']} | Report: {result['report_path']}")
+        lines.append(f"{status:<6} {os.path.basename(result['log_path'])}: {detail}")
+
+    if lot["commands"]:
+        validated = lot["total"] - lot["errors"]
+        lines.append("\n🔍 FAILURES PER SCRIPT COMMAND")
+        lines.append("-" * 80)
+        ranked = sorted(lot["commands"].items(), key=lambda item: (-item[1]["failed_logs"], item[0]))
+        for index, command in ranked:
+            script_line = command["script_line"]
+            if len(script_line) > 80:
+                script_line = script_line[:80] + "..."
+            lines.append(f"Command {index + 1}: failed in {command['failed_logs']}/{validated} logs")
+            lines.append(f"     Script: {script_line}")
+            for message, count in command["messages"].most_common(max_messages):
+                lines.append(f"     {count:4d} x {message}")
+
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return summary_path
+
+
+def run_lot_validation(script_path, log_folder, workers=None, report_folder=None, summary_path=None):
+    """
+    Parse the variable script once and validate every machine log in log_folder against it.
+
+    Returns (summary_path, lot); see validate_lot().
+    """
+    from .script_validator import ScriptValidator
+
+    validator = ScriptValidator()
+    validator.debug_mode = False
+    print(f"📋 Parsing variable script once for the lot: {script_path}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        parsed = validator.parse_script_file(script_path)
+    if not parsed or not validator.script_commands:
+        print("❌ Failed to parse script file")
+        return None, None
+
+    logs = find_machine_logs(log_folder, exclude=(script_path, summary_path), skip=_is_lot_output)
+    print(f"📁 Lot validation: {len(logs)} machine logs in {log_folder}, "
+          f"{len(validator.script_commands)} script commands")
+    if not logs:
+        return None, None
+
+    lot = validator.validate_lot(logs, workers=workers, report_folder=report_folder)
+    summary_path = write_lot_summary(lot, summary_path or _default_summary_path(log_folder))
+    print(f"✅ Lot complete: {lot['passed']}/{lot['total']} machine logs passed. Summary: {summary_path}")
+    return summary_path, lot
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate a lot of machine logs against one variable script")
+    parser.add_argument("script")
+    add_batch_arguments(parser)
+    parser.add_argument("--reports", default=None, help="Folder for the per-log reports (default: next to each log)")
+    args = parser.parse_args(argv)
+
+    run_lot_validation(args.script, args.log_folder, workers=args.workers,
+                       report_folder=args.reports, summary_path=args.summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional
+
+SCRIPT_PROGRAM_CACHE_DIR = os.path.join(tempfile.gettempdir(), "machine_log_script_programs")
+# Bump when the script parsing rules change, so cached programs are recompiled
+SCRIPT_PROGRAM_VERSION = 1
+MAX_CACHED_SCRIPT_PROGRAMS = 8
+
+# Matched in place of each <FIELD> / %FIELD% placeholder of a script APDU
+_FIELD_VALUE = r'([A-F0-9]+)'
+
+_program_cache = {}
+
+
+def apdu_field_pattern(script_apdu: str, field_names: List[str]) -> str:
+    """Regex of a script APDU with its placeholders as capture groups (one per field, in field_names order)"""
+    pattern = re.escape(script_apdu)
+    for field_name in field_names:
+        pattern = pattern.replace(re.escape(f'%{field_name}%'), _FIELD_VALUE)
+        pattern = pattern.replace(re.escape(f'<{field_name}>'), _FIELD_VALUE)
+    return pattern
+
+
+def compile_apdu_matcher(pattern: str) -> Optional[re.Pattern]:
+    """Matcher of a machine APDU (case-insensitive, anchored at the start); None if pattern is invalid"""
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+class ScriptProgram:
+    """
+    A parsed variable script, ready to validate machine logs against.
+
+    commands are the command dicts of ScriptValidator; commands with
+    placeholders also carry 'apdu_pattern' and its compiled 'apdu_matcher',
+    which checks a machine APDU and captures the field values in one match.
+    Only the patterns are serialized; matchers are compiled on load.
+
+    A cached program is shared by every validator of the process, so its
+    commands are read-only; copy_commands() gives a validator its own copy.
+    """
+
+    def __init__(self, commands: List[Dict], script_hash: str = '', skipped_count: int = 0):
+        self.commands = commands
+        self.script_hash = script_hash
+        self.skipped_count = skipped_count
+        for command in commands:
+            if command.get('field_names') and 'apdu' in command:
+                if 'apdu_pattern' not in command:
+                    command['apdu_pattern'] = apdu_field_pattern(command['apdu'], command['field_names'])
+                command['apdu_matcher'] = compile_apdu_matcher(command['apdu_pattern'])
+
+    def copy_commands(self) -> List[Dict]:
+        """Copies of the command dicts (and of their field_names lists)"""
+        commands = []
+        for command in self.commands:
+            command = dict(command)
+            if 'field_names' in command:
+                command['field_names'] = list(command['field_names'])
+            commands.append(command)
+        return commands
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': SCRIPT_PROGRAM_VERSION,
+            'script_hash': self.script_hash,
+            'skipped_count': self.skipped_count,
+            'commands': [
+                {key: value for key, value in command.items() if key != 'apdu_matcher'}
+                for command in self.commands
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ScriptProgram':
+        if data.get('version') != SCRIPT_PROGRAM_VERSION:
+            raise ValueError(f"Script program version {data.get('version')} != {SCRIPT_PROGRAM_VERSION}")
+        return cls(data['commands'], data['script_hash'], data['skipped_count'])
+
+
+def script_hash(content: str) -> str:
+    """Cache key of a variable script's text"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _cache_file(key: str) -> str:
+    return os.path.join(SCRIPT_PROGRAM_CACHE_DIR, f"{key}_v{SCRIPT_PROGRAM_VERSION}.json")
+
+
+def load_script_program(key: str) -> Optional[ScriptProgram]:
+    """Compiled program of the script with hash key, from memory or disk; None if not cached"""
+    if key in _program_cache:
+        return _program_cache[key]
+    try:
+        with open(_cache_file(key), 'r', encoding='utf-8') as f:
+            program = ScriptProgram.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    _cache_program(program)
+    return program
+
+
+def _cache_program(program: ScriptProgram) -> None:
+    if program.script_hash not in _program_cache and len(_program_cache) >= MAX_CACHED_SCRIPT_PROGRAMS:
+        _program_cache.pop(next(iter(_program_cache)))
+    _program_cache[program.script_hash] = program
+
+
+def store_script_program(program: ScriptProgram) -> None:
+    _cache_program(program)
+    tmp_path = None
+    try:
+        os.makedirs(SCRIPT_PROGRAM_CACHE_DIR, exist_ok=True)
+        # Own temp file per call: other processes may compile the same script at once
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=SCRIPT_PROGRAM_CACHE_DIR)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(program.to_dict(), separators=(',', ':')))
+        os.replace(tmp_path, _cache_file(program.script_hash))
+    except OSError as e:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        # Another process may have written the same program first
+        if not os.path.exists(_cache_file(program.script_hash)):
+            print(f"Could not write script program cache: {e}")
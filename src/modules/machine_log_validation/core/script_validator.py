@@ -1,12 +1,22 @@
 import re
 import os
 import sys
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+
+import sim_codec
+
+from .log_aligner import MachineLogIndex, MachineLogStream
+from .log_records import MachineLogEntry
+from .script_program import (ScriptProgram, apdu_field_pattern, load_script_program,
+                             script_hash, store_script_program)
+from .log_tokenizer import tokenize_machine_log_line
 
 class ScriptValidator:
     def __init__(self):
         self.script_commands = []
+        self.script_program = None  # ScriptProgram of the last parsed script
         self.machine_logs = []
+        self._log_index = None  # MachineLogIndex of machine_logs, built on first search
         self.validation_results = []
         self.extracted_fields = {}
         self.field_values = {}
@@ -14,6 +24,7 @@ class ScriptValidator:
         # Track skipped lines for alignment
         self.script_skipped_count = 0
         self.machine_log_skipped_count = 0
+        self.machine_log_line_count = 0
         self.debug_mode = True
         
         # Statistics
@@ -28,28 +39,13 @@ class ScriptValidator:
     @staticmethod
     def swap_pairs(hex_string: str) -> str:
         """Swap pairs of hex digits (used for IMSI)"""
-        if len(hex_string) % 2 != 0:
-            return hex_string
-        swapped = ""
-        for i in range(0, len(hex_string), 2):
-            if i + 1 < len(hex_string):
-                swapped += hex_string[i + 1] + hex_string[i]
-        return swapped
+        return sim_codec.swap_pairs(hex_string, odd_tail="reject")
 
     @staticmethod
     def hex_to_ascii(hex_string: str) -> str:
         """Convert hex string to ASCII"""
         try:
-            ascii_string = ""
-            for i in range(0, len(hex_string), 2):
-                if i + 1 < len(hex_string):
-                    hex_pair = hex_string[i:i + 2]
-                    ascii_char = chr(int(hex_pair, 16))
-                    if ascii_char.isprintable():
-                        ascii_string += ascii_char
-                    else:
-                        ascii_string += "."
-            return ascii_string
+            return sim_codec.hex_to_display(hex_string, placeholder=".")
         except:
             return hex_string
 
@@ -57,10 +53,7 @@ class ScriptValidator:
     def ascii_to_hex(ascii_string: str) -> str:
         """Convert ASCII string to hex"""
         try:
-            hex_string = ""
-            for char in ascii_string:
-                hex_string += format(ord(char), '02X')
-            return hex_string
+            return sim_codec.text_to_hex(ascii_string)
         except:
             return ascii_string
 
@@ -92,41 +85,28 @@ class ScriptValidator:
             return "0001"
 
     def parse_script_file(self, script_path: str) -> bool:
-        """Parse Variable Script file according to the specified format"""
+        """Parse Variable Script file according to the specified format
+        
+        The parsed script is compiled into a ScriptProgram, cached by the hash
+        of the script text, so a script that was parsed before is loaded
+        without parsing it again.
+        """
         try:
             with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
-                lines = content.split('\n')
-                
-                self.script_skipped_count = 0
-                script_lines_to_process = []
-                
-                # Step 0: Skip Initial Irrelevant Lines
-                for line_num, line in enumerate(lines, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Skip patterns: 0012000000SW9000, PPS:, AES_
-                    if (line.startswith("0012000000SW9000") or 
-                        line.startswith("PPS:") or 
-                        line.startswith("AES_")):
-                        if self.debug_mode and line_num <= 5:
-                            print(f"SKIP SCRIPT: Skipping irrelevant script line {line_num}: {line[:50]}...")
-                        self.script_skipped_count += 1
-                        continue
-                    
-                    script_lines_to_process.append((line_num, line))
-                
-                print(f"✅ Filtered {len(script_lines_to_process)} script lines for validation")
-                print(f"📊 Skipped {self.script_skipped_count} script lines")
-                
-                # Parse filtered lines
-                for line_num, line in script_lines_to_process:
-                    command = self._parse_variable_script_line_complete(line, line_num)
-                    if command:
-                        self.script_commands.append(command)
-                        
+            
+            key = script_hash(content)
+            program = load_script_program(key)
+            if program is not None:
+                print(f"✅ Loaded compiled script program from cache")
+            else:
+                program = self._compile_script_program(content, key)
+                store_script_program(program)
+            
+            self.script_program = program
+            self.script_skipped_count = program.skipped_count
+            self.script_commands.extend(program.copy_commands())
+            print(f"📊 Skipped {self.script_skipped_count} script lines")
             print(f"✅ Parsed {len(self.script_commands)} script commands")
             
             # Debug first 5 commands
@@ -149,6 +129,41 @@ class ScriptValidator:
             traceback.print_exc()
             return False
 
+    def _compile_script_program(self, content: str, key: str) -> ScriptProgram:
+        """COMPILE: Parse the lines of a Variable Script into a ScriptProgram"""
+        lines = content.split('\n')
+        
+        skipped_count = 0
+        script_lines_to_process = []
+        
+        # Step 0: Skip Initial Irrelevant Lines
+        for line_num, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            
+            # Skip patterns: 0012000000SW9000, PPS:, AES_
+            if (line.startswith("0012000000SW9000") or 
+                line.startswith("PPS:") or 
+                line.startswith("AES_")):
+                if self.debug_mode and line_num <= 5:
+                    print(f"SKIP SCRIPT: Skipping irrelevant script line {line_num}: {line[:50]}...")
+                skipped_count += 1
+                continue
+            
+            script_lines_to_process.append((line_num, line))
+        
+        print(f"✅ Filtered {len(script_lines_to_process)} script lines for validation")
+        
+        # Parse filtered lines
+        commands = []
+        for line_num, line in script_lines_to_process:
+            command = self._parse_variable_script_line_complete(line, line_num)
+            if command:
+                commands.append(command)
+        
+        return ScriptProgram(commands, key, skipped_count)
+
     def _parse_variable_script_line_complete(self, line: str, line_num: int) -> Optional[Dict]:
         """COMPLETE: Parse variable script line - FIXED LOGIC"""
         line = line.strip()
@@ -270,36 +285,21 @@ class ScriptValidator:
         """Parse machine log file - COMPLETE PARSING"""
         try:
             with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.split('\n')
-                
-                print(f"📄 Total lines in machine log: {len(lines)}")
-                
-                # Parse all lines
-                parsed_count = 0
-                apdu_count = 0
-                
-                for line_num, line in enumerate(lines, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    log_entry = self._parse_machine_log_line_complete(line, line_num)
-                    if log_entry:
-                        self.machine_logs.append(log_entry)
-                        parsed_count += 1
-                        if log_entry.get('apdu'):
-                            apdu_count += 1
+                parsed_count = len(self.machine_logs)
+                self.machine_logs.extend(self.iter_machine_log_entries(f, keep_lines=True))
+                parsed_count = len(self.machine_logs) - parsed_count
+                # Every entry has an APDU, lines without one are not entries
+                apdu_count = parsed_count
                 
+                print(f"📄 Total lines in machine log: {self.machine_log_line_count}")
                 print(f"✅ Successfully parsed {parsed_count} machine log entries")
                 print(f"📊 Found {apdu_count} APDU commands in machine log")
                 
                 # Debug sample
                 if self.debug_mode and apdu_count > 0:
                     print("\n🔍 Sample APDU commands from machine log:")
-                    apdu_entries = [log for log in self.machine_logs if log.get('apdu')]
-                    for i, log in enumerate(apdu_entries[:3]):
-                        print(f"  {i+1}: APDU='{log.get('apdu', '')[:30]}...', SW={log.get('sw', 'N/A')}, RESULT={log.get('result', 'N/A')}")
+                    for i, log in enumerate(self.machine_logs[:3]):
+                        print(f"  {i+1}: APDU='{log.apdu[:30]}...', SW={log.sw}, RESULT={log.result}")
                 
                 return parsed_count > 0
         except Exception as e:
@@ -308,7 +308,26 @@ class ScriptValidator:
             traceback.print_exc()
             return False
 
-    def _parse_machine_log_line_complete(self, line: str, line_num: int) -> Optional[Dict]:
+    def iter_machine_log_entries(self, lines: Iterable[str], keep_lines: bool = False) -> Iterator[MachineLogEntry]:
+        """
+        STREAM: MachineLogEntry records of machine log lines (an open file), in order.
+        
+        Lines are parsed as they are read. The line text is only kept on the
+        records with keep_lines; the streaming validation reads back the lines
+        of failed commands instead.
+        """
+        self.machine_log_line_count = 0
+        for line_num, line in enumerate(lines, 1):
+            self.machine_log_line_count = line_num
+            line = line.strip()
+            if not line:
+                continue
+            
+            log_entry = self._parse_machine_log_line_complete(line, line_num, keep_line=keep_lines)
+            if log_entry:
+                yield log_entry
+
+    def _parse_machine_log_line_complete(self, line: str, line_num: int, keep_line: bool = True) -> Optional[MachineLogEntry]:
         """COMPLETE: Parse machine log line - ADDED EXPECT:XXXX RECEIVE:XXXX SUPPORT"""
         line = line.strip()
         if not line:
@@ -318,134 +337,18 @@ class ScriptValidator:
         if 'C02C010022' in line and 'SW9000' in line and 'IN[' in line:
             return None
         
-        # ============================================================
-        # APDU EXTRACTION
-        # ============================================================
-        apdu_value = None
-        
-        # Format 1: APDU in brackets [0050000010...]
-        bracket_match = re.search(r'\[([A-F0-9]+)\]', line)
-        if bracket_match:
-            apdu_value = bracket_match.group(1)
-        
-        # Format 2: APDU=0050000010...
-        if not apdu_value:
-            apdu_eq_match = re.search(r'APDU\s*=\s*([A-F0-9]+)', line, re.IGNORECASE)
-            if apdu_eq_match:
-                apdu_value = apdu_eq_match.group(1)
-        
-        # Format 3: Command at beginning
-        if not apdu_value:
-            command_match = re.match(r'^([A-F0-9]{4,})', line)
-            if command_match:
-                apdu_value = command_match.group(1)
-        
-        # Format 4: Hex string without prefix
-        if not apdu_value:
-            hex_match = re.search(r'\b([A-F0-9]{10,})\b', line)
-            if hex_match:
-                apdu_value = hex_match.group(1)
-        
-        if not apdu_value:
+        # APDU, status words (EXPECT/RECEIVE, OUT, SW/EXP) and RESULT in one scan
+        tokens = tokenize_machine_log_line(line)
+        if not tokens:
             return None
         
-        # ============================================================
-        # STATUS WORD EXTRACTION - ENHANCED WITH EXPECT/RECEIVE SUPPORT
-        # ============================================================
-        sw_value = None
-        exp_value = None
-        out_value = None
-        expect_value = None   # For EXPECT:XXXX format
-        receive_value = None  # For RECEIVE:XXXX format
-        
-        # NEW: Check for EXPECT:XXXX RECEIVE:XXXX format
-        expect_receive_match = re.search(r'EXPECT\s*:\s*([0-9A-F]{3,4})\s+RECEIVE\s*:\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
-        if expect_receive_match:
-            expect_value = expect_receive_match.group(1).upper()
-            receive_value = expect_receive_match.group(2).upper()
-            # In this format, RECEIVE is the actual SW value
-            sw_value = receive_value
-            exp_value = expect_value
-        
-        # Check for OUT[XXXX] format
-        out_match = re.search(r'OUT\[([0-9A-F]{3,4})\]', line)
-        if out_match:
-            out_value = out_match.group(1).upper()
-        
-        # Try to extract SW and EXP (if not already found)
-        if not sw_value or not exp_value:
-            sw_exp_match = re.search(r'SW\s*=\s*([0-9A-F]{3,4})\s+EXP\s*=\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
-            if sw_exp_match:
-                if not sw_value:
-                    sw_value = sw_exp_match.group(1).upper()
-                if not exp_value:
-                    exp_value = sw_exp_match.group(2).upper()
-            else:
-                # Try SW alone
-                if not sw_value:
-                    sw_match = re.search(r'SW\s*=\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
-                    if sw_match:
-                        sw_value = sw_match.group(1).upper()
-                
-                # Try EXP alone
-                if not exp_value:
-                    exp_match = re.search(r'EXP\s*=\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
-                    if exp_match:
-                        exp_value = exp_match.group(1).upper()
-        
-        # Try EXPECT alone (if not in EXPECT:RECEIVE pair)
-        if not expect_value:
-            expect_single_match = re.search(r'EXPECT\s*:\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
-            if expect_single_match:
-                expect_value = expect_single_match.group(1).upper()
-                # If we have EXPECT but no SW/EXP, use it as EXP
-                if not exp_value:
-                    exp_value = expect_value
-        
-        # Try RECEIVE alone (if not in EXPECT:RECEIVE pair)
-        if not receive_value:
-            receive_single_match = re.search(r'RECEIVE\s*:\s*([0-9A-F]{3,4})', line, re.IGNORECASE)
-            if receive_single_match:
-                receive_value = receive_single_match.group(1).upper()
-                # If we have RECEIVE but no SW, use it as SW
-                if not sw_value:
-                    sw_value = receive_value
-        
-        # Priority for SW value: RECEIVE > OUT > SW > EXP
-        if receive_value:
-            sw_value = receive_value
-        elif out_value and not sw_value:
-            sw_value = out_value
-        elif exp_value and not sw_value:
-            sw_value = exp_value
-        
-        # ============================================================
-        # RESULT EXTRACTION
-        # ============================================================
-        result_value = None
-        exp_result_value = None
-        
-        # RESULT=041123
-        result_match = re.search(r'RESULT\s*=\s*([0-9A-F]+)', line, re.IGNORECASE)
-        if result_match:
-            result_value = result_match.group(1).upper()
-        
-        # EXPResult=041123
-        exp_result_match = re.search(r'EXPResult\s*=\s*([0-9A-F]+)', line, re.IGNORECASE)
-        if exp_result_match:
-            exp_result_value = exp_result_match.group(1).upper()
-        
-        # ============================================================
-        # CHECK FOR PLACEHOLDERS
-        # ============================================================
-        has_placeholder = False
-        placeholder_name = None
-        
-        if re.search(r'RESULT\s*=\s*<[^>]+>', line) or re.search(r'RESULT\s*=\s*%[^%]+%', line):
-            has_placeholder = True
-            placeholder_match = re.search(r'RESULT\s*=\s*(<[^>]+>|%[^%]+%)', line)
-            if placeholder_match:
-                placeholder_name = placeholder_match.group(1)
+        apdu_value = tokens['apdu']
+        sw_value = tokens['sw']
+        exp_value = tokens['exp']
+        out_value = tokens['out']
+        expect_value = tokens['expect']
+        receive_value = tokens['receive']
+        result_value = tokens['result']
         
         # Debug output
         if self.debug_mode and line_num <= 10:
@@ -460,24 +363,14 @@ class ScriptValidator:
                   f"Status: {', '.join(status_info) if status_info else 'N/A'}, "
                   f"RESULT={result_value[:10] if result_value else 'N/A'}...")
         
-        return {
-            'line_num': line_num,
-            'original_line': line,
-            'apdu': apdu_value,
-            'sw': sw_value,
-            'exp': exp_value,
-            'out': out_value,
-            'expect': expect_value,     # Store EXPECT separately
-            'receive': receive_value,   # Store RECEIVE separately
-            'result': result_value,
-            'exp_result': exp_result_value,
-            'has_placeholder': has_placeholder,
-            'placeholder_name': placeholder_name,
-            'type': 'apdu_command'
-        }
+        return MachineLogEntry(line_num, tokens, line if keep_line else None)
                 
-    def find_script_command_in_machine_logs(self, script_cmd: Dict, start_index: int = 0) -> int:
-        """FIND: Smart matching algorithm"""
+    def find_script_command_in_machine_logs(self, script_cmd: Dict, start_index: int = 0,
+                                            log_stream: Optional[MachineLogStream] = None) -> int:
+        """FIND: Smart matching algorithm (first machine log entry from start_index matching by any strategy)
+        
+        Searches self.machine_logs, or the entries of log_stream when streaming.
+        """
         script_apdu = script_cmd.get('apdu', '')
         script_type = script_cmd.get('type', '')
         
@@ -489,75 +382,29 @@ class ScriptValidator:
         if self.debug_mode:
             print(f"\n🔍 Searching for: Type='{script_type}', APDU='{script_apdu}'")
         
-        # Get just the command bytes (first 4-8 chars)
-        # 00B0000003 -> 00B0 (4 chars)
-        # 00D600002A -> 00D6 (4 chars)
-        script_command = script_apdu[:4] if len(script_apdu) >= 4 else script_apdu
+        # Strategies: exact APDU, read command (00B0/00B1/00B2), script in machine,
+        # machine in script, first 10 chars - see log_aligner.match_strategy
+        if log_stream is not None:
+            found_index, strategy = log_stream.find(script_apdu, start_index)
+        else:
+            if self._log_index is None or not self._log_index.is_current(self.machine_logs):
+                self._log_index = MachineLogIndex(self.machine_logs)
+            found_index, strategy = self._log_index.find(script_apdu, start_index)
         
-        for i in range(start_index, len(self.machine_logs)):
-            machine_log = self.machine_logs[i]
-            machine_apdu = machine_log.get('apdu', '')
-            
-            if not machine_apdu:
-                continue
-            
-            # Get machine command
-            machine_command = machine_apdu[:4] if len(machine_apdu) >= 4 else machine_apdu
-            
-            if self.debug_mode and i < 2:
-                print(f"  Checking machine log {i}: APDU='{machine_apdu[:30]}...'")
-            
-            # ============================================================
-            # MATCHING STRATEGY 1: Exact APDU match (for simple commands)
-            # ============================================================
-            if script_apdu == machine_apdu:
-                if self.debug_mode:
-                    print(f"  ✅ EXACT APDU MATCH at index {i}")
-                return i
-            
-            # ============================================================
-            # MATCHING STRATEGY 2: Command match (for read commands)
-            # ============================================================
-            if script_command == machine_command:
-                # Additional check: for read commands (00B0, 00B2, etc.)
-                if script_command in ['00B0', '00B2', '00B1']:
-                    if self.debug_mode:
-                        print(f"  ✅ READ COMMAND MATCH at index {i}: {script_command}")
-                    return i
-            
-            # ============================================================
-            # MATCHING STRATEGY 3: Script APDU contained in machine APDU
-            # ============================================================
-            if script_apdu in machine_apdu:
-                if self.debug_mode:
-                    print(f"  ✅ SCRIPT IN MACHINE MATCH at index {i}")
-                return i
-            
-            # ============================================================
-            # MATCHING STRATEGY 4: Machine APDU contained in script APDU
-            # ============================================================
-            if machine_apdu in script_apdu:
-                if self.debug_mode:
-                    print(f"  ✅ MACHINE IN SCRIPT MATCH at index {i}")
-                return i
-            
-            # ============================================================
-            # MATCHING STRATEGY 5: First 10 chars match
-            # ============================================================
-            min_len = min(len(script_apdu), len(machine_apdu), 10)
-            if min_len >= 6 and script_apdu[:min_len] == machine_apdu[:min_len]:
-                if self.debug_mode:
-                    print(f"  ✅ FIRST {min_len} CHARS MATCH at index {i}")
-                return i
+        if found_index >= 0:
+            if self.debug_mode:
+                print(f"  ✅ {strategy} MATCH at index {found_index}")
+            return found_index
         
         if self.debug_mode:
+            # Get just the command bytes: 00B0000003 -> 00B0 (4 chars)
+            script_command = script_apdu[:4] if len(script_apdu) >= 4 else script_apdu
             print(f"  ❌ Not found in machine logs")
             print(f"  Looking for command like: {script_command}")
         
         return -1
 
-    def validate_script_vs_machine_log(self) -> str:
-        """MAIN: Complete validation logic"""
+    def _reset_validation(self) -> None:
         self.validation_results = []
         self.field_values = {}
         
@@ -569,6 +416,10 @@ class ScriptValidator:
             'skipped': 0,
             'not_found': 0
         }
+
+    def validate_script_vs_machine_log(self) -> str:
+        """MAIN: Complete validation logic"""
+        self._reset_validation()
         
         if not self.script_commands:
             return "❌ ERROR: No script commands to validate"
@@ -579,7 +430,66 @@ class ScriptValidator:
         print(f"\n🚀 Starting COMPLETE validation")
         print(f"   Script commands: {len(self.script_commands)}")
         print(f"   Machine logs: {len(self.machine_logs)}")
+        self._log_index = MachineLogIndex(self.machine_logs)
+        
+        self._validate_commands(lambda index: self.machine_logs[index])
+        
+        # Generate final report
+        return self._generate_complete_validation_report()
+
+    def validate_machine_log_stream(self, log_path: str) -> str:
+        """
+        STREAM: Complete validation of a machine log file without parsing it up front.
+        
+        Same results as parse_machine_log() + validate_script_vs_machine_log(),
+        but entries are parsed while the script commands are aligned and are
+        released once passed (see MachineLogStream), and self.machine_logs
+        stays empty. Only the log lines of failed commands are kept; they are
+        read back from the file after validation.
+        """
+        self._reset_validation()
+        
+        if not self.script_commands:
+            return "❌ ERROR: No script commands to validate"
+        
+        try:
+            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+                log_stream = MachineLogStream(self.iter_machine_log_entries(f, keep_lines=False))
+                if not log_stream.has_entries():
+                    return "❌ ERROR: No machine log entries"
+                
+                print(f"\n🚀 Starting COMPLETE validation (streaming)")
+                print(f"   Script commands: {len(self.script_commands)}")
+                print(f"   Machine log: {log_path}")
+                
+                failed_lines = self._validate_commands(log_stream.entry, log_stream)
+                print(f"   Machine log entries read: {log_stream.read_count}")
+            
+            self._attach_machine_lines(log_path, failed_lines)
+        except OSError as e:
+            return f"❌ ERROR: Cannot read machine log: {e}"
+        
+        # Generate final report
+        return self._generate_complete_validation_report()
+
+    def validate_lot(self, log_paths: List[str], workers: Optional[int] = None,
+                     report_folder: Optional[str] = None) -> Dict:
+        """
+        LOT: Validate many machine logs against the parsed script, in a process pool.
         
+        Each log is streamed and validated in a worker and gets its own report;
+        see lot_validation.validate_lot() for the returned lot summary.
+        """
+        from .lot_validation import validate_lot
+        return validate_lot(self.script_commands, log_paths, workers=workers, report_folder=report_folder)
+
+    def _validate_commands(self, entry_at, log_stream: Optional[MachineLogStream] = None) -> Dict[int, List[Dict]]:
+        """
+        Align and validate every script command; entry_at(index) is the machine log entry at index.
+        
+        Returns the failed results without their machine line text, by log line number.
+        """
+        failed_lines = {}
         current_machine_index = 0
         total_commands = len(self.script_commands)
         
@@ -605,10 +515,10 @@ class ScriptValidator:
                 continue
             
             # Find this script command in machine logs
-            found_index = self.find_script_command_in_machine_logs(script_cmd, current_machine_index)
+            found_index = self.find_script_command_in_machine_logs(script_cmd, current_machine_index, log_stream)
             
             if found_index >= 0:
-                machine_log = self.machine_logs[found_index]
+                machine_log = entry_at(found_index)
                 current_machine_index = found_index + 1
                 
                 # Validate the command
@@ -619,6 +529,8 @@ class ScriptValidator:
                     self.stats['passed'] += 1
                 else:
                     self.stats['failed'] += 1
+                    if validation_result.get('machine_line') is None:
+                        failed_lines.setdefault(machine_log.line_num, []).append(validation_result)
             else:
                 # Command not found
                 self.validation_results.append({
@@ -629,9 +541,23 @@ class ScriptValidator:
                 self.stats['not_found'] += 1
                 self.stats['failed'] += 1
         
-        # Generate final report
-        return self._generate_complete_validation_report()
-    
+        return failed_lines
+
+    @staticmethod
+    def _attach_machine_lines(log_path: str, failed_lines: Dict[int, List[Dict]]) -> None:
+        """Set the machine line of failed results, reading their lines back from the log"""
+        if not failed_lines:
+            return
+        last_line = max(failed_lines)
+        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line_num, line in enumerate(f, 1):
+                results = failed_lines.get(line_num)
+                if results:
+                    for result in results:
+                        result['machine_line'] = line.strip()
+                if line_num == last_line:
+                    break
+
     def _validate_single_command_complete(self, script_cmd: Dict, machine_log: Dict) -> Dict:
         """VALIDATE: Complete validation for a single command - ADDED EXPECT/RECEIVE SUPPORT"""
         script_apdu = script_cmd.get('apdu', '')
@@ -774,14 +700,13 @@ class ScriptValidator:
             detailed_info.append(f"Extracting fields from APDU: {script_field_names}")
             
             if script_field_names and machine_apdu:
-                pattern = re.escape(script_apdu)
-                for field_name in script_field_names:
-                    field_pattern_percent = re.escape(f'%{field_name}%')
-                    field_pattern_angle = re.escape(f'<{field_name}>')
-                    pattern = pattern.replace(field_pattern_percent, r'([A-F0-9]+)')
-                    pattern = pattern.replace(field_pattern_angle, r'([A-F0-9]+)')
+                # Compiled with the script program; commands built elsewhere compile it here
+                matcher = script_cmd.get('apdu_matcher')
+                if matcher is None:
+                    pattern = script_cmd.get('apdu_pattern') or apdu_field_pattern(script_apdu, script_field_names)
+                    matcher = re.compile(pattern, re.IGNORECASE)
                 
-                match = re.match(pattern, machine_apdu, re.IGNORECASE)
+                match = matcher.match(machine_apdu)
                 if match:
                     for idx, field_name in enumerate(script_field_names):
                         if idx < len(match.groups()):
@@ -1126,18 +1051,8 @@ class ScriptValidator:
         Example: "63839393130303039313032303030303" → hex string
         """
         try:
-            hex_string = ""
-            # Process pairs of digits (ASCII decimal codes)
-            for i in range(0, len(ascii_numbers), 2):
-                if i + 1 < len(ascii_numbers):
-                    # Get two ASCII digits (e.g., "63")
-                    ascii_pair = ascii_numbers[i:i+2]
-                    # Convert ASCII decimal code to hex byte
-                    # Example: "63" (decimal) → 0x3F
-                    decimal_value = int(ascii_pair)
-                    hex_byte = format(decimal_value, '02X')
-                    hex_string += hex_byte
-            return hex_string
+            # Pairs of digits are ASCII decimal codes: "63" (decimal) → 0x3F
+            return sim_codec.decimal_pairs_to_hex(ascii_numbers)
         except Exception as e:
             print(f"Error converting ASCII numbers to hex: {e}")
             return ascii_numbers
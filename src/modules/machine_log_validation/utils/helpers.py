@@ -1,6 +1,8 @@
 import os
 import sys
 
+import sim_codec
+
 def normalize_imsi(imsi: str) -> str:
     """Normalize IMSI by removing spaces and non-digit characters"""
     if not imsi:
@@ -21,23 +23,14 @@ def swap_pairs(data: str) -> str:
     """
     if not data:
         return ""
-    
-    swapped = []
-    length = len(data)
-    for i in range(0, length - 1, 2):
-        swapped.append(data[i + 1])
-        swapped.append(data[i])
-    if length % 2 != 0:
-        swapped.append(data[-1])
-    return ''.join(swapped)
+    return sim_codec.swap_pairs(data)
 
 def hex_to_ascii(hex_string: str) -> str:
     """Convert hex string to ASCII, ignore invalid bytes"""
     if not hex_string:
         return ""
     try:
-        bytes_obj = bytes.fromhex(hex_string)
-        return bytes_obj.decode('ascii', errors='ignore')
+        return sim_codec.hex_to_ascii(hex_string, errors='ignore')
     except ValueError:
         # Raised if hex_string is invalid
         return hex_string
@@ -0,0 +1,423 @@
+"""
+MNO File Validator - Coordinator/worker mode for batch validation
+
+Batches are handed out through a filesystem queue on the shared folder, so
+workers on other hosts only need the same share mounted:
+
+    <queue_dir>/pending/batch_0000.json            job waiting for a worker
+    <queue_dir>/claimed/batch_0000@<worker>.json   job leased by a worker
+    <queue_dir>/results/batch_0000.json            finished batch report
+    <queue_dir>/STOP                               tells workers to exit
+
+Claiming is an atomic rename out of pending/. A worker keeps touching its
+claimed file while it runs; a claim that has not been touched for
+lease_timeout seconds belongs to a dead worker and goes back to pending/.
+
+Local run (several workers on one box):
+    python -m mno_file_validator.core.batch_coordinator coordinator <parent_folder> --local-workers 4
+Remote worker:
+    python -m mno_file_validator.core.batch_coordinator worker <parent_folder>/.mno_queue
+"""
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Callable
+
+# Add the modules path to sys.path
+current_dir = os.path.dirname(__file__)
+project_root = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
+modules_path = os.path.join(project_root, 'modules')
+
+if modules_path not in sys.path:
+    sys.path.insert(0, modules_path)
+
+from .validation_base import BaseValidator
+from .scm_validator import SCMValidator
+from ..utils.file_utils import find_matching_files, find_output_files, extract_header_info
+
+QUEUE_DIR_NAME = ".mno_queue"
+STOP_FILE = "STOP"
+
+
+def _job_name(batch_index: int) -> str:
+    return f"batch_{batch_index:04d}"
+
+
+def _write_json_atomic(path: Path, data: Dict):
+    """Write JSON next to the target and rename it in place"""
+    tmp_path = path.with_name(f".{path.name}.{socket.gethostname()}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class FileQueue:
+    """Directory based job queue shared between coordinator and workers"""
+
+    def __init__(self, queue_dir):
+        self.root = Path(queue_dir)
+        self.pending = self.root / "pending"
+        self.claimed = self.root / "claimed"
+        self.results = self.root / "results"
+
+    def create(self):
+        """Create an empty queue (removes leftovers from a previous run)"""
+        for folder in (self.pending, self.claimed, self.results):
+            folder.mkdir(parents=True, exist_ok=True)
+            for leftover in folder.glob("*.json"):
+                leftover.unlink()
+        stop_file = self.root / STOP_FILE
+        if stop_file.exists():
+            stop_file.unlink()
+
+    def put(self, job: Dict):
+        _write_json_atomic(self.pending / f"{job['job']}.json", job)
+
+    def claim(self, worker_id: str) -> Optional[Tuple[Path, Dict]]:
+        """Lease the first pending job, or None when nothing is waiting"""
+        for job_file in sorted(self.pending.glob("batch_*.json")):
+            claimed_file = self.claimed / f"{job_file.stem}@{worker_id}.json"
+            try:
+                os.rename(job_file, claimed_file)
+            except OSError:
+                continue  # Another worker got it first
+            os.utime(claimed_file)  # Lease starts now, not when the job was queued
+            job = _read_json(claimed_file)
+            if job is None:
+                continue
+            return claimed_file, job
+        return None
+
+    def release(self, claimed_file: Path):
+        try:
+            claimed_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def requeue_expired(self, lease_timeout: float, max_attempts: int) -> Tuple[List[str], List[Dict]]:
+        """Move stale claims back to pending; return (requeued, abandoned jobs)"""
+        requeued = []
+        abandoned = []
+        now = time.time()
+        for claimed_file in self.claimed.glob("batch_*@*.json"):
+            try:
+                age = now - claimed_file.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age < lease_timeout:
+                continue
+            job = _read_json(claimed_file)
+            job_name, worker_id = claimed_file.stem.split("@", 1)
+            if job is None or (self.results / f"{job_name}.json").exists():
+                self.release(claimed_file)
+                continue
+            job['attempts'] = job.get('attempts', 0) + 1
+            job['lost_by'] = worker_id
+            self.release(claimed_file)
+            if job['attempts'] >= max_attempts:
+                abandoned.append(job)
+            else:
+                self.put(job)
+                requeued.append(f"{job_name} (worker {worker_id})")
+        return requeued, abandoned
+
+    def put_result(self, result: Dict):
+        _write_json_atomic(self.results / f"{result['job']}.json", result)
+
+    def result_names(self) -> List[str]:
+        return sorted(p.stem for p in self.results.glob("batch_*.json"))
+
+    def get_result(self, job_name: str) -> Optional[Dict]:
+        return _read_json(self.results / f"{job_name}.json")
+
+    def stop(self):
+        (self.root / STOP_FILE).touch()
+
+    def stopped(self) -> bool:
+        return (self.root / STOP_FILE).exists()
+
+
+class BatchWorker(BaseValidator):
+    """Takes batches from a FileQueue and runs MNOFileComparator.process_batch on them"""
+
+    def __init__(self, queue_dir, worker_id: Optional[str] = None,
+                 heartbeat_interval: float = 5.0, poll_interval: float = 1.0,
+                 log_callback: Optional[Callable] = None):
+        super().__init__(log_callback)
+        self.queue = FileQueue(queue_dir)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+
+    def run(self, max_idle: Optional[float] = None) -> int:
+        """Process jobs until the coordinator stops the queue; return number of batches done"""
+        processed = 0
+        idle_since = time.time()
+        self.log(f"Worker {self.worker_id} watching {self.queue.root}")
+
+        while not self.queue.stopped():
+            claim = self.queue.claim(self.worker_id)
+            if claim is None:
+                if max_idle is not None and time.time() - idle_since > max_idle:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            claimed_file, job = claim
+            self.log(f"Worker {self.worker_id} took {job['job']}")
+            result = self._run_job(claimed_file, job)
+            self.queue.put_result(result)
+            self.queue.release(claimed_file)
+            processed += 1
+            idle_since = time.time()
+
+        self.log(f"Worker {self.worker_id} finished ({processed} batches)")
+        return processed
+
+    def _run_job(self, claimed_file: Path, job: Dict) -> Dict:
+        """Validate one batch while keeping the lease on claimed_file alive"""
+        from .file_comparator import MNOFileComparator
+
+        stop_heartbeat = threading.Event()
+
+        def heartbeat():
+            while not stop_heartbeat.wait(self.heartbeat_interval):
+                try:
+                    os.utime(claimed_file)
+                except FileNotFoundError:
+                    return  # Lease was taken away from us
+
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+
+        log_lines = []
+        try:
+            comparator = MNOFileComparator()
+            comparator.set_log_callback(lambda message, level="INFO": log_lines.append([message, level]))
+            comparator.set_chip_type(job['chip_type'])
+
+            batch_index = job['batch_index']
+            if job.get('previous_tracking'):
+                comparator.scm_validator.batch_tracking[f"batch_{batch_index-1}"] = job['previous_tracking']
+
+            parent_folder = Path(job['parent_folder'])
+            if not parent_folder.exists():
+                # Share mounted somewhere else on this host
+                parent_folder = self.queue.root.parent
+            match = {
+                'in_file': parent_folder / job['in_file'],
+                'out_folder': parent_folder / job['out_folder'],
+                'suffix': job['suffix']
+            }
+            passed = comparator.process_batch(batch_index, match)
+            report = comparator.excel_reports[-1] if comparator.excel_reports else None
+        except Exception as e:
+            log_lines.append([f"❌ Worker {self.worker_id} crashed on batch: {str(e)}", "ERROR"])
+            passed = False
+            report = None
+        finally:
+            stop_heartbeat.set()
+            heartbeat_thread.join()
+
+        return {
+            'job': job['job'],
+            'batch_index': job['batch_index'],
+            'worker': self.worker_id,
+            'passed': passed,
+            'report': report,
+            'log': log_lines
+        }
+
+
+def run_worker(queue_dir: str, max_idle: Optional[float] = None) -> int:
+    """Entry point for a worker process"""
+    worker = BatchWorker(queue_dir, log_callback=lambda message, level="INFO": print(f"[{level}] {message}"))
+    return worker.run(max_idle=max_idle)
+
+
+class BatchCoordinator(BaseValidator):
+    """Splits a parent folder into batch jobs and collects the worker results"""
+
+    def __init__(self, comparator, queue_dir: Optional[str] = None,
+                 lease_timeout: float = 60.0, poll_interval: float = 1.0,
+                 max_attempts: int = 3, log_callback: Optional[Callable] = None):
+        super().__init__(log_callback)
+        self.comparator = comparator
+        self.queue_dir = queue_dir
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.scm_reader = SCMValidator()
+
+    def run(self, parent_folder: str, local_workers: int = 0) -> Tuple[int, int]:
+        """Queue every batch, wait for all results and fill comparator.excel_reports"""
+        queue = FileQueue(self.queue_dir or Path(parent_folder) / QUEUE_DIR_NAME)
+        queue.create()
+
+        matches = find_matching_files(parent_folder)
+        self.log(f"Found {len(matches)} IN file and OUT folder pairs")
+
+        if not matches:
+            self.log("ERROR: No matching IN files and OUT folders found", "ERROR")
+            return 0, 0
+
+        for batch_index, match in enumerate(matches):
+            queue.put(self._make_job(parent_folder, batch_index, match, matches))
+        self.log(f"Queued {len(matches)} batches in {queue.root}")
+
+        processes = []
+        for _ in range(local_workers):
+            process = multiprocessing.Process(target=run_worker, args=(str(queue.root),), daemon=True)
+            process.start()
+            processes.append(process)
+        if processes:
+            self.log(f"Started {len(processes)} local workers")
+
+        results = {}
+        try:
+            while len(results) < len(matches):
+                for job_name in queue.result_names():
+                    if job_name not in results:
+                        result = queue.get_result(job_name)
+                        if result is not None:
+                            results[job_name] = result
+                            self.log(f"Received {job_name} from {result['worker']}")
+
+                requeued, abandoned = queue.requeue_expired(self.lease_timeout, self.max_attempts)
+                for job_name in requeued:
+                    self.log(f"⚠️ Lease expired, requeued {job_name}", "WARNING")
+                for job in abandoned:
+                    self.log(f"❌ {job['job']} lost {job['attempts']} times, giving up", "ERROR")
+                    results[job['job']] = self._abandoned_result(job)
+
+                if len(results) < len(matches):
+                    time.sleep(self.poll_interval)
+        finally:
+            queue.stop()
+            for process in processes:
+                process.join(timeout=self.poll_interval * 5)
+
+        return self._collect(results)
+
+    def _make_job(self, parent_folder: str, batch_index: int, match: Dict, matches: List[Dict]) -> Dict:
+        job = {
+            'job': _job_name(batch_index),
+            'batch_index': batch_index,
+            'parent_folder': str(Path(parent_folder).resolve()),
+            'in_file': match['in_file'].name,
+            'out_folder': match['out_folder'].name,
+            'suffix': match['suffix'],
+            'chip_type': self.comparator.chip_type,
+            'attempts': 0,
+            'previous_tracking': None
+        }
+        if batch_index > 0:
+            job['previous_tracking'] = self._previous_tracking(matches[batch_index - 1])
+        return job
+
+    def _previous_tracking(self, previous_match: Dict) -> Optional[Dict]:
+        """Last MSN/MSC of the previous batch, which seeds the SCM sequence check"""
+        output_files = find_output_files(previous_match['out_folder'], previous_match['suffix'])
+        if any(path is None for path in output_files.values()):
+            return None
+        header_info = extract_header_info(previous_match['in_file'])
+        if not header_info.get('sim_quantity') or not header_info.get('batch_number'):
+            return None
+        return self.scm_reader.read_batch_tail(output_files['SCM'], header_info['sim_quantity'])
+
+    def _abandoned_result(self, job: Dict) -> Dict:
+        message = f"Batch lost by {job['attempts']} workers (last: {job.get('lost_by')})"
+        return {
+            'job': job['job'],
+            'batch_index': job['batch_index'],
+            'worker': None,
+            'passed': False,
+            'report': {
+                'batch_number': job['in_file'],
+                'po_number': 'Unknown',
+                'sim_quantity': 0,
+                'validation_results': self.comparator._create_validation_results(False, message),
+                'all_passed': False
+            },
+            'log': [[f"❌ FAIL: {message}", "ERROR"]]
+        }
+
+    def _collect(self, results: Dict[str, Dict]) -> Tuple[int, int]:
+        """Replay worker logs in batch order and store reports on the comparator"""
+        success_count = 0
+        failure_count = 0
+
+        for result in sorted(results.values(), key=lambda r: r['batch_index']):
+            for message, level in result['log']:
+                self.log(message, level)
+
+            report = result['report']
+            if report:
+                report['validation_results'] = {
+                    name: tuple(value) for name, value in report['validation_results'].items()
+                }
+                self.comparator.excel_reports.append(report)
+
+            if result['passed']:
+                success_count += 1
+            else:
+                failure_count += 1
+
+        return success_count, failure_count
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Distributed MNO batch validation")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    coordinator_parser = sub.add_parser("coordinator", help="Queue batches and collect results")
+    coordinator_parser.add_argument("parent_folder")
+    coordinator_parser.add_argument("--chip-type", default="SAMSUNG 340")
+    coordinator_parser.add_argument("--local-workers", type=int, default=0)
+    coordinator_parser.add_argument("--queue-dir", default=None)
+    coordinator_parser.add_argument("--lease-timeout", type=float, default=60.0)
+    coordinator_parser.add_argument("--no-excel", action="store_true")
+
+    worker_parser = sub.add_parser("worker", help="Process batches from a queue folder")
+    worker_parser.add_argument("queue_dir")
+    worker_parser.add_argument("--max-idle", type=float, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.mode == "worker":
+        run_worker(args.queue_dir, max_idle=args.max_idle)
+        return
+
+    from .file_comparator import MNOFileComparator
+
+    comparator = MNOFileComparator()
+    comparator.set_log_callback(lambda message, level="INFO": print(f"[{level}] {message}"))
+    comparator.set_chip_type(args.chip_type)
+    success_count, failure_count = comparator.run_distributed_validation(
+        args.parent_folder, local_workers=args.local_workers,
+        queue_dir=args.queue_dir, lease_timeout=args.lease_timeout
+    )
+    print(f"Passed: {success_count}, Failed: {failure_count}")
+    if not args.no_excel and comparator.excel_reports:
+        comparator.generate_excel_reports(args.parent_folder)
+
+
+if __name__ == "__main__":
+    main()
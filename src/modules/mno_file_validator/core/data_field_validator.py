@@ -16,7 +16,15 @@ if modules_path not in sys.path:
     sys.path.insert(0, modules_path)
 
 from .validation_base import BaseValidator, ValidationResult
-from ..utils.file_utils import luhn_check
+from ..utils.file_utils import luhn_check, open_text
+from ..utils.shared_columns import (
+    SharedColumns, IN_COLUMNS, CNUM_COLUMNS, read_rows, chunk_ranges
+)
+
+DATA_FIELD_MAPPING = [
+    ("IMPU", 0), ("IMPI", 1), ("IMSI", 2),
+    ("IMSI I", 3), ("ICCID", 4)
+]
 
 class DataFieldValidator(BaseValidator):
     """Handles data field validation between IN and CNUM files"""
@@ -25,10 +33,10 @@ class DataFieldValidator(BaseValidator):
                            sim_quantity: int) -> ValidationResult:
         """Validate ALL data fields match exactly between IN and CNUM files"""
         try:
-            with open(in_file, 'r', encoding='utf-8') as f:
+            with open_text(in_file) as f:
                 in_lines = f.readlines()
             
-            with open(cnum_file, 'r', encoding='utf-8') as f:
+            with open_text(cnum_file) as f:
                 cnum_lines = f.readlines()
             
             if len(in_lines) < 15 + sim_quantity:
@@ -61,13 +69,8 @@ class DataFieldValidator(BaseValidator):
                 in_fields = in_line.split('\t')
                 cnum_fields = cnum_line.split('\t')
                 
-                field_mapping = [
-                    ("IMPU", 0), ("IMPI", 1), ("IMSI", 2), 
-                    ("IMSI I", 3), ("ICCID", 4)
-                ]
-                
                 line_errors = self._validate_data_line_fields(
-                    in_fields, cnum_fields, field_mapping, i + 16
+                    in_fields, cnum_fields, DATA_FIELD_MAPPING, i + 16
                 )
                 errors.extend(line_errors)
                 
@@ -95,6 +98,65 @@ class DataFieldValidator(BaseValidator):
         except Exception as e:
             return ValidationResult(False, f"Error during data validation: {str(e)}", [])
     
+    def validate_data_columns(self, columns: SharedColumns, sim_quantity: int,
+                              pool=None, chunk_size: int = 5000) -> ValidationResult:
+        """Validate data fields from shared batch columns, one chunk per pool task"""
+        try:
+            ranges = chunk_ranges(sim_quantity, chunk_size)
+            if pool is None:
+                chunk_results = [
+                    self._validate_column_rows(columns, start, stop)
+                    for start, stop in ranges
+                ]
+            else:
+                chunk_results = pool.starmap(
+                    _data_field_chunk,
+                    [(columns.descriptor, start, stop) for start, stop in ranges]
+                )
+            
+            errors = []
+            total_checked = 0
+            for chunk_errors, checked in chunk_results:
+                errors.extend(chunk_errors)
+                total_checked += checked
+                self.log(f"  Checked {total_checked}/{sim_quantity} lines...")
+            
+            if errors:
+                error_msg = (
+                    f"Data validation failed - {len(errors)} errors found "
+                    f"in {total_checked} lines"
+                )
+                return ValidationResult(False, error_msg, errors[:50])
+            
+            success_msg = (
+                f"All data fields validated successfully - "
+                f"{total_checked} lines checked with no errors"
+            )
+            return ValidationResult(True, success_msg, [])
+            
+        except Exception as e:
+            return ValidationResult(False, f"Error during data validation: {str(e)}", [])
+    
+    def _validate_column_rows(self, columns: SharedColumns,
+                              start: int, stop: int) -> Tuple[List[str], int]:
+        """Validate rows start..stop of the shared columns"""
+        errors = []
+        checked = 0
+        in_rows = read_rows(columns, IN_COLUMNS, "in", start, stop)
+        cnum_rows = read_rows(columns, CNUM_COLUMNS, "cnum", start, stop)
+        
+        for i, in_fields, cnum_fields in zip(range(start, stop), in_rows, cnum_rows):
+            if not in_fields or not cnum_fields:
+                continue
+            
+            errors.extend(self._validate_data_line_fields(
+                in_fields, cnum_fields, DATA_FIELD_MAPPING, i + 16
+            ))
+            errors.extend(self._validate_pin_fields(cnum_fields, i + 16))
+            checked += 1
+        
+        return errors, checked
+    
     def _validate_data_line_fields(self, in_fields: List[str], 
                                  cnum_fields: List[str],
                                  field_mapping: List[tuple], 
@@ -225,4 +287,13 @@ class DataFieldValidator(BaseValidator):
             )
             errors.append(error_msg)
         
-        return errors
\ No newline at end of file
+        return errors
+
+
+def _data_field_chunk(descriptor: dict, start: int, stop: int) -> Tuple[List[str], int]:
+    """Pool task: attach to the batch columns and validate one chunk"""
+    columns = SharedColumns.attach(descriptor)
+    try:
+        return DataFieldValidator()._validate_column_rows(columns, start, stop)
+    finally:
+        columns.close()
@@ -3,6 +3,8 @@ MNO File Comparator - Core validation logic (Refactored)
 """
 import os
 import sys
+import multiprocessing
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Callable
 
 # Add the modules path to sys.path to fix imports
@@ -20,15 +22,17 @@ from mno_file_validator.core.validation_base import BaseValidator
 # etc.
 
 # To:
-from .simoda_validator import SIMODAValidator
-from .validation_base import BaseValidator
+from .simoda_validator import SIMODAValidator, _simoda_task
+from .validation_base import BaseValidator, ValidationResult
 from .header_validator import HeaderValidator
 from .data_field_validator import DataFieldValidator
 from .scm_validator import SCMValidator
 from ..utils.excel_report_generator import ExcelReportGenerator
+from ..utils.incremental_report_writer import IncrementalReportWriter
+from ..utils.shared_columns import SharedColumns, load_batch_columns, share_tracker_with_pool
 from ..utils.file_utils import (
     parse_filename, find_matching_files, find_output_files,
-    extract_header_info, validate_quantity
+    extract_header_info, validate_quantity, open_text
 )
 
 class MNOFileComparator(BaseValidator):
@@ -38,6 +42,10 @@ class MNOFileComparator(BaseValidator):
         super().__init__()
         self.chip_type = "SAMSUNG 340"
         self.excel_reports = []
+        self.column_workers = 0
+        self._column_pool = None
+        self.incremental_report = True
+        self.report_writer = None
         
         # Initialize validators
         self.header_validator = HeaderValidator()
@@ -60,11 +68,20 @@ class MNOFileComparator(BaseValidator):
         self.scm_validator.set_chip_type(chip_type)
         self.simoda_validator.set_chip_type(chip_type)
     
+    def set_column_workers(self, workers: int):
+        """Validate DATA_FIELD/SCM/SIMODA of each batch in this many processes (0 = off)"""
+        self.column_workers = workers
+    
+    def set_incremental_report(self, enabled: bool):
+        """Write the Excel report batch by batch during run_validation"""
+        self.incremental_report = enabled
+    
     def clear_tracking(self):
         """Clear batch tracking data"""
         super().clear_tracking()
         self.scm_validator.clear_tracking()
         self.excel_reports.clear()
+        self.report_writer = None
     
     def run_validation(self, parent_folder: str) -> Tuple[int, int]:
         """Run the complete validation process"""
@@ -78,15 +95,66 @@ class MNOFileComparator(BaseValidator):
         success_count = 0
         failure_count = 0
         
-        for batch_index, match in enumerate(matches):
-            batch_success = self.process_batch(batch_index, match)
-            if batch_success:
-                success_count += 1
-            else:
-                failure_count += 1
+        self._start_report_writer(parent_folder)
+        
+        if self.column_workers > 1:
+            share_tracker_with_pool()
+            self._column_pool = multiprocessing.Pool(self.column_workers)
+        
+        try:
+            for batch_index, match in enumerate(matches):
+                report_count = len(self.excel_reports)
+                batch_success = self.process_batch(batch_index, match)
+                # A batch that raised adds no report; don't write the previous one again
+                if len(self.excel_reports) > report_count:
+                    self._append_to_report()
+                if batch_success:
+                    success_count += 1
+                else:
+                    failure_count += 1
+        finally:
+            if self._column_pool is not None:
+                self._column_pool.close()
+                self._column_pool.join()
+                self._column_pool = None
         
         return success_count, failure_count
+
+    def _start_report_writer(self, parent_folder: str):
+        """Open the incremental report for this run"""
+        self.report_writer = None
+        if not self.incremental_report:
+            return
+        try:
+            writer = IncrementalReportWriter(self.excel_generator)
+            excel_path = writer.start(parent_folder)
+            self.report_writer = writer
+            self.log(f"Writing Excel report as batches complete: {excel_path}")
+        except Exception as e:
+            self.log(f"⚠️ Incremental Excel report disabled: {str(e)}", "WARNING")
+    
+    def _append_to_report(self):
+        """Flush the batch that just finished to the incremental report"""
+        if self.report_writer is None or not self.excel_reports:
+            return
+        try:
+            self.report_writer.append_batch(self.excel_reports[-1])
+        except Exception as e:
+            self.log(f"⚠️ Incremental Excel report disabled: {str(e)}", "WARNING")
+            self.report_writer = None
     
+    def run_distributed_validation(self, parent_folder: str, local_workers: int = 0,
+                                   queue_dir: Optional[str] = None,
+                                   lease_timeout: float = 60.0) -> Tuple[int, int]:
+        """Run the validation through the shared-folder worker queue"""
+        from .batch_coordinator import BatchCoordinator
+
+        self.report_writer = None  # Results arrive at the end; use the full report
+        coordinator = BatchCoordinator(self, queue_dir=queue_dir,
+                                       lease_timeout=lease_timeout,
+                                       log_callback=self.log_callback)
+        return coordinator.run(parent_folder, local_workers=local_workers)
+
     def process_batch(self, batch_index: int, match: Dict) -> bool:
         """Process a single batch of files"""
         try:
@@ -161,64 +229,19 @@ class MNOFileComparator(BaseValidator):
             # Extract CNUM ICCIDs and IMSIs for SCM and SIMODA validation
             cnum_iccids, cnum_imsis = self.extract_cnum_iccids_imsis(output_files['CNUM'], sim_quantity)
             
-            # Run all validations
-            validation_results = {}
-            
-            # 1. ORIG_TRIG Validation
-            self.log(f"\n1. ORIG_TRIG Validation:")
-            orig_trig_result = self.validate_orig_trig(output_files['ORIG_TRIG'], output_files)
-            validation_results['ORIG_TRIG'] = orig_trig_result.to_tuple()
-            self._log_validation_result("ORIG_TRIG", orig_trig_result.to_tuple())
-            
-            # 2. Header Validation
-            self.log(f"\n2. Header Validation:")
-            header_result = self.header_validator.validate_headers(match['in_file'], output_files['CNUM'])
-            validation_results['HEADER'] = header_result.to_tuple()
-            self._log_validation_result("HEADER", header_result.to_tuple())
-            
-            # 3. Data Field Validation
-            self.log(f"\n3. Data Field Validation:")
-            data_result = self.data_field_validator.validate_data_fields(
-                match['in_file'], output_files['CNUM'], sim_quantity
-            )
-            validation_results['DATA_FIELD'] = data_result.to_tuple()
-            self._log_validation_result("DATA_FIELD", data_result.to_tuple())
-            
-            # 4. CNUM Quantity Validation
-            self.log(f"\n4. CNUM Quantity Validation:")
-            cnum_quantity_success, cnum_quantity_message = validate_quantity(
-                output_files['CNUM'], sim_quantity, 15
-            )
-            cnum_quantity_result = (cnum_quantity_success, cnum_quantity_message, [])
-            validation_results['CNUM_QUANTITY'] = cnum_quantity_result
-            self._log_validation_result("CNUM_QUANTITY", cnum_quantity_result)
-            
-            # 5. SCM Quantity Validation
-            self.log(f"\n5. SCM Quantity Validation:")
-            scm_quantity_success, scm_quantity_message = validate_quantity(
-                output_files['SCM'], sim_quantity, 1
-            )
-            scm_quantity_result = (scm_quantity_success, scm_quantity_message, [])
-            validation_results['SCM_QUANTITY'] = scm_quantity_result
-            self._log_validation_result("SCM_QUANTITY", scm_quantity_result)
-            
-            # 6. SCM Validation (with ICCID/IMSI validation)
-            self.log(f"\n6. SCM Validation:")
-            scm_result = self.scm_validator.validate_scm_structure(
-                output_files['SCM'], sim_quantity, po_number_from_header,
-                batch_number_from_header, sku, batch_index,
-                cnum_iccids, cnum_imsis
-            )
-            validation_results['SCM_STRUCTURE'] = scm_result.to_tuple()
-            self._log_validation_result("SCM_STRUCTURE", scm_result.to_tuple())
-            
-            # 7. SIMODA Validation
-            self.log(f"\n7. SIMODA Validation:")
-            simoda_result = self.simoda_validator.validate_simoda_file(
-                output_files['SIMODA'], cnum_iccids, cnum_imsis
+            # Share the batch columns with the worker pool (None when running serially)
+            shared_columns = self._share_batch_columns(
+                match['in_file'], output_files, sim_quantity, cnum_iccids, cnum_imsis
             )
-            validation_results['SIMODA'] = simoda_result.to_tuple()
-            self._log_validation_result("SIMODA", simoda_result.to_tuple())
+            try:
+                validation_results = self._run_batch_validations(
+                    match, output_files, sim_quantity, po_number_from_header,
+                    batch_number_from_header, sku, batch_index,
+                    cnum_iccids, cnum_imsis, shared_columns
+                )
+            finally:
+                if shared_columns is not None:
+                    shared_columns.close()
             
             # Determine overall result
             all_passed = all(result[0] for result in validation_results.values())
@@ -244,6 +267,110 @@ class MNOFileComparator(BaseValidator):
         except Exception as e:
             self.log(f"❌ Error processing batch: {str(e)}", "ERROR")
             return False
+    
+    def _share_batch_columns(self, in_file, output_files: Dict, sim_quantity: int,
+                             cnum_iccids: List[str], cnum_imsis: List[str]) -> Optional[SharedColumns]:
+        """Put the batch columns in shared memory for the column pool"""
+        if self._column_pool is None:
+            return None
+        try:
+            columns = load_batch_columns(in_file, output_files['CNUM'], output_files['SCM'], sim_quantity)
+        except Exception as e:
+            self.log(f"⚠️ Could not load batch columns, validating serially: {str(e)}", "WARNING")
+            return None
+        if columns is None:
+            return None
+        columns['ref_iccid'] = cnum_iccids
+        columns['ref_imsi'] = cnum_imsis
+        return SharedColumns.create(columns)
+    
+    def _run_batch_validations(self, match: Dict, output_files: Dict, sim_quantity: int,
+                               po_number_from_header: str, batch_number_from_header: str,
+                               sku: str, batch_index: int, cnum_iccids: List[str],
+                               cnum_imsis: List[str],
+                               shared_columns: Optional[SharedColumns]) -> Dict:
+        """Run the seven batch validations and return their result tuples"""
+        validation_results = {}
+        
+        # SIMODA only needs the CNUM columns, so start it while the rest runs
+        simoda_async = None
+        if shared_columns is not None and isinstance(output_files['SIMODA'], Path):
+            simoda_async = self._column_pool.apply_async(
+                _simoda_task,
+                (shared_columns.descriptor, str(output_files['SIMODA']), self.chip_type)
+            )
+        
+        # 1. ORIG_TRIG Validation
+        self.log(f"\n1. ORIG_TRIG Validation:")
+        orig_trig_result = self.validate_orig_trig(output_files['ORIG_TRIG'], output_files)
+        validation_results['ORIG_TRIG'] = orig_trig_result.to_tuple()
+        self._log_validation_result("ORIG_TRIG", orig_trig_result.to_tuple())
+        
+        # 2. Header Validation
+        self.log(f"\n2. Header Validation:")
+        header_result = self.header_validator.validate_headers(match['in_file'], output_files['CNUM'])
+        validation_results['HEADER'] = header_result.to_tuple()
+        self._log_validation_result("HEADER", header_result.to_tuple())
+        
+        # 3. Data Field Validation
+        self.log(f"\n3. Data Field Validation:")
+        if shared_columns is not None:
+            data_result = self.data_field_validator.validate_data_columns(
+                shared_columns, sim_quantity, self._column_pool
+            )
+        else:
+            data_result = self.data_field_validator.validate_data_fields(
+                match['in_file'], output_files['CNUM'], sim_quantity
+            )
+        validation_results['DATA_FIELD'] = data_result.to_tuple()
+        self._log_validation_result("DATA_FIELD", data_result.to_tuple())
+        
+        # 4. CNUM Quantity Validation
+        self.log(f"\n4. CNUM Quantity Validation:")
+        cnum_quantity_success, cnum_quantity_message = validate_quantity(
+            output_files['CNUM'], sim_quantity, 15
+        )
+        cnum_quantity_result = (cnum_quantity_success, cnum_quantity_message, [])
+        validation_results['CNUM_QUANTITY'] = cnum_quantity_result
+        self._log_validation_result("CNUM_QUANTITY", cnum_quantity_result)
+        
+        # 5. SCM Quantity Validation
+        self.log(f"\n5. SCM Quantity Validation:")
+        scm_quantity_success, scm_quantity_message = validate_quantity(
+            output_files['SCM'], sim_quantity, 1
+        )
+        scm_quantity_result = (scm_quantity_success, scm_quantity_message, [])
+        validation_results['SCM_QUANTITY'] = scm_quantity_result
+        self._log_validation_result("SCM_QUANTITY", scm_quantity_result)
+        
+        # 6. SCM Validation (with ICCID/IMSI validation)
+        self.log(f"\n6. SCM Validation:")
+        if shared_columns is not None:
+            scm_result = self.scm_validator.validate_scm_columns(
+                shared_columns, sim_quantity, po_number_from_header,
+                batch_number_from_header, sku, batch_index, self._column_pool
+            )
+        else:
+            scm_result = self.scm_validator.validate_scm_structure(
+                output_files['SCM'], sim_quantity, po_number_from_header,
+                batch_number_from_header, sku, batch_index,
+                cnum_iccids, cnum_imsis
+            )
+        validation_results['SCM_STRUCTURE'] = scm_result.to_tuple()
+        self._log_validation_result("SCM_STRUCTURE", scm_result.to_tuple())
+        
+        # 7. SIMODA Validation
+        self.log(f"\n7. SIMODA Validation:")
+        if simoda_async is not None:
+            simoda_result = ValidationResult(*simoda_async.get())
+        else:
+            simoda_result = self.simoda_validator.validate_simoda_file(
+                output_files['SIMODA'], cnum_iccids, cnum_imsis
+            )
+        validation_results['SIMODA'] = simoda_result.to_tuple()
+        self._log_validation_result("SIMODA", simoda_result.to_tuple())
+        
+        return validation_results
         
     def extract_key_from_in_filename(self, filename: str) -> str:
         filename = filename.replace(".txt", "").replace(".cps", "")
@@ -280,7 +407,7 @@ class MNOFileComparator(BaseValidator):
 
         # Read ORIG_TRIG
         try:
-            with open(orig_trig_file, "r", encoding="utf-8") as f:
+            with open_text(orig_trig_file) as f:
                 content = f.read()
         except Exception as e:
             return ValidationResult(False, f"Error reading ORIG_TRIG file: {str(e)}", [])
@@ -328,7 +455,7 @@ class MNOFileComparator(BaseValidator):
     def extract_cnum_iccids_imsis(self, cnum_file, sim_quantity):
         """Extract ICCIDs and IMSIs from CNUM file"""
         try:
-            with open(cnum_file, 'r', encoding='utf-8') as f:
+            with open_text(cnum_file) as f:
                 lines = f.readlines()
             
             data_lines = lines[15:15+sim_quantity]
@@ -350,7 +477,14 @@ class MNOFileComparator(BaseValidator):
     def generate_excel_reports(self, parent_folder: str):
         """Generate professional Excel reports for all batches"""
         try:
-            excel_path = self.excel_generator.generate_excel_reports(self.excel_reports, parent_folder)
+            writer = self.report_writer
+            if (writer is not None and writer.workbook is not None
+                    and writer.excel_path.parent == Path(parent_folder)
+                    and len(writer.reports) == len(self.excel_reports)):
+                # Batches are already on disk; only hyperlinks and totals are left
+                excel_path = writer.finalize()
+            else:
+                excel_path = self.excel_generator.generate_excel_reports(self.excel_reports, parent_folder)
             self.log(f"✅ Excel report generated: {excel_path}", "SUCCESS")
             return excel_path
         except Exception as e:
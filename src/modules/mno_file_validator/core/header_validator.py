@@ -15,6 +15,7 @@ if modules_path not in sys.path:
     sys.path.insert(0, modules_path)
 
 from .validation_base import BaseValidator, ValidationResult
+from ..utils.file_utils import open_text
 
 class HeaderValidator(BaseValidator):
     """Handles header validation between IN and CNUM files"""
@@ -22,13 +23,13 @@ class HeaderValidator(BaseValidator):
     def validate_headers(self, in_file: Path, cnum_file: Path) -> ValidationResult:
         """Validate first 15 lines match exactly between IN and CNUM files"""
         try:
-            with open(in_file, 'r', encoding='utf-8') as f_in:
+            with open_text(in_file) as f_in:
                 in_lines = [
                     line.rstrip('\n\r') 
                     for line in f_in.readlines()[:15]
                 ]
             
-            with open(cnum_file, 'r', encoding='utf-8') as f_cnum:
+            with open_text(cnum_file) as f_cnum:
                 cnum_lines = [
                     line.rstrip('\n\r') 
                     for line in f_cnum.readlines()[:15]
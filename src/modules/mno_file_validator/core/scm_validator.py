@@ -4,7 +4,7 @@ MNO File Validator - SCM file validation logic
 import re
 import os
 import sys
-from typing import List, Tuple, Set, Optional, Callable
+from typing import Dict, List, Tuple, Set, Optional, Callable
 from pathlib import Path
 
 # Add the modules path to sys.path
@@ -16,6 +16,8 @@ if modules_path not in sys.path:
     sys.path.insert(0, modules_path)
 
 from .validation_base import BaseValidator, ValidationResult
+from ..utils.file_utils import open_text
+from ..utils.shared_columns import SharedColumns, SCM_COLUMNS, read_rows, chunk_ranges
 
 class SCMValidator(BaseValidator):
     """Handles SCM file structure validation"""
@@ -67,7 +69,7 @@ class SCMValidator(BaseValidator):
                             cnum_iccids: List[str], cnum_imsis: List[str]) -> ValidationResult:
         """Validate SCM file structure with proper MSN and MSC format"""
         try:
-            with open(scm_file, 'r', encoding='utf-8') as f:
+            with open_text(scm_file) as f:
                 lines = f.readlines()
             
             data_lines = lines[1:1+sim_quantity]
@@ -98,65 +100,28 @@ class SCMValidator(BaseValidator):
             last_msn_in_batch = None
             last_msc_in_batch = None
             
+            context = {
+                'batch_number': batch_number,
+                'po_number': po_number,
+                'processed_sku': processed_sku,
+                'po_last_3': po_last_3,
+                'expected_urt': expected_urt,
+                'expected_start_msn': expected_start_msn,
+                'expected_msc': expected_msc
+            }
+            
             for i, line in enumerate(data_lines, 2):
                 fields = line.strip().split('\t')
-                if len(fields) < 8:
-                    errors.append(
-                        f"Line {i}: Insufficient columns in SCM file, "
-                        f"expected 8, found {len(fields)}"
-                    )
-                    continue
-                
-                batchno = fields[4]
-                ponum = fields[5]
-                msn = fields[1]
-                msc = fields[7]
-                
-                # Extract ICCID and IMSI from SCM file
-                scm_iccid = fields[2] if len(fields) > 2 else ""
-                scm_imsi = fields[3] if len(fields) > 3 else ""
-                
-                # Validate basic fields
-                basic_errors = self._validate_scm_basic_fields(
-                    batchno, ponum, batch_number, po_number, i
-                )
-                errors.extend(basic_errors)
-                
-                # FIX: Calculate expected MSN based on position (every 500 records change)
-                record_position_in_batch = i - 2  # Line numbers start from 2
-                expected_msn_for_record = self._calculate_expected_msn(
-                    expected_start_msn, record_position_in_batch
-                )
-                
-                # Validate MSN structure
-                msn_errors, last_msn_in_batch = self._validate_msn_structure(
-                    msn, processed_sku, po_last_3, expected_urt,
-                    expected_msn_for_record, i
-                )
-                errors.extend(msn_errors)
-                
-                # Validate MSC structure
-                msc_errors, last_msc_in_batch = self._validate_msc_structure(
-                    msc, processed_sku, po_last_3, expected_urt,
-                    expected_msc, msc_values, i
-                )
-                errors.extend(msc_errors)
-                
-                # Validate ICCID and IMSI in SCM file
-                iccid_imsi_errors = self._validate_scm_iccid_imsi(
-                    scm_iccid, scm_imsi, i
-                )
-                errors.extend(iccid_imsi_errors)
-                
-                # Cross-validate ICCID and IMSI between SCM and CNUM
                 if i-2 < len(cnum_iccids) and i-2 < len(cnum_imsis):
-                    expected_iccid = cnum_iccids[i-2]
-                    expected_imsi = cnum_imsis[i-2]
-                    
-                    cross_validation_errors = self._validate_scm_cnum_cross_reference(
-                        scm_iccid, scm_imsi, expected_iccid, expected_imsi, i
-                    )
-                    errors.extend(cross_validation_errors)
+                    expected_pair = (cnum_iccids[i-2], cnum_imsis[i-2])
+                else:
+                    expected_pair = None
+                row_errors, row_msn, row_msc = self._validate_scm_row(
+                    fields, i, context, msc_values, expected_pair
+                )
+                errors.extend(row_errors)
+                if len(fields) >= 8:
+                    last_msn_in_batch, last_msc_in_batch = row_msn, row_msc
             
             # Store tracking data
             self.batch_tracking[f"batch_{batch_index}"] = {
@@ -188,6 +153,215 @@ class SCMValidator(BaseValidator):
         except Exception as e:
             return ValidationResult(False, f"Error during SCM validation: {str(e)}", [])
                 
+    def _validate_scm_row(self, fields: List[str], i: int, context: Dict,
+                          msc_values: set, expected_pair: Optional[Tuple[str, str]]
+                          ) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """Validate one SCM data line; returns (errors, msn serial, msc serial)
+        
+        expected_pair is the (ICCID, IMSI) of the same CNUM row, if any.
+        """
+        errors = []
+        if len(fields) < 8:
+            errors.append(
+                f"Line {i}: Insufficient columns in SCM file, "
+                f"expected 8, found {len(fields)}"
+            )
+            return errors, None, None
+        
+        batchno = fields[4]
+        ponum = fields[5]
+        msn = fields[1]
+        msc = fields[7]
+        
+        # Extract ICCID and IMSI from SCM file
+        scm_iccid = fields[2] if len(fields) > 2 else ""
+        scm_imsi = fields[3] if len(fields) > 3 else ""
+        
+        # Validate basic fields
+        basic_errors = self._validate_scm_basic_fields(
+            batchno, ponum, context['batch_number'], context['po_number'], i
+        )
+        errors.extend(basic_errors)
+        
+        # FIX: Calculate expected MSN based on position (every 500 records change)
+        record_position_in_batch = i - 2  # Line numbers start from 2
+        expected_msn_for_record = self._calculate_expected_msn(
+            context['expected_start_msn'], record_position_in_batch
+        )
+        
+        # Validate MSN structure
+        msn_errors, last_msn = self._validate_msn_structure(
+            msn, context['processed_sku'], context['po_last_3'], context['expected_urt'],
+            expected_msn_for_record, i
+        )
+        errors.extend(msn_errors)
+        
+        # Validate MSC structure
+        msc_errors, last_msc = self._validate_msc_structure(
+            msc, context['processed_sku'], context['po_last_3'], context['expected_urt'],
+            context['expected_msc'], msc_values, i
+        )
+        errors.extend(msc_errors)
+        
+        # Validate ICCID and IMSI in SCM file
+        iccid_imsi_errors = self._validate_scm_iccid_imsi(
+            scm_iccid, scm_imsi, i
+        )
+        errors.extend(iccid_imsi_errors)
+        
+        # Cross-validate ICCID and IMSI between SCM and CNUM
+        if expected_pair is not None:
+            expected_iccid, expected_imsi = expected_pair
+            
+            cross_validation_errors = self._validate_scm_cnum_cross_reference(
+                scm_iccid, scm_imsi, expected_iccid, expected_imsi, i
+            )
+            errors.extend(cross_validation_errors)
+        
+        return errors, last_msn, last_msc
+    
+    def validate_scm_columns(self, columns: SharedColumns, sim_quantity: int,
+                             po_number: str, batch_number: str,
+                             sku: str, batch_index: int,
+                             pool=None, chunk_size: int = 5000) -> ValidationResult:
+        """Validate SCM rows from shared batch columns, one chunk per pool task
+        
+        CNUM ICCIDs/IMSIs are read from the ref_iccid/ref_imsi columns.
+        """
+        try:
+            processed_sku = self.process_sku_for_msn(sku) or "00000000"
+            po_last_3 = (
+                po_number[-3:] 
+                if po_number and len(po_number) >= 3 
+                else "000"
+            )
+            expected_start_msn, expected_msc = self._get_starting_serials(batch_index)
+            
+            # The first well-formed MSC is checked against expected_msc and all
+            # later rows against it, so find it up front for the chunks
+            ranges = chunk_ranges(sim_quantity, chunk_size)
+            first_msc_row, first_msc = self._first_column_msc(columns, ranges)
+            
+            context = {
+                'batch_number': batch_number,
+                'po_number': po_number,
+                'processed_sku': processed_sku,
+                'po_last_3': po_last_3,
+                'expected_urt': "URT",
+                'expected_start_msn': expected_start_msn,
+                'expected_msc': expected_msc,
+                'first_msc_row': first_msc_row,
+                'first_msc': first_msc
+            }
+            
+            if pool is None:
+                chunk_results = [
+                    self._validate_scm_column_rows(columns, start, stop, context)
+                    for start, stop in ranges
+                ]
+            else:
+                chunk_results = pool.starmap(
+                    _scm_chunk,
+                    [(columns.descriptor, start, stop, context) for start, stop in ranges]
+                )
+            
+            errors = []
+            for chunk_errors in chunk_results:
+                errors.extend(chunk_errors)
+            
+            # Store tracking data
+            tail = self._column_tail(columns, ranges)
+            self.batch_tracking[f"batch_{batch_index}"] = tail
+            last_msn_in_batch = tail['last_msn']
+            
+            if errors:
+                error_msg = (
+                    f"SCM Validation failed - "
+                    f"{len(errors)} errors found"
+                )
+                return ValidationResult(False, error_msg, errors[:15])
+            
+            msc_display = first_msc if first_msc else 'N/A'
+            success_msg = (
+                f"SCM structure validated - MSN blocks from {expected_start_msn} to {last_msn_in_batch}, MSC: {msc_display}"
+            )
+            return ValidationResult(True, success_msg, [])
+            
+        except Exception as e:
+            return ValidationResult(False, f"Error during SCM validation: {str(e)}", [])
+    
+    def _validate_scm_column_rows(self, columns: SharedColumns, start: int,
+                                  stop: int, context: Dict) -> List[str]:
+        """Validate rows start..stop of the shared columns"""
+        errors = []
+        first_msc_row = context['first_msc_row']
+        scm_rows = read_rows(columns, SCM_COLUMNS, "scm", start, stop)
+        
+        # CNUM reference rows (the lists may be shorter than the batch)
+        ref_stop = min(stop, len(columns['ref_iccid']), len(columns['ref_imsi']))
+        ref_pairs = list(zip(
+            columns['ref_iccid'].rows(start, max(ref_stop, start)),
+            columns['ref_imsi'].rows(start, max(ref_stop, start))
+        ))
+        
+        for row, fields in zip(range(start, stop), scm_rows):
+            if not fields:
+                fields = ['']  # Same as ''.split('\t') for an empty line
+            msc_values = (
+                {context['first_msc']}
+                if first_msc_row is not None and row > first_msc_row
+                else set()
+            )
+            expected_pair = ref_pairs[row - start] if row < ref_stop else None
+            row_errors, _, _ = self._validate_scm_row(
+                fields, row + 2, context, msc_values, expected_pair
+            )
+            errors.extend(row_errors)
+        
+        return errors
+    
+    def _first_column_msc(self, columns: SharedColumns,
+                          ranges: List[tuple]) -> Tuple[Optional[int], Optional[str]]:
+        """Row and serial of the first well-formed MSC in the shared columns"""
+        for start, stop in ranges:
+            for row, fields in zip(range(start, stop), read_rows(columns, SCM_COLUMNS, "scm", start, stop)):
+                if len(fields) >= 8 and len(fields[7]) == 18 and re.match(r'^M[A-Z]\d{2}$', fields[7][14:]):
+                    return row, fields[7][14:]
+        return None, None
+    
+    def _column_tail(self, columns: SharedColumns, ranges: List[tuple]) -> Dict:
+        """Tracking data (last MSN/MSC serial) from the shared SCM columns"""
+        for start, stop in reversed(ranges):
+            for fields in reversed(read_rows(columns, SCM_COLUMNS, "scm", start, stop)):
+                if len(fields) >= 8:
+                    return {
+                        'last_msn': fields[1][14:] if len(fields[1]) == 18 else None,
+                        'last_msc': fields[7][14:] if len(fields[7]) == 18 else None
+                    }
+        return {'last_msn': None, 'last_msc': None}
+    
+    def read_batch_tail(self, scm_file: Path, sim_quantity: int) -> Optional[Dict]:
+        """Read the tracking data validate_scm_structure would store for this batch"""
+        try:
+            with open_text(scm_file) as f:
+                data_lines = f.readlines()[1:1+sim_quantity]
+        except Exception:
+            return None
+
+        if len(data_lines) != sim_quantity:
+            return None
+
+        last_msn = None
+        last_msc = None
+        for line in data_lines:
+            fields = line.strip().split('\t')
+            if len(fields) < 8:
+                continue
+            last_msn = fields[1][14:] if len(fields[1]) == 18 else None
+            last_msc = fields[7][14:] if len(fields[7]) == 18 else None
+
+        return {'last_msn': last_msn, 'last_msc': last_msc}
+
     def _get_starting_serials(self, batch_index: int) -> Tuple[str, str]:
         """Get starting MSN and MSC serials for batch"""
         if batch_index == 0:
@@ -540,4 +714,13 @@ class SCMValidator(BaseValidator):
                     if first_letter < 'Z' 
                     else 'A'
                 )
-                return f"{next_first_letter}A01"
\ No newline at end of file
+                return f"{next_first_letter}A01"
+
+
+def _scm_chunk(descriptor: dict, start: int, stop: int, context: Dict) -> List[str]:
+    """Pool task: attach to the batch columns and validate one chunk of SCM rows"""
+    columns = SharedColumns.attach(descriptor)
+    try:
+        return SCMValidator()._validate_scm_column_rows(columns, start, stop, context)
+    finally:
+        columns.close()
@@ -2,10 +2,17 @@
 MNO File Validator - SIMODA file validation logic
 """
 import re
-from typing import List, Tuple, Optional, Callable
+from typing import Iterable, Iterator, List, Tuple, Optional, Callable
 from pathlib import Path
 from datetime import datetime
 from .validation_base import BaseValidator, ValidationResult
+from ..utils.file_utils import open_text
+from ..utils.shared_columns import SharedColumns
+
+# SIMODA records start with Iccid(...) and carry their Imsi(...) a few lines below
+RECORD_ICCID_PATTERN = re.compile(r'Iccid\(\s*"?(\d{18,20})')
+RECORD_IMSI_PATTERN = re.compile(r'Imsi\(\s*"?(\d{15})')
+MAX_PAIRING_ERRORS = 50
 
 class SIMODAValidator(BaseValidator):
     """Handles SIMODA file validation"""
@@ -42,7 +49,7 @@ class SIMODAValidator(BaseValidator):
             
             for encoding in encodings:
                 try:
-                    with open(simoda_file, 'r', encoding=encoding) as f:
+                    with open_text(simoda_file, encoding) as f:
                         lines = f.readlines()
                         content = ''.join(lines)
                     break
@@ -142,8 +149,15 @@ class SIMODAValidator(BaseValidator):
                         )
                     errors.append(error_msg)
             
+            # Record level check: each ICCID must carry its own CNUM IMSI
+            pairing_errors, pairing_issues = self._validate_record_pairs(
+                lines, cnum_iccids, cnum_imsis, missing_iccids
+            )
+            errors.extend(pairing_errors)
+            
             if errors:
-                error_msg = f"SIMODA validation failed - {len(errors)} issues found"
+                issue_count = len(errors) - len(pairing_errors) + pairing_issues
+                error_msg = f"SIMODA validation failed - {issue_count} issues found"
                 return ValidationResult(False, error_msg, errors)
             
             return ValidationResult(True, "SIMODA validation passed - chip code, ICCIDs and IMSIs verified", [])
@@ -151,6 +165,107 @@ class SIMODAValidator(BaseValidator):
         except Exception as e:
             return ValidationResult(False, f"Error reading SIMODA file: {str(e)}", [])
 
+    def validate_simoda_columns(self, simoda_file: Path,
+                                columns: SharedColumns) -> ValidationResult:
+        """Validate SIMODA file against the CNUM ICCID/IMSI shared columns"""
+        return self.validate_simoda_file(simoda_file, columns['ref_iccid'], columns['ref_imsi'])
+
+    def iter_record_pairs(self, lines: Iterable[str]) -> Iterator[Tuple[str, Optional[str], int, int]]:
+        """Stream (iccid, imsi, iccid line, imsi line) for every SIMODA record"""
+        iccid = None
+        iccid_line = 0
+        imsi = None
+        imsi_line = 0
+        
+        for line_num, line in enumerate(lines, 1):
+            if 'Iccid(' in line:
+                match = RECORD_ICCID_PATTERN.search(line)
+                if match:
+                    if iccid is not None:
+                        yield iccid, imsi, iccid_line, imsi_line
+                    iccid, iccid_line = match.group(1), line_num
+                    imsi, imsi_line = None, 0
+            if imsi is None and iccid is not None and 'Imsi(' in line:
+                match = RECORD_IMSI_PATTERN.search(line)
+                if match:
+                    imsi, imsi_line = match.group(1), line_num
+        
+        if iccid is not None:
+            yield iccid, imsi, iccid_line, imsi_line
+    
+    def _validate_record_pairs(self, lines: Iterable[str], cnum_iccids, cnum_imsis,
+                               missing_iccids: set) -> Tuple[List[str], int]:
+        """Hash join SIMODA (ICCID, IMSI) records against the CNUM pairs
+        
+        Returns the first MAX_PAIRING_ERRORS errors and the total issue count.
+        ICCIDs already reported as missing from the file are not repeated.
+        """
+        # ICCID -> CNUM row; row numbers keep the table small on large batches
+        cnum_rows = {}
+        for row, cnum_iccid in enumerate(cnum_iccids):
+            cnum_rows.setdefault(cnum_iccid, row)
+        matched = bytearray(len(cnum_iccids))
+        
+        errors = []
+        issue_count = 0
+        record_count = 0
+        
+        def report(error_msg):
+            nonlocal issue_count
+            issue_count += 1
+            if len(errors) < MAX_PAIRING_ERRORS:
+                errors.append(error_msg)
+        
+        for iccid, imsi, iccid_line, imsi_line in self.iter_record_pairs(lines):
+            record_count += 1
+            row = cnum_rows.get(iccid)
+            
+            if row is None:
+                report(
+                    f"ERR: SIMODA Extra Record "
+                    f"(ICCID: {iccid}) Not Present in CNUM file "
+                    f"[Line: {iccid_line}]"
+                )
+            elif matched[row]:
+                report(
+                    f"ERR: SIMODA Duplicate Record "
+                    f"(ICCID: {iccid}) "
+                    f"[Line: {iccid_line}]"
+                )
+            else:
+                matched[row] = 1
+                expected_imsi = cnum_imsis[row] if row < len(cnum_imsis) else None
+                if imsi is None:
+                    report(
+                        f"ERR: SIMODA Record IMSI Missing "
+                        f"(ICCID: {iccid}) (Expected: {expected_imsi}) "
+                        f"[Line: {iccid_line}]"
+                    )
+                elif expected_imsi is not None and imsi != expected_imsi:
+                    report(
+                        f"ERR: ICCID/IMSI Pairing Mismatch "
+                        f"(ICCID: {iccid}) "
+                        f"(Expected: {expected_imsi}) "
+                        f"(Found: {imsi}) "
+                        f"[Line: {imsi_line}] [CNUM Line: {row + 16}]"
+                    )
+        
+        if record_count == 0:
+            self.log("  SIMODA has no Iccid(...) records - pairing check skipped")
+            return [], 0
+        
+        for row, cnum_iccid in enumerate(cnum_iccids):
+            if not matched[row] and cnum_iccid not in missing_iccids:
+                report(
+                    f"ERR: SIMODA Record Missing "
+                    f"(ICCID: {cnum_iccid}) No Iccid record in SIMODA file "
+                    f"[CNUM Line: {row + 16}]"
+                )
+        
+        self.log(f"  SIMODA pairing checked {record_count} records against "
+                f"{len(cnum_iccids)} CNUM pairs")
+        return errors, issue_count
+    
     def _find_iccid_line_number(self, iccid: str, lines: List[str]) -> int:
         """Find the line number where an ICCID might be present with formatting issues"""
         variations = [
@@ -191,4 +306,15 @@ class SIMODAValidator(BaseValidator):
             if imsi[:10] in line:
                 return line_num
         
-        return 0
\ No newline at end of file
+        return 0
+
+
+def _simoda_task(descriptor: dict, simoda_file: str, chip_type: str) -> Tuple[bool, str, List[str]]:
+    """Pool task: attach to the batch columns and validate the SIMODA file"""
+    columns = SharedColumns.attach(descriptor)
+    try:
+        validator = SIMODAValidator()
+        validator.set_chip_type(chip_type)
+        return validator.validate_simoda_columns(Path(simoda_file), columns).to_tuple()
+    finally:
+        columns.close()
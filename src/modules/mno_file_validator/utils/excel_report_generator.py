@@ -12,8 +12,9 @@ modules_path = os.path.join(project_root, 'modules')
 
 if modules_path not in sys.path:
     sys.path.insert(0, modules_path)
-    
-import pandas as pd
+
+# pandas is imported by the methods that build DataFrames, so importing this
+# module (and the GUI tab that uses it) does not pay pandas' import time
 import openpyxl
 from pathlib import Path
 from datetime import datetime
@@ -34,6 +35,7 @@ class ExcelReportGenerator:
         excel_filename = f"{parent_name}.xlsx"
         excel_path = Path(parent_folder) / excel_filename
         
+        import pandas as pd
         with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
             # Create Executive Summary sheet
             self._create_executive_summary(writer, excel_reports)
@@ -49,121 +51,146 @@ class ExcelReportGenerator:
     
     def _create_executive_summary(self, writer, excel_reports: List[Dict]):
         """Create executive summary sheet with clickable batch numbers."""
-        summary_data = []
-        
-        for report in excel_reports:
-            # Count passed validations
-            passed_count = sum(1 for result in report['validation_results'].values() if result[0])
-            total_validations = len(report['validation_results'])
-            
-            summary_data.append({
-                'Batch Number': report['batch_number'],
-                'PO Number': report['po_number'],
-                'SIM Quantity': report['sim_quantity'],
-                'Overall Status': 'PASS' if report['all_passed'] else 'FAIL',
-                'Passed Validations': passed_count,
-                'Total Validations': total_validations,
-            })
+        summary_data = [self._summary_row(report) for report in excel_reports]
         
         if summary_data:
+            import pandas as pd
             summary_df = pd.DataFrame(summary_data)
             summary_df.to_excel(writer, sheet_name='Executive Summary', index=False)
             
             worksheet = writer.sheets['Executive Summary']
-            
-            # Auto-adjust columns width
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+            self._finish_executive_summary(worksheet, excel_reports)
+    
+    def _summary_row(self, report: Dict) -> Dict:
+        """Executive Summary row for one batch"""
+        # Count passed validations
+        passed_count = sum(1 for result in report['validation_results'].values() if result[0])
+        total_validations = len(report['validation_results'])
+        
+        return {
+            'Batch Number': report['batch_number'],
+            'PO Number': report['po_number'],
+            'SIM Quantity': report['sim_quantity'],
+            'Overall Status': 'PASS' if report['all_passed'] else 'FAIL',
+            'Passed Validations': passed_count,
+            'Total Validations': total_validations,
+        }
+    
+    def _finish_executive_summary(self, worksheet, excel_reports: List[Dict]):
+        """Add totals, hyperlinks and column widths once all batch rows are in"""
+        passed_batches = sum(1 for report in excel_reports if report['all_passed'])
+        totals_row = len(excel_reports) + 2
+        worksheet.cell(row=totals_row, column=1, value="TOTAL")
+        worksheet.cell(row=totals_row, column=3, value=sum(report['sim_quantity'] or 0 for report in excel_reports))
+        worksheet.cell(row=totals_row, column=4, value=f"{passed_batches}/{len(excel_reports)} PASS")
+        worksheet.cell(row=totals_row, column=5, value=sum(
+            sum(1 for result in report['validation_results'].values() if result[0])
+            for report in excel_reports
+        ))
+        worksheet.cell(row=totals_row, column=6, value=sum(
+            len(report['validation_results']) for report in excel_reports
+        ))
+        for cell in worksheet[totals_row]:
+            cell.font = openpyxl.styles.Font(bold=True)
+        
+        # Auto-adjust columns width
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = (max_length + 2)
+            worksheet.column_dimensions[column_letter].width = adjusted_width
 
-            # ---------------------------------------------------------
-            # ✅ ADD HYPERLINKS: Executive Summary → Batch Sheets
-            # ---------------------------------------------------------
-            for row_idx, report in enumerate(excel_reports, start=2):  # Row 2 onward
-                batch_number = report['batch_number']
-                sheet_name = f"Batch_{batch_number}"
-                
-                # Excel sheet name cannot exceed 31 characters
-                if len(sheet_name) > 31:
-                    sheet_name = sheet_name[:31]
+        # ---------------------------------------------------------
+        # ✅ ADD HYPERLINKS: Executive Summary → Batch Sheets
+        # ---------------------------------------------------------
+        for row_idx, report in enumerate(excel_reports, start=2):  # Row 2 onward
+            sheet_name = self._batch_sheet_name(report)
 
-                # Column A contains Batch Number
-                cell = worksheet[f"A{row_idx}"]
+            # Column A contains Batch Number
+            cell = worksheet[f"A{row_idx}"]
 
-                # Create internal hyperlink to the batch sheet
-                cell.hyperlink = f"#{sheet_name}!A1"
-                cell.style = "Hyperlink"
+            # Create internal hyperlink to the batch sheet
+            cell.hyperlink = f"#{sheet_name}!A1"
+            cell.style = "Hyperlink"
+    
+    def _batch_sheet_name(self, report: Dict) -> str:
+        sheet_name = f"Batch_{report['batch_number']}"
+        # Excel sheet name cannot exceed 31 characters
+        return sheet_name[:31]
         
     def _create_batch_details(self, writer, excel_reports: List[Dict]):
         """Create detailed batch sheets with ALL errors for all validation types"""
+        import pandas as pd
         for report in excel_reports:
-            sheet_name = f"Batch_{report['batch_number']}"
-            if len(sheet_name) > 31:
-                sheet_name = sheet_name[:31]
-            
-            batch_data = []
-            validation_results = report['validation_results']
-            
-            for validation_name, (success, message, errors) in validation_results.items():
-                status = "PASS" if success else "FAIL"
-                error_count = len(errors)
-                
-                # Show ALL errors for ALL validation types
-                if not success and errors:
-                    if error_count <= 10:
-                        all_errors = "\n".join([f"• {error}" for error in errors])
-                        details = f"{message}\n\nAll Errors ({error_count}):\n{all_errors}"
-                    else:
-                        first_10_errors = "\n".join([f"• {error}" for error in errors[:10]])
-                        details = f"{message}\n\nFirst 10 Errors (of {error_count} total):\n{first_10_errors}"
-                else:
-                    details = message
-                
-                batch_data.append({
-                    'Validation Step': self._format_validation_name(validation_name),
-                    'Status': status,
-                    'Error Count': error_count,
-                    'Details': details
-                })
+            sheet_name = self._batch_sheet_name(report)
+            batch_data = self._batch_rows(report)
             
             batch_df = pd.DataFrame(batch_data)
             batch_df.to_excel(writer, sheet_name=sheet_name, index=False)
             
-            # Auto-adjust columns width and enable text wrapping
-            worksheet = writer.sheets[sheet_name]
-            
-            # Set specific column widths
-            worksheet.column_dimensions['A'].width = 25
-            worksheet.column_dimensions['B'].width = 12
-            worksheet.column_dimensions['C'].width = 12
-            worksheet.column_dimensions['D'].width = 80
-            
-            # Enable text wrapping for all cells
-            for row in worksheet.iter_rows():
-                for cell in row:
-                    cell.alignment = openpyxl.styles.Alignment(
-                        wrap_text=True,
-                        vertical='top',
-                        horizontal='left'
-                    )
+            self._format_batch_sheet(writer.sheets[sheet_name], batch_data)
+    
+    def _batch_rows(self, report: Dict) -> List[Dict]:
+        """Batch sheet rows, one per validation step"""
+        batch_data = []
+        validation_results = report['validation_results']
+        
+        for validation_name, (success, message, errors) in validation_results.items():
+            status = "PASS" if success else "FAIL"
+            error_count = len(errors)
             
-            # Set specific row heights for rows with errors
-            for idx, row_data in enumerate(batch_data, 2):
-                if row_data['Error Count'] > 0:
-                    error_count = row_data['Error Count']
-                    base_height = 15
-                    additional_height = min(error_count * 12, 150)
-                    worksheet.row_dimensions[idx].height = base_height + additional_height
+            # Show ALL errors for ALL validation types
+            if not success and errors:
+                if error_count <= 10:
+                    all_errors = "\n".join([f"• {error}" for error in errors])
+                    details = f"{message}\n\nAll Errors ({error_count}):\n{all_errors}"
                 else:
-                    worksheet.row_dimensions[idx].height = 20
+                    first_10_errors = "\n".join([f"• {error}" for error in errors[:10]])
+                    details = f"{message}\n\nFirst 10 Errors (of {error_count} total):\n{first_10_errors}"
+            else:
+                details = message
+            
+            batch_data.append({
+                'Validation Step': self._format_validation_name(validation_name),
+                'Status': status,
+                'Error Count': error_count,
+                'Details': details
+            })
+        
+        return batch_data
+    
+    def _format_batch_sheet(self, worksheet, batch_data: List[Dict]):
+        """Column widths, wrapping and row heights of a batch sheet"""
+        # Set specific column widths
+        worksheet.column_dimensions['A'].width = 25
+        worksheet.column_dimensions['B'].width = 12
+        worksheet.column_dimensions['C'].width = 12
+        worksheet.column_dimensions['D'].width = 80
+        
+        # Enable text wrapping for all cells
+        for row in worksheet.iter_rows():
+            for cell in row:
+                cell.alignment = openpyxl.styles.Alignment(
+                    wrap_text=True,
+                    vertical='top',
+                    horizontal='left'
+                )
+        
+        # Set specific row heights for rows with errors
+        for idx, row_data in enumerate(batch_data, 2):
+            if row_data['Error Count'] > 0:
+                error_count = row_data['Error Count']
+                base_height = 15
+                additional_height = min(error_count * 12, 150)
+                worksheet.row_dimensions[idx].height = base_height + additional_height
+            else:
+                worksheet.row_dimensions[idx].height = 20
     
     # def _create_validation_details(self, writer, excel_reports: List[Dict]):
     #     """Create validation details across all batches"""
@@ -189,22 +216,29 @@ class ExcelReportGenerator:
         error_data = []
         
         for report in excel_reports:
-            for validation_name, (success, message, errors) in report['validation_results'].items():
-                if not success and errors:
-                    for error in errors:
-                        error_data.append({
-                            'Batch Number': report['batch_number'],
-                            'Validation Step': self._format_validation_name(validation_name),
-                            'Error Type': self._classify_error_type(error),
-                            'Error Message': error,
-                            # 'Line Number': self._extract_line_number(error),
-                            # 'Severity': 'High' if 'Mismatch' in error else 'Medium'
-                        })
+            error_data.extend(self._error_rows(report))
         
         if error_data:
+            import pandas as pd
             error_df = pd.DataFrame(error_data)
             error_df.to_excel(writer, sheet_name='Error Details', index=False)
     
+    def _error_rows(self, report: Dict) -> List[Dict]:
+        """Error Details rows for one batch"""
+        error_data = []
+        for validation_name, (success, message, errors) in report['validation_results'].items():
+            if not success and errors:
+                for error in errors:
+                    error_data.append({
+                        'Batch Number': report['batch_number'],
+                        'Validation Step': self._format_validation_name(validation_name),
+                        'Error Type': self._classify_error_type(error),
+                        'Error Message': error,
+                        # 'Line Number': self._extract_line_number(error),
+                        # 'Severity': 'High' if 'Mismatch' in error else 'Medium'
+                    })
+        return error_data
+    
     def _format_validation_name(self, validation_name: str) -> str:
         """Format validation name for display"""
         names = {
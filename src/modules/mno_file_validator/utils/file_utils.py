@@ -2,6 +2,7 @@
 Utility functions for file operations
 """
 import re
+import zipfile
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import logging
@@ -34,7 +35,11 @@ def find_matching_files(parent_folder: str) -> List[Dict]:
     in_files = list(parent_path.glob("IN_*.txt"))
     in_files.sort()
     
-    out_folders = [f for f in parent_path.iterdir() if f.is_dir() and f.name.startswith("OUT_")]
+    # OUT_ folders, or OUT_ archives delivered as .zip (a folder wins if both exist)
+    out_folders = [
+        f for f in parent_path.iterdir()
+        if f.name.startswith("OUT_") and (f.is_dir() or is_out_archive(f))
+    ]
     out_folders.sort()
     
     matches = []
@@ -42,7 +47,7 @@ def find_matching_files(parent_folder: str) -> List[Dict]:
     for in_file in in_files:
         in_suffix = in_file.stem[3:]
         for out_folder in out_folders:
-            out_suffix = out_folder.name[4:]
+            out_suffix = out_folder.stem[4:] if is_out_archive(out_folder) else out_folder.name[4:]
             if in_suffix == out_suffix:
                 matches.append({
                     'in_file': in_file,
@@ -53,10 +58,30 @@ def find_matching_files(parent_folder: str) -> List[Dict]:
     
     return matches
 
+def is_out_archive(path: Path) -> bool:
+    """True for an OUT_ folder delivered as a ZIP archive"""
+    return path.suffix.lower() == ".zip" and path.is_file()
+
+def open_out_archive(zip_path: Path) -> zipfile.Path:
+    """Virtual folder over a ZIP archive (members may sit in an OUT_ folder inside it)"""
+    root = zipfile.Path(zip_path)
+    nested = root / zip_path.stem
+    return nested if nested.is_dir() else root
+
+def open_text(file_path, encoding: str = 'utf-8'):
+    """Open a plain file or a ZIP member (zipfile.Path) for reading text"""
+    if isinstance(file_path, zipfile.Path):
+        return file_path.open('r', encoding=encoding)
+    return open(file_path, 'r', encoding=encoding)
+
 def find_output_files(out_folder: Path, suffix: str) -> Dict:
     """Find output files with various extensions"""
     output_files = {}
     
+    # Members of a zipped OUT_ folder are streamed, never extracted
+    if is_out_archive(out_folder):
+        out_folder = open_out_archive(out_folder)
+    
     file_patterns = {
         'CNUM': [f"CNUM_{suffix}.txt", f"CNUM_{suffix}.TXT", f"CNUM_{suffix}"],
         'ORIG_TRIG': [f"ORIG_TRIG_{suffix}.txt", f"ORIG_TRIG_{suffix}.TXT", f"ORIG_TRIG_{suffix}"],
@@ -80,7 +105,7 @@ def find_output_files(out_folder: Path, suffix: str) -> Dict:
 def extract_header_info(file_path: Path) -> Dict:
     """Extract header information from file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open_text(file_path) as f:
             lines = [line.strip() for line in f.readlines()[:15]]
         
         info = {}
@@ -107,10 +132,9 @@ def extract_header_info(file_path: Path) -> Dict:
 def validate_quantity(file_path: Path, expected_data_lines: int, header_lines: int = 0) -> Tuple[bool, str]:
     """Validate line count in files"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        with open_text(file_path) as f:
+            actual_total_lines = sum(1 for _ in f)
         
-        actual_total_lines = len(lines)
         actual_data_lines = actual_total_lines - header_lines
         
         if actual_data_lines != expected_data_lines:
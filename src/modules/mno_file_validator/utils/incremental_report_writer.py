@@ -0,0 +1,106 @@
+"""
+MNO File Validator - Incremental Excel report
+
+Each batch's summary row, batch sheet and error rows are written to the
+report as soon as the batch finishes. Every save goes to a temporary file
+that is fsynced and renamed over the report, so a crash part way through
+the run leaves a readable workbook with all finished batches.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import openpyxl
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from .excel_report_generator import ExcelReportGenerator
+
+SUMMARY_HEADERS = ['Batch Number', 'PO Number', 'SIM Quantity', 'Overall Status',
+                   'Passed Validations', 'Total Validations']
+BATCH_HEADERS = ['Validation Step', 'Status', 'Error Count', 'Details']
+ERROR_HEADERS = ['Batch Number', 'Validation Step', 'Error Type', 'Error Message']
+
+
+class IncrementalReportWriter:
+    """Writes the MNO Excel report batch by batch"""
+
+    def __init__(self, excel_generator: Optional[ExcelReportGenerator] = None):
+        self.excel_generator = excel_generator or ExcelReportGenerator()
+        self.excel_path = None
+        self.workbook = None
+        self.reports = []
+
+    def start(self, parent_folder: str) -> Path:
+        """Create an empty report (same path as the final report)"""
+        parent_name = Path(parent_folder).name
+        self.excel_path = Path(parent_folder) / f"{parent_name}.xlsx"
+        self.reports = []
+
+        self.workbook = openpyxl.Workbook()
+        summary_sheet = self.workbook.active
+        summary_sheet.title = 'Executive Summary'
+        self._write_header(summary_sheet, SUMMARY_HEADERS)
+        self._write_header(self.workbook.create_sheet('Error Details'), ERROR_HEADERS)
+
+        self._save()
+        return self.excel_path
+
+    def append_batch(self, report: Dict):
+        """Add one finished batch and flush the report to disk"""
+        generator = self.excel_generator
+        self.reports.append(report)
+
+        summary_row = generator._summary_row(report)
+        self.workbook['Executive Summary'].append([summary_row[h] for h in SUMMARY_HEADERS])
+
+        # Batch sheets go before Error Details, as in the full report
+        sheet_name = generator._batch_sheet_name(report)
+        if sheet_name in self.workbook.sheetnames:
+            del self.workbook[sheet_name]
+        batch_sheet = self.workbook.create_sheet(sheet_name, len(self.workbook.sheetnames) - 1)
+        batch_data = generator._batch_rows(report)
+        self._write_header(batch_sheet, BATCH_HEADERS)
+        for row_data in batch_data:
+            batch_sheet.append([row_data[h] for h in BATCH_HEADERS])
+        generator._format_batch_sheet(batch_sheet, batch_data)
+
+        error_sheet = self.workbook['Error Details']
+        for error_row in generator._error_rows(report):
+            error_sheet.append([error_row[h] for h in ERROR_HEADERS])
+
+        self._save()
+
+    def finalize(self) -> Path:
+        """Add hyperlinks and totals to the summary and save the final report"""
+        summary_sheet = self.workbook['Executive Summary']
+        self.excel_generator._finish_executive_summary(summary_sheet, self.reports)
+
+        # The full report has no Error Details sheet when nothing failed
+        if self.workbook['Error Details'].max_row == 1:
+            del self.workbook['Error Details']
+
+        self._save()
+        path = self.excel_path
+        self.workbook = None
+        return path
+
+    def _write_header(self, worksheet, headers: List[str]):
+        worksheet.append(headers)
+        self._bold_header(worksheet)
+
+    def _bold_header(self, worksheet):
+        """Header look of pandas' to_excel"""
+        thin = Side(style='thin')
+        for cell in worksheet[1]:
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal='center', vertical='top')
+
+    def _save(self):
+        """Save to a temporary file, fsync it and rename it over the report"""
+        tmp_path = self.excel_path.with_name(f"~{self.excel_path.name}.tmp")
+        self.workbook.save(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.excel_path)
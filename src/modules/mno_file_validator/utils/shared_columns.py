@@ -0,0 +1,203 @@
+"""
+MNO File Validator - Batch columns in shared memory
+
+The parsed IN/CNUM/SCM columns of one batch are packed into a single
+multiprocessing.shared_memory block as fixed-width byte arrays. Worker
+processes only receive the small descriptor dict and read values straight
+out of the block, so no lists of strings are pickled per chunk.
+"""
+import os
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .file_utils import open_text
+
+# Field positions in tab separated data lines
+IN_COLUMNS = [("in_impu", 0), ("in_impi", 1), ("in_imsi", 2), ("in_imsi_i", 3), ("in_iccid", 4)]
+CNUM_COLUMNS = [("cnum_impu", 0), ("cnum_impi", 1), ("cnum_imsi", 2), ("cnum_imsi_i", 3),
+                ("cnum_iccid", 4), ("cnum_pin1", 5), ("cnum_pin2", 7)]
+SCM_COLUMNS = [("scm_msn", 1), ("scm_iccid", 2), ("scm_imsi", 3), ("scm_batchno", 4),
+               ("scm_ponum", 5), ("scm_msc", 7)]
+
+
+def share_tracker_with_pool():
+    """Start the shared memory tracker before forking a pool
+
+    Forked workers then report to the parent's tracker instead of starting
+    their own, which would try to free the blocks again when they exit.
+    """
+    if os.name == 'posix':
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+
+
+class SharedColumn(Sequence):
+    """Read-only view of one fixed-width column"""
+
+    def __init__(self, buffer: memoryview, offset: int, width: int, count: int,
+                 padded: bool = True):
+        self._buffer = buffer
+        self._offset = offset
+        self._width = width
+        self._count = count
+        self._padded = padded
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("column index out of range")
+        start = self._offset + index * self._width
+        return bytes(self._buffer[start:start + self._width]).rstrip(b"\x00").decode("utf-8")
+
+    def rows(self, start: int, stop: int) -> List[str]:
+        """Decode rows start..stop with a single copy out of the block"""
+        width = self._width
+        begin = self._offset + start * width
+        raw = bytes(self._buffer[begin:begin + (stop - start) * width])
+        if raw.isascii():
+            # Byte offsets equal character offsets, so slice the decoded text
+            text = raw.decode("ascii")
+            if not self._padded:
+                return [text[pos:pos + width] for pos in range(0, len(text), width)]
+            return [text[pos:pos + width].rstrip("\x00") for pos in range(0, len(text), width)]
+        return [
+            raw[pos:pos + width].rstrip(b"\x00").decode("utf-8")
+            for pos in range(0, len(raw), width)
+        ]
+
+
+class SharedColumns:
+    """Named fixed-width columns stored in one shared memory block"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, descriptor: Dict, owner: bool):
+        self._shm = shm
+        self.descriptor = descriptor
+        self.owner = owner
+        self._columns = {
+            name: SharedColumn(shm.buf, spec['offset'], spec['width'], spec['count'],
+                               spec['padded'])
+            for name, spec in descriptor['columns'].items()
+        }
+
+    @classmethod
+    def create(cls, columns: Dict[str, Sequence[str]]) -> "SharedColumns":
+        """Pack string columns into a new shared memory block"""
+        packed_columns = {}
+        specs = {}
+        total_size = 0
+        for name, values in columns.items():
+            if all(value.isascii() for value in values):
+                width = max(map(len, values), default=0) or 1
+                packed = "".join([value.ljust(width, "\x00") for value in values]).encode("ascii")
+            else:
+                encoded = [value.encode("utf-8") for value in values]
+                width = max(map(len, encoded), default=0) or 1
+                packed = b"".join([value.ljust(width, b"\x00") for value in encoded])
+            packed_columns[name] = packed
+            # Fixed length columns (ICCID, IMSI, ...) need no padding strip on read
+            padded = b"\x00" in packed
+            specs[name] = {'offset': total_size, 'width': width, 'count': len(values),
+                           'padded': padded}
+            total_size += len(packed)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(total_size, 1))
+        for name, packed in packed_columns.items():
+            offset = specs[name]['offset']
+            shm.buf[offset:offset + len(packed)] = packed
+
+        descriptor = {'name': shm.name, 'size': total_size, 'columns': specs}
+        return cls(shm, descriptor, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor: Dict) -> "SharedColumns":
+        """Attach to a block created by another process"""
+        shm = shared_memory.SharedMemory(name=descriptor['name'])
+        return cls(shm, descriptor, owner=False)
+
+    def __getitem__(self, name: str) -> SharedColumn:
+        return self._columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def close(self):
+        """Detach; the owner also frees the block"""
+        self._columns = {}
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _split_data_lines(lines: List[str], columns: List[tuple], prefix: str,
+                      result: Dict[str, List[str]]):
+    """Split tab separated lines into columns plus a per-row field count"""
+    field_counts = []
+    for name, _ in columns:
+        result[name] = []
+
+    for line in lines:
+        stripped = line.strip()
+        fields = stripped.split('\t') if stripped else []
+        field_counts.append(str(len(fields)))  # 0 marks an empty line
+        for name, idx in columns:
+            result[name].append(fields[idx] if idx < len(fields) else "")
+
+    result[f"{prefix}_nfields"] = field_counts
+
+
+def read_rows(columns: SharedColumns, layout: List[tuple], prefix: str,
+              start: int, stop: int) -> List[List[str]]:
+    """Rebuild the split fields of rows start..stop ([] for an empty line)
+
+    Positions that are not stored as columns come back as empty strings,
+    which is enough for validators that only index the stored positions.
+    """
+    counts = [int(count) for count in columns[f"{prefix}_nfields"].rows(start, stop)]
+    result = [[""] * count for count in counts]
+
+    for name, idx in layout:
+        for fields, value in zip(result, columns[name].rows(start, stop)):
+            if idx < len(fields):
+                fields[idx] = value
+    return result
+
+
+def load_batch_columns(in_file: Path, cnum_file: Path, scm_file: Path,
+                       sim_quantity: int) -> Optional[Dict[str, List[str]]]:
+    """Read the data lines of one batch into columns (None if the files are short)"""
+    with open_text(in_file) as f:
+        in_lines = f.readlines()
+    with open_text(cnum_file) as f:
+        cnum_lines = f.readlines()
+    with open_text(scm_file) as f:
+        scm_lines = f.readlines()
+
+    # Short files are reported by the regular validators
+    if len(in_lines) < 15 + sim_quantity or len(cnum_lines) < 15 + sim_quantity:
+        return None
+    if len(scm_lines[1:1+sim_quantity]) != sim_quantity:
+        return None
+
+    columns = {}
+    _split_data_lines(in_lines[15:15+sim_quantity], IN_COLUMNS, "in", columns)
+    _split_data_lines(cnum_lines[15:15+sim_quantity], CNUM_COLUMNS, "cnum", columns)
+    _split_data_lines(scm_lines[1:1+sim_quantity], SCM_COLUMNS, "scm", columns)
+    return columns
+
+
+def chunk_ranges(total: int, chunk_size: int) -> List[tuple]:
+    """Split range(total) into (start, stop) pairs"""
+    return [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
@@ -0,0 +1,161 @@
+"""
+SIM value codecs shared by the validation modules: nibble/pair swapping,
+hex <-> text and BCD digit decoding.
+
+Every codec works on whole strings through bytes.fromhex, bytes.translate
+and tables built once at import.
+"""
+from array import array
+
+# Byte value -> printable character of str.isprintable(), else None
+_PRINTABLE = [chr(i) if chr(i).isprintable() else None for i in range(256)]
+# Byte -> itself if printable, else '.' (hex_to_display's default placeholder)
+_DISPLAY_TABLE = bytes(i if _PRINTABLE[i] else ord('.') for i in range(256))
+# Printable ASCII (32-126) bytes
+_ASCII_PRINTABLE = bytes(range(32, 127))
+# Every byte that is not an ASCII decimal digit
+_NON_DIGITS = bytes(i for i in range(256) if not 48 <= i <= 57)
+# "00".."99" -> uppercase hex byte
+_DECIMAL_PAIRS = {f"{i:02d}": f"{i:02X}" for i in range(100)}
+
+
+def _swap_bytes(raw):
+    """Swap the bytes of each 2-byte word of even-length raw"""
+    words = array('H', raw)
+    words.byteswap()
+    return words.tobytes()
+
+
+def swap_pairs(text, odd_tail="keep"):
+    """
+    Swap every two characters: '123456' -> '214365'.
+
+    odd_tail decides what happens to the last character of odd-length text:
+    'keep' it ('12345' -> '21435'), 'drop' it ('12345' -> '2143') or 'reject'
+    the text and return it unchanged.
+    """
+    if not text:
+        return text
+    length = len(text)
+    even = length & ~1
+    if even != length:
+        if odd_tail == "reject":
+            return text
+        tail = text[even:] if odd_tail == "keep" else ""
+    else:
+        tail = ""
+    try:
+        raw = text[:even].encode('latin-1')
+    except UnicodeEncodeError:
+        chars = [None] * even
+        chars[0::2] = text[1:even:2]
+        chars[1::2] = text[0:even:2]
+        return ''.join(chars) + tail
+    return _swap_bytes(raw).decode('latin-1') + tail
+
+
+def _hex_pairs(text):
+    """
+    (bytes, None) of the complete hex pairs of text (a trailing odd character
+    is ignored), or (None, values) when some pair is not plain hex: values
+    then holds int(pair, 16) per pair, None where that fails or is negative.
+    """
+    even = len(text) & ~1
+    try:
+        raw = bytes.fromhex(text[:even])
+        # fromhex skips whitespace between pairs; that would shift the pairs
+        if len(raw) * 2 == even:
+            return raw, None
+    except ValueError:
+        pass
+    values = []
+    for i in range(0, even, 2):
+        try:
+            value = int(text[i:i + 2], 16)
+        except ValueError:
+            value = None
+        values.append(value if value is not None and value >= 0 else None)
+    return None, values
+
+
+def hex_to_ascii(hex_str, errors='strict'):
+    """bytes.fromhex(hex_str) decoded as ASCII with the given error handling"""
+    return bytes.fromhex(hex_str).decode('ascii', errors)
+
+
+def hex_to_latin1(text):
+    """
+    chr() of every complete hex pair ('3236' -> '26'); a pair that is not
+    hex is kept as it is.
+    """
+    raw, values = _hex_pairs(text)
+    if raw is not None:
+        return raw.decode('latin-1')
+    return ''.join(
+        chr(value) if value is not None else text[2 * i:2 * i + 2]
+        for i, value in enumerate(values)
+    )
+
+
+def hex_to_printable_ascii(text):
+    """
+    Printable ASCII (32-126) of every complete hex pair ('3938' -> '98');
+    other pairs are kept as hex text.
+    """
+    raw, values = _hex_pairs(text)
+    if raw is not None:
+        if not raw.translate(None, _ASCII_PRINTABLE):
+            return raw.decode('ascii')
+        values = raw
+    return ''.join(
+        chr(value) if value is not None and 32 <= value <= 126 else text[2 * i:2 * i + 2]
+        for i, value in enumerate(values)
+    )
+
+
+def hex_to_display(text, placeholder='.'):
+    """
+    Character of every complete hex pair, placeholder for those that are not
+    printable. Raises ValueError if a pair is not hex.
+    """
+    raw, values = _hex_pairs(text)
+    if raw is None:
+        if None in values:
+            raise ValueError(f"invalid hex pair in {text!r}")
+        raw = bytes(values)
+    if placeholder == '.':
+        return raw.translate(_DISPLAY_TABLE).decode('latin-1')
+    return ''.join(_PRINTABLE[value] or placeholder for value in raw)
+
+
+def text_to_hex(text):
+    """Uppercase hex of every character's code point, at least 2 digits each"""
+    try:
+        return text.encode('latin-1').hex().upper()
+    except UnicodeEncodeError:
+        return ''.join(format(ord(char), '02X') for char in text)
+
+
+def decimal_pairs_to_hex(text):
+    """
+    Hex byte of every complete pair of decimal digits ('6383' -> '3F53').
+    Raises ValueError if a pair is not a number.
+    """
+    even = len(text) & ~1
+    try:
+        return ''.join([_DECIMAL_PAIRS[text[i:i + 2]] for i in range(0, even, 2)])
+    except KeyError:
+        return ''.join(format(int(text[i:i + 2]), '02X') for i in range(0, even, 2))
+
+
+def bcd_digits(hex_str):
+    """
+    Decimal digits of the nibbles of the complete bytes of hex_str, in order
+    ('0910' -> '0910', '19F0' -> '190'); filler nibbles (A-F) are dropped.
+    """
+    even = len(hex_str) & ~1
+    try:
+        raw = hex_str[:even].encode('ascii')
+    except UnicodeEncodeError:
+        return ''.join(char for char in hex_str[:even] if char in '0123456789')
+    return raw.translate(None, _NON_DIGITS).decode('ascii')
@@ -0,0 +1,135 @@
+# test_airtel_machine_log.py
+"""Airtel parse_machine_log against the elif chain it replaced."""
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "modules"))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from first_card_validation.core import airtel_validation  # noqa: E402
+
+KEY_COMMANDS = [
+    ('00DC01041BFE0110', 'KIC1 (6F22)'), ('00DC02041BFE0111', 'KID1 (6F22)'),
+    ('00DC03041BFE0112', 'KIK1 (6F22)'), ('00DC04041BFE0050', 'KIC2 (6F22)'),
+    ('00DC05041BFE0051', 'KID2 (6F22)'), ('00DC06041BFE0052', 'KIK2 (6F22)'),
+]
+
+
+def ref_extract_value(line, command):
+    line = line.upper().strip()
+    if command in line:
+        parts = line.split(command)
+        if len(parts) > 1:
+            value = parts[1].split('SW9000')[0] if 'SW9000' in parts[1] else parts[1]
+            return re.sub(r'[^0-9A-F]', '', value)
+    return None
+
+
+def ref_puk(line_upper, command):
+    val = ref_extract_value(line_upper, command)
+    if val:
+        if 'FFFFFFFF0A0A' in val:
+            parts = val.split('FFFFFFFF0A0A')
+            if len(parts) > 1 and len(parts[1]) >= 16:
+                return parts[1][:16]
+        else:
+            hex_match = re.search(r'([0-9A-F]{16})', val)
+            if hex_match:
+                return hex_match.group(1)
+    return None
+
+
+def ref_parse_line(line, extracted):
+    """One line of the former elif chain; the first matching command wins"""
+    line_upper = line.upper().strip()
+    if '00D6000009' in line_upper:
+        val = ref_extract_value(line_upper, '00D6000009')
+        if val:
+            digits = []
+            for i in range(0, len(val) - 1, 2):
+                byte_value = int(val[i:i + 2], 16)
+                for digit in (byte_value >> 4, byte_value & 0x0F):
+                    if digit <= 9:
+                        digits.append(str(digit))
+            if digits:
+                extracted['IMSI'] = ''.join(digits)[:18]
+    elif '00D600000A' in line_upper:
+        val = ref_extract_value(line_upper, '00D600000A')
+        if val:
+            hex_str = val[:20].ljust(20, '0')
+            extracted['ICCID'] = ''.join('0123456789ABCDEF'[int(char, 16)] for char in hex_str)[:20]
+    elif '00D600002AFE85400310' in line_upper and 'FE80400210' in line_upper:
+        tail = line_upper.split('00D600002AFE85400310')[1]
+        if 'FE80400210' in tail:
+            extracted['PSK (6F2B)'] = tail.split('FE80400210')[0][:32]
+            extracted['DEK1 (6F2B)'] = tail.split('FE80400210')[1][:32]
+    elif '00D6000015F00303' in line_upper:
+        puk = ref_puk(line_upper, '00D6000015F00303')
+        if puk:
+            extracted['PUK1'] = puk
+    elif '00D6000015E00303' in line_upper:
+        puk = ref_puk(line_upper, '00D6000015E00303')
+        if puk:
+            extracted['PUK2'] = puk
+    elif '00D600000B800A0A' in line_upper:
+        val = ref_extract_value(line_upper, '00D600000B800A0A')
+        if val and len(val) >= 16:
+            extracted['ADM'] = val[:16]
+    elif '00D6000002' in line_upper:
+        val = ref_extract_value(line_upper, '00D6000002')
+        if val and len(val) >= 4:
+            extracted['ACC'] = val[:4]
+    else:
+        for command, field in KEY_COMMANDS:
+            if command in line_upper:
+                val = ref_extract_value(line_upper, command)
+                if val:
+                    val = val.replace('FFFFFFFFFFFFFFFF', '')
+                    if len(val) >= 32:
+                        extracted[field] = val[:32]
+                break
+
+
+def ref_parse_machine_log(lines):
+    extracted = {}
+    for line in lines:
+        ref_parse_line(line, extracted)
+    for field in airtel_validation.AIR_TEL_VALIDATION_RULES:
+        extracted.setdefault(field, "Not Found")
+    return extracted
+
+
+COMMANDS = ['00D6000009', '00D600000A', '00D600002AFE85400310', 'FE80400210', '00D6000015F00303',
+            '00D6000015E00303', '00D600000B800A0A', '00D6000002', 'FFFFFFFF0A0A', 'SW9000',
+            'FFFFFFFFFFFFFFFF'] + [command for command, _ in KEY_COMMANDS]
+
+
+def _random_line():
+    parts = []
+    for _ in range(random.randint(1, 5)):
+        choice = random.random()
+        if choice < 0.5:
+            parts.append(random.choice(COMMANDS))
+        elif choice < 0.9:
+            parts.append(''.join(random.choice("0123456789ABCDEFabcdef") for _ in range(random.randint(0, 40))))
+        else:
+            parts.append(random.choice([' ', 'IN[', '] OUT[9000]', ' sw=', 'xyz']))
+    return ''.join(parts)
+
+
+def test_parse_machine_log_matches_elif_chain():
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as folder:
+        log_path = os.path.join(folder, "machine_log.txt")
+        for _ in range(300):
+            lines = [_random_line() for _ in range(random.randint(1, 30))]
+            with open(log_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines))
+            with contextlib.redirect_stdout(io.StringIO()):
+                parsed = airtel_validation.parse_machine_log(log_path)
+            assert parsed == ref_parse_machine_log(lines), lines
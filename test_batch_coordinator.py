@@ -0,0 +1,107 @@
+# test_batch_coordinator.py
+"""Coordinator and local workers on the filesystem queue against the sequential run_validation."""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "modules"))
+
+from mno_file_validator.core.batch_coordinator import BatchCoordinator, BatchWorker, FileQueue  # noqa: E402
+from mno_file_validator.core.file_comparator import MNOFileComparator  # noqa: E402
+
+LEASE_TIMEOUT = 1.0
+
+
+def make_batches(folder, count):
+    """count IN files and OUT folders with every output file; quantities differ per batch"""
+    for batch in range(count):
+        suffix = f"1234567_{batch:03d}_{9000 + batch}_MUMBAI_1_PREPAID_USIM_20240101"
+        rows = 3 + batch
+        header = ["PO Number: 1234567", f"Batch No: {9000 + batch}", f"SIM Quantity: {rows}",
+                  "Circle: MUMBAI", "SKU: X", "var_out: ICCID/IMSI"]
+        data = [f"8991000000{batch:03d}{i:05d}F\t40410{batch:03d}{i:07d}" for i in range(rows)]
+        Path(folder, f"IN_{suffix}.txt").write_text("\n".join(header + data) + "\n")
+        out_folder = Path(folder, f"OUT_{suffix}")
+        out_folder.mkdir()
+        for name in ("CNUM", "ORIG_TRIG", "SCM"):
+            (out_folder / f"{name}_{suffix}.txt").write_text("\n".join(data) + "\n")
+        (out_folder / f"SIMODA_{suffix}.cps").write_text("\n".join(data) + "\n")
+
+
+def _comparator():
+    comparator = MNOFileComparator()
+    comparator.set_log_callback(lambda message, level="INFO": None)
+    return comparator
+
+
+class _StalledWorker(BatchWorker):
+    """Claims a batch and never finishes it (no heartbeat either), until it is killed"""
+
+    def _run_job(self, claimed_file, job):
+        time.sleep(3600)
+
+
+def run_local_worker(queue_dir, worker_id, stalled=False):
+    worker_class = _StalledWorker if stalled else BatchWorker
+    worker = worker_class(queue_dir, worker_id=worker_id, heartbeat_interval=LEASE_TIMEOUT / 5,
+                          poll_interval=0.05, log_callback=lambda message, level="INFO": None)
+    worker.run()
+
+
+def _wait_for(condition, timeout=30.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_killed_worker_batch_is_reassigned():
+    with tempfile.TemporaryDirectory() as parent_folder, tempfile.TemporaryDirectory() as queue_dir:
+        make_batches(parent_folder, 4)
+
+        sequential = _comparator()
+        expected_counts = sequential.run_validation(parent_folder)
+
+        distributed = _comparator()
+        logs = []
+        coordinator = BatchCoordinator(distributed, queue_dir=queue_dir, lease_timeout=LEASE_TIMEOUT,
+                                       poll_interval=0.05,
+                                       log_callback=lambda message, level="INFO": logs.append(message))
+        counts = []
+        coordinator_thread = threading.Thread(target=lambda: counts.append(coordinator.run(parent_folder)),
+                                              daemon=True)
+        queue = FileQueue(queue_dir)
+
+        # The first worker takes a batch, then dies partway through it
+        stalled = multiprocessing.Process(target=run_local_worker, args=(queue_dir, "stalled", True))
+        workers = [multiprocessing.Process(target=run_local_worker, args=(queue_dir, f"worker{i}"))
+                   for i in range(2)]
+        try:
+            stalled.start()
+            coordinator_thread.start()
+            _wait_for(lambda: any(queue.claimed.glob("batch_*@stalled.json")))
+            lost_job = next(queue.claimed.glob("batch_*@stalled.json")).stem.split("@")[0]
+            stalled.kill()
+            stalled.join()
+
+            for worker in workers:
+                worker.start()
+            coordinator_thread.join(timeout=60)
+            for worker in workers:
+                worker.join(timeout=10)
+        finally:
+            queue.stop()
+            for process in [stalled] + workers:
+                if process.is_alive():
+                    process.kill()
+
+        assert not coordinator_thread.is_alive()
+        assert counts == [expected_counts]
+        assert distributed.excel_reports == sequential.excel_reports
+        assert f"⚠️ Lease expired, requeued {lost_job} (worker stalled)" in logs
+        assert queue.get_result(lost_job)["worker"] in ("worker0", "worker1")
+        assert all(worker.exitcode == 0 for worker in workers)
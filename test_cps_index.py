@@ -0,0 +1,90 @@
+# test_cps_index.py
+"""CpsIndex against the linear candidate scan parse_cps_file did before it."""
+import os
+import random
+import re
+import sys
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "modules"))
+
+from first_card_validation.core.cps_index import CpsIndex  # noqa: E402
+
+# Patterns of the former per-field loops of parse_cps_file
+REF_PATTERNS = {
+    "ICCID": [(r'\b([0-9A-F]{18,20})\b', re.IGNORECASE),
+              (r'ICCID[:\s]+([0-9A-F]{18,20})', re.IGNORECASE),
+              (r'"([0-9A-F]{18,20})"', re.IGNORECASE)],
+    "IMSI": [(r'\b(\d{15})\b', 0), (r'\b(\d{18})\b', 0),
+             (r'IMSI[:\s]+(\d{15,18})', 0), (r'"(\d{15,18})"', 0)],
+    "HEX32": [(r'\b([0-9A-F]{32})\b', re.IGNORECASE)],
+}
+
+
+def ref_similarity(str1, str2):
+    if not str1 or not str2:
+        return 0.0
+    return SequenceMatcher(None, str(str1).strip().upper(), str(str2).strip().upper()).ratio() * 100
+
+
+def ref_best_match(content, family, value, threshold=80.0):
+    """Score every candidate match in file order; the first best one wins"""
+    best_match, best_similarity = None, 0
+    for pattern, flags in REF_PATTERNS[family]:
+        for match in re.findall(pattern, content, flags):
+            similarity = ref_similarity(value, match)
+            if similarity > best_similarity:
+                best_similarity, best_match = similarity, match
+    if best_match and best_similarity >= threshold:
+        return best_match, best_similarity
+    return None, 0
+
+
+def ref_find_exact(content, value):
+    value = str(value).strip()
+    pos = content.upper().find(value.upper())
+    return None if pos == -1 else content[pos:pos + len(value)]
+
+
+def _mutate(value, alphabet):
+    chars = list(value)
+    for _ in range(random.randint(0, 5)):
+        action = random.random()
+        pos = random.randrange(len(chars) + 1)
+        if action < 0.4 and chars:
+            chars[min(pos, len(chars) - 1)] = random.choice(alphabet)
+        elif action < 0.7:
+            chars.insert(pos, random.choice(alphabet))
+        elif chars:
+            del chars[min(pos, len(chars) - 1)]
+    return ''.join(chars)
+
+
+def _random_cps(base_values, rows):
+    lines = []
+    for _ in range(rows):
+        family, value = random.choice(base_values)
+        alphabet = "0123456789" if family == "IMSI" else "0123456789ABCDEFabcdef"
+        value = _mutate(value, alphabet)
+        layout = random.choice(['{0}', 'ICCID: {0}', 'IMSI {0}', '"{0}"', 'X{0}', '{0},{0}'])
+        lines.append(layout.format(value))
+    return "\n".join(lines)
+
+
+def test_best_match_matches_linear_scan():
+    random.seed(41)
+    for _ in range(150):
+        base_values = [
+            ("ICCID", ''.join(random.choice("0123456789ABCDEF") for _ in range(random.choice([18, 19, 20])))),
+            ("IMSI", ''.join(random.choice("0123456789") for _ in range(random.choice([15, 18])))),
+            ("HEX32", ''.join(random.choice("0123456789ABCDEF") for _ in range(32))),
+        ]
+        content = _random_cps(base_values, random.randint(5, 120))
+        index = CpsIndex(content)
+        for family, value in base_values:
+            alphabet = "0123456789" if family == "IMSI" else "0123456789ABCDEF"
+            for query in (value, _mutate(value, alphabet), _mutate(value, alphabet)):
+                if not query:
+                    continue
+                assert index.best_match(family, query) == ref_best_match(content, family, query), (family, query)
+                assert index.find_exact(query) == ref_find_exact(content, query), query
@@ -0,0 +1,137 @@
+# test_log_aligner.py
+"""MachineLogIndex against the linear scan of find_script_command_in_machine_logs it replaced,
+and the streaming aligner and validation against the whole-log ones."""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "modules"))
+
+from machine_log_validation.core.log_aligner import MachineLogIndex, MachineLogStream, match_strategy  # noqa: E402
+from machine_log_validation.core.log_records import MachineLogEntry  # noqa: E402
+from machine_log_validation.core.script_validator import ScriptValidator  # noqa: E402
+
+TOKEN_NAMES = ('apdu', 'sw', 'exp', 'out', 'expect', 'receive', 'result', 'exp_result', 'placeholder_name')
+
+
+def ref_find(script_apdu, machine_apdus, start_index=0):
+    """The former scan: first entry from start_index matching by any of the five strategies"""
+    script_command = script_apdu[:4] if len(script_apdu) >= 4 else script_apdu
+    for i in range(start_index, len(machine_apdus)):
+        machine_apdu = machine_apdus[i]
+        if not machine_apdu:
+            continue
+        machine_command = machine_apdu[:4] if len(machine_apdu) >= 4 else machine_apdu
+        if script_apdu == machine_apdu:
+            return i
+        if script_command == machine_command and script_command in ['00B0', '00B2', '00B1']:
+            return i
+        if script_apdu in machine_apdu:
+            return i
+        if machine_apdu in script_apdu:
+            return i
+        min_len = min(len(script_apdu), len(machine_apdu), 10)
+        if min_len >= 6 and script_apdu[:min_len] == machine_apdu[:min_len]:
+            return i
+    return -1
+
+
+def make_entries(apdus):
+    entries = []
+    for line_num, apdu in enumerate(apdus, 1):
+        tokens = dict.fromkeys(TOKEN_NAMES)
+        tokens['apdu'] = apdu
+        entries.append(MachineLogEntry(line_num, tokens))
+    return entries
+
+
+# Shared pieces, so APDUs often contain, prefix or equal each other
+PIECES = ['00B0', '00B2', '00B1', '00D6', '0000', '09', '0A', '80E2', 'FE85', '9000', 'A0A4', 'F', '3F00']
+
+
+def random_apdu():
+    return ''.join(random.choice(PIECES) for _ in range(random.randint(1, 6)))
+
+
+def random_log(size):
+    apdus = [random_apdu() for _ in range(size)]
+    script = []
+    for _ in range(size):
+        choice = random.random()
+        if choice < 0.5 and apdus:
+            script.append(random.choice(apdus))
+        elif choice < 0.7 and apdus:
+            apdu = random.choice(apdus)
+            script.append(apdu[:random.randint(1, len(apdu))])
+        else:
+            script.append(random_apdu())
+    return apdus, script
+
+
+def test_index_find_matches_linear_scan():
+    random.seed(46)
+    for _ in range(200):
+        apdus, script = random_log(random.randint(0, 60))
+        index = MachineLogIndex(make_entries(apdus))
+        for script_apdu in script:
+            start = random.randint(0, len(apdus))
+            expected = ref_find(script_apdu, apdus, start)
+            found, strategy = index.find(script_apdu, start)
+            assert found == expected, (script_apdu, start, apdus)
+            if found >= 0:
+                assert strategy == match_strategy(script_apdu, apdus[found])
+
+
+def test_stream_find_matches_index():
+    random.seed(48)
+    for _ in range(200):
+        apdus, script = random_log(random.randint(0, 60))
+        entries = make_entries(apdus)
+        index = MachineLogIndex(entries)
+        stream = MachineLogStream(iter(entries), chunk_size=random.randint(1, 17))
+        start = 0
+        for script_apdu in script:
+            # Starts never go back, like the validation moving through the log
+            start = min(start + random.choice([0, 0, 1, 1, 2, 5]), len(apdus))
+            found = stream.find(script_apdu, start)
+            assert found == index.find(script_apdu, start), (script_apdu, start, apdus)
+            if found[0] >= 0:
+                assert stream.entry(found[0]) is entries[found[0]]
+
+
+def _validation(script_path, log_path, stream):
+    validator = ScriptValidator()
+    validator.debug_mode = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        validator.parse_script_file(script_path)
+        if stream:
+            report = validator.validate_machine_log_stream(log_path)
+        else:
+            validator.parse_machine_log(log_path)
+            report = validator.validate_script_vs_machine_log()
+    # The streaming validation only keeps the log lines of failed commands
+    results = [result if result.get('status') == 'FAIL' else dict(result, machine_line=None)
+               for result in validator.validation_results]
+    return report, validator.stats, validator.field_values, results
+
+
+def test_stream_validation_matches_whole_log():
+    random.seed(480)
+    with tempfile.TemporaryDirectory() as folder:
+        script_path = os.path.join(folder, "variable_script.txt")
+        log_path = os.path.join(folder, "machine_log.txt")
+        for _ in range(20):
+            apdus = [random_apdu() for _ in range(random.randint(1, 80))]
+            # The log's commands in order, some missing from the log and some extra
+            script = [apdu for apdu in apdus if random.random() < 0.9]
+            for _ in range(random.randint(0, 5)):
+                script.insert(random.randint(0, len(script)), random_apdu())
+            with open(script_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(f"{apdu}SW{random.choice(['9000', '9000', '6A82'])}" for apdu in script))
+            with open(log_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(f"{i:06d} IN[{apdu}] OUT[{random.choice(['9000', '6A82'])}]"
+                                  for i, apdu in enumerate(apdus)))
+            assert _validation(script_path, log_path, True) == _validation(script_path, log_path, False)
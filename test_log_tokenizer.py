@@ -0,0 +1,33 @@
+# test_log_tokenizer.py
+"""tokenize_machine_log_line against the per-field searches it replaced."""
+import random
+
+from benchmark_machine_log import FORMATS, ref_parse_line, tokenize_machine_log_line
+
+KEYWORDS = ['APDU', 'apdu', 'SW', 'sw', 'EXP', 'exp', 'EXPECT', 'Expect', 'RECEIVE', 'receive',
+            'RESULT', 'result', 'EXPResult', 'expresult', 'OUT', 'IN']
+DELIMITERS = ['=', ' = ', '  =', ':', ' : ', '[', '', ' ']
+NOISE = [' ', '  ', '\t', ']', '[', '<KI>', '%DEK%', '<', '%', 'Send ', 'x', '']
+
+
+def _hex(length):
+    return ''.join(random.choice("0123456789ABCDEFabcdef") for _ in range(length))
+
+
+def random_line():
+    """Keyword/delimiter/value fields in random order, formats and case, with noise between"""
+    parts = [_hex(random.choice([4, 10, 20]))] if random.random() < 0.3 else []
+    for _ in range(random.randint(1, 7)):
+        value = random.choice([_hex(random.randint(1, 6)), _hex(random.choice([10, 32])),
+                               _hex(4).upper() + ']', '<PSK>', '%KI%', ''])
+        parts.append(random.choice(KEYWORDS) + random.choice(DELIMITERS) + value)
+        parts.append(random.choice(NOISE))
+    return ''.join(parts)
+
+
+def test_tokenizer_matches_field_searches():
+    random.seed(47)
+    lines = [make_line() for make_line in FORMATS.values() for _ in range(200)]
+    lines += [random_line() for _ in range(10000)]
+    for line in lines:
+        assert tokenize_machine_log_line(line) == ref_parse_line(line), line